@@ -0,0 +1,290 @@
+"""
+准入控制与限流模块
+
+- 语音会话并发上限（全局 / 单IP）
+- 单个语音会话的消息速率、音频时长速率令牌桶
+- HTTP接口按客户端IP的令牌桶限流
+- 面试评估的排队与超时
+
+所有限制均为单进程内计数；多worker部署时全局上限按worker分摊。
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Any
+
+from backend.metrics import metrics
+
+
+class AdmissionRejected(Exception):
+    """请求被准入控制拒绝"""
+
+    def __init__(self, code: str, message: str, retry_after: float = 0.0, status_code: int = 429):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.retry_after = retry_after
+        self.status_code = status_code
+        metrics.counter("admission_rejected_total", "准入控制拒绝总数").inc()
+        metrics.counter(f"admission_rejected_{code}_total", f"准入控制拒绝次数: {code}").inc()
+
+    def to_frame(self) -> Dict[str, Any]:
+        """WebSocket结构化错误帧"""
+        return {
+            "type": "error",
+            "code": self.code,
+            "message": self.message,
+            "retry_after_ms": int(self.retry_after * 1000)
+        }
+
+    def to_detail(self) -> Dict[str, Any]:
+        """HTTP错误响应体"""
+        return {
+            "detail": self.message,
+            "code": self.code,
+            "retry_after": round(self.retry_after, 3)
+        }
+
+
+class TokenBucket:
+    """令牌桶：rate为每秒补充的令牌数，burst为桶容量"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def try_consume(self, amount: float = 1.0) -> float:
+        """
+        尝试消耗令牌
+
+        Returns:
+            0表示成功；否则为令牌补足所需等待的秒数
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (amount - self.tokens) / self.rate
+
+
+# 发送给Azure Realtime的输入音频格式（pcm16）
+AUDIO_SAMPLE_RATE = 24000
+AUDIO_CHANNELS = 1
+
+
+def audio_seconds(audio_data: str, sample_rate: int, channels: int = 1, sample_width: int = 2) -> float:
+    """由base64编码的PCM数据长度估算音频时长（秒），无需解码"""
+    padding = audio_data[-2:].count("=") if audio_data else 0
+    byte_count = len(audio_data) * 3 // 4 - padding
+    return byte_count / max(1, sample_rate * channels * sample_width)
+
+
+def client_ip(scope: dict, trust_forwarded_for: bool = False) -> str:
+    """
+    获取客户端IP
+
+    Args:
+        scope: ASGI scope
+        trust_forwarded_for: 是否信任X-Forwarded-For（仅在位于可信代理之后时开启）
+    """
+    if trust_forwarded_for:
+        forwarded = [v for k, v in scope.get("headers", []) if k.lower() == b"x-forwarded-for"]
+        if forwarded:
+            # 取最后一跳代理追加的地址，客户端自带的值不可信
+            return forwarded[-1].decode("latin-1").split(",")[-1].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class VoiceSessionLimiter:
+    """单个语音WebSocket会话的消息与音频速率限制"""
+
+    def __init__(self, messages_per_sec: float, message_burst: float,
+                 audio_seconds_per_sec: float, audio_burst_seconds: float):
+        self.message_bucket = TokenBucket(messages_per_sec, message_burst)
+        self.audio_bucket = TokenBucket(audio_seconds_per_sec, audio_burst_seconds)
+
+    def check(self, data: dict) -> Optional[AdmissionRejected]:
+        """
+        检查一条客户端消息是否超限
+
+        Returns:
+            超限时返回拒绝原因，否则返回None
+        """
+        message_type = data.get("type")
+        if message_type == "ping":
+            return None
+
+        wait = self.message_bucket.try_consume()
+        if wait:
+            return AdmissionRejected("message_rate_exceeded", "消息发送过于频繁，请稍后再试", wait)
+
+        if message_type == "voice_input" and data.get("audio_data"):
+            # 上游只接受pcm16/24kHz/单声道，预算按该格式计算；客户端声明的其他格式直接拒绝，
+            # 否则声明极大的采样率即可使估算时长趋近于0，绕过音频预算
+            if (data.get("sample_rate", AUDIO_SAMPLE_RATE) != AUDIO_SAMPLE_RATE
+                    or data.get("channels", AUDIO_CHANNELS) != AUDIO_CHANNELS
+                    or not isinstance(data["audio_data"], str)):
+                return AdmissionRejected("invalid_audio_format", "音频格式参数无效，仅支持pcm16/24kHz/单声道", status_code=400)
+            duration = audio_seconds(data["audio_data"], AUDIO_SAMPLE_RATE, AUDIO_CHANNELS)
+            wait = self.audio_bucket.try_consume(duration)
+            if wait:
+                return AdmissionRejected("audio_rate_exceeded", "音频输入速率超出限制，请稍后再试", wait)
+
+        return None
+
+
+class AdmissionController:
+    """进程级准入控制器"""
+
+    def __init__(
+        self,
+        max_voice_sessions: int = 200,
+        max_voice_sessions_per_ip: int = 3,
+        voice_messages_per_sec: float = 5.0,
+        voice_message_burst: float = 20.0,
+        voice_audio_seconds_per_sec: float = 1.5,
+        voice_audio_burst_seconds: float = 30.0,
+        http_requests_per_sec: float = 10.0,
+        http_burst: float = 40.0,
+        evaluation_concurrency: int = 4,
+        evaluation_queue_size: int = 32,
+        evaluation_queue_timeout: float = 30.0,
+        max_tracked_clients: int = 10000
+    ):
+        self.max_voice_sessions = max_voice_sessions
+        self.max_voice_sessions_per_ip = max_voice_sessions_per_ip
+        self.voice_messages_per_sec = voice_messages_per_sec
+        self.voice_message_burst = voice_message_burst
+        self.voice_audio_seconds_per_sec = voice_audio_seconds_per_sec
+        self.voice_audio_burst_seconds = voice_audio_burst_seconds
+        self.http_requests_per_sec = http_requests_per_sec
+        self.http_burst = http_burst
+        self.evaluation_queue_size = evaluation_queue_size
+        self.evaluation_queue_timeout = evaluation_queue_timeout
+        self.max_tracked_clients = max_tracked_clients
+
+        self._voice_sessions_by_ip: Dict[str, int] = {}
+        self._voice_sessions = 0
+        self._http_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._evaluation_semaphore = asyncio.Semaphore(evaluation_concurrency)
+        self._evaluation_waiting = 0
+
+        self._voice_gauge = metrics.gauge("voice_sessions_active", "当前活跃的语音会话数")
+        self._evaluation_waiting_gauge = metrics.gauge("evaluation_queue_waiting", "排队等待的评估请求数")
+
+    # 语音会话并发
+
+    def acquire_voice_session(self, ip: str) -> None:
+        """登记一个语音会话，超过全局或单IP上限时抛出AdmissionRejected"""
+        if self._voice_sessions >= self.max_voice_sessions:
+            raise AdmissionRejected("voice_capacity_exceeded", "当前语音面试人数已满，请稍后再试", 5.0, 503)
+        if self._voice_sessions_by_ip.get(ip, 0) >= self.max_voice_sessions_per_ip:
+            raise AdmissionRejected("voice_sessions_per_ip_exceeded", "同一网络下打开的语音会话过多，请关闭其他页面后重试", 5.0)
+
+        self._voice_sessions += 1
+        self._voice_sessions_by_ip[ip] = self._voice_sessions_by_ip.get(ip, 0) + 1
+        self._voice_gauge.set(self._voice_sessions)
+
+    def release_voice_session(self, ip: str) -> None:
+        """释放语音会话名额"""
+        self._voice_sessions = max(0, self._voice_sessions - 1)
+        remaining = self._voice_sessions_by_ip.get(ip, 0) - 1
+        if remaining > 0:
+            self._voice_sessions_by_ip[ip] = remaining
+        else:
+            self._voice_sessions_by_ip.pop(ip, None)
+        self._voice_gauge.set(self._voice_sessions)
+
+    def voice_session_limiter(self) -> VoiceSessionLimiter:
+        """为新的语音会话创建速率限制器"""
+        return VoiceSessionLimiter(
+            self.voice_messages_per_sec, self.voice_message_burst,
+            self.voice_audio_seconds_per_sec, self.voice_audio_burst_seconds
+        )
+
+    # HTTP限流
+
+    def check_http(self, ip: str) -> None:
+        """按客户端IP检查HTTP请求速率"""
+        bucket = self._http_buckets.get(ip)
+        if bucket is None:
+            bucket = TokenBucket(self.http_requests_per_sec, self.http_burst)
+            self._http_buckets[ip] = bucket
+            # 只跟踪最近活跃的客户端，防止IP表无限增长
+            if len(self._http_buckets) > self.max_tracked_clients:
+                self._http_buckets.popitem(last=False)
+        else:
+            self._http_buckets.move_to_end(ip)
+
+        wait = bucket.try_consume()
+        if wait:
+            raise AdmissionRejected("http_rate_exceeded", "请求过于频繁，请稍后再试", wait)
+
+    # 评估排队
+
+    @asynccontextmanager
+    async def evaluation_slot(self):
+        """获取评估执行名额：队列已满立即拒绝，排队超时返回503"""
+        if self._evaluation_semaphore.locked() and self._evaluation_waiting >= self.evaluation_queue_size:
+            raise AdmissionRejected("evaluation_queue_full", "评估请求较多，请稍后再试", 5.0, 503)
+
+        self._evaluation_waiting += 1
+        self._evaluation_waiting_gauge.set(self._evaluation_waiting)
+        try:
+            await asyncio.wait_for(self._evaluation_semaphore.acquire(), timeout=self.evaluation_queue_timeout)
+        except asyncio.TimeoutError:
+            raise AdmissionRejected("evaluation_queue_timeout", "评估排队超时，请稍后重试", 5.0, 503)
+        finally:
+            self._evaluation_waiting -= 1
+            self._evaluation_waiting_gauge.set(self._evaluation_waiting)
+
+        try:
+            yield
+        finally:
+            self._evaluation_semaphore.release()
+
+
+class HttpRateLimitMiddleware:
+    """纯ASGI中间件：对 /api/ 下的HTTP请求按客户端IP限流"""
+
+    def __init__(self, app, controller: AdmissionController, trust_forwarded_for: bool = False,
+                 prefix: str = "/api/", exempt_paths: tuple = ()):
+        self.app = app
+        self.controller = controller
+        self.trust_forwarded_for = trust_forwarded_for
+        self.prefix = prefix
+        self.exempt_paths = set(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith(self.prefix) or path in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            self.controller.check_http(client_ip(scope, self.trust_forwarded_for))
+        except AdmissionRejected as e:
+            body = json.dumps(e.to_detail(), ensure_ascii=False).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": e.status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, int(e.retry_after + 0.999))).encode())
+                ]
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        await self.app(scope, receive, send)
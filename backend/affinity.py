@@ -0,0 +1,362 @@
+"""
+会话亲和路由模块
+
+按session_id做一致性哈希，把同一候选人的 /ws/voice 语音连接和简历/评估请求固定路由到同一个worker，
+使该worker上的简历缓存、渲染后的prompt缓存保持热状态。
+
+包含一个轻量的本地反向代理（ASGI应用），由 start.py --mode sticky 启动：
+    uvicorn --factory backend.affinity:create_proxy_app
+"""
+import asyncio
+import bisect
+import hashlib
+import itertools
+import logging
+import re
+import time
+from http.cookies import SimpleCookie
+from typing import AsyncIterator, Dict, List, Optional, Iterator, Tuple
+from urllib.parse import parse_qs
+
+import httpx
+
+from config import AffinityConfig, UploadConfig
+
+logger = logging.getLogger(__name__)
+
+# 路径中携带session_id的接口
+_PATH_SESSION_PATTERN = re.compile(r"^/api/resume/([^/]+)$")
+
+# 逐跳首部，不应由代理转发
+_HOP_BY_HOP_HEADERS = {
+    b"connection", b"keep-alive", b"proxy-authenticate", b"proxy-authorization",
+    b"te", b"trailer", b"transfer-encoding", b"upgrade", b"host"
+}
+
+
+class _BodyTooLarge(Exception):
+    """流式转发的请求体超过上限"""
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """带虚拟节点的一致性哈希环"""
+
+    def __init__(self, nodes: List[str], virtual_nodes: int = 160):
+        """
+        Args:
+            nodes: 节点列表（上游地址）
+            virtual_nodes: 每个节点的虚拟节点数，越大分布越均匀
+        """
+        if not nodes:
+            raise ValueError("一致性哈希环至少需要一个节点")
+        self.nodes = list(dict.fromkeys(nodes))
+        ring = sorted(
+            (_hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(virtual_nodes)
+        )
+        self._keys = [h for h, _ in ring]
+        self._owners = [node for _, node in ring]
+
+    def node_for(self, key: str) -> str:
+        """key的首选节点"""
+        return next(self.preference_list(key))
+
+    def preference_list(self, key: str) -> Iterator[str]:
+        """沿哈希环顺时针依次给出不重复的节点，首选节点不可用时按此顺序回退"""
+        start = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        seen = set()
+        for i in range(len(self._keys)):
+            node = self._owners[(start + i) % len(self._keys)]
+            if node not in seen:
+                seen.add(node)
+                yield node
+                if len(seen) == len(self.nodes):
+                    return
+
+
+def extract_session_key(scope: dict, header_name: str, cookie_name: str) -> Optional[str]:
+    """
+    从请求中提取用于路由的session_id
+
+    优先级：路由请求头 → 查询参数session_id → /api/resume/{session_id} 路径 → 会话cookie
+    """
+    headers = {k.lower(): v for k, v in scope.get("headers", [])}
+
+    value = headers.get(header_name.lower().encode("latin-1"))
+    if value:
+        return value.decode("latin-1")
+
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    if query.get("session_id", [""])[0]:
+        return query["session_id"][0]
+
+    match = _PATH_SESSION_PATTERN.match(scope.get("path", ""))
+    if match:
+        return match.group(1)
+
+    raw_cookie = headers.get(b"cookie")
+    if raw_cookie:
+        cookie = SimpleCookie()
+        try:
+            cookie.load(raw_cookie.decode("latin-1"))
+        except Exception:
+            return None
+        if cookie_name in cookie and cookie[cookie_name].value:
+            return cookie[cookie_name].value
+
+    return None
+
+
+class AffinityProxy:
+    """按session_id一致性哈希转发HTTP和WebSocket请求的反向代理"""
+
+    def __init__(self, upstreams: List[str], virtual_nodes: int = 160,
+                 header_name: str = "x-session-id", cookie_name: str = "interview_session",
+                 failure_cooldown: float = 10.0, timeout: float = 60.0,
+                 max_body_size: int = 10 * 1024 * 1024, retry_buffer_size: int = 1024 * 1024):
+        """
+        Args:
+            max_body_size: 请求体上限，超出时返回413，不转发到上游
+            retry_buffer_size: 不超过该大小的请求体读入内存，首选上游连接失败时重放到下一个上游；
+                更大的请求体边读边转发，只尝试首选上游
+        """
+        self.ring = HashRing([u.rstrip("/") for u in upstreams], virtual_nodes)
+        self.header_name = header_name
+        self.cookie_name = cookie_name
+        self.failure_cooldown = failure_cooldown
+        self.timeout = timeout
+        self.max_body_size = max_body_size
+        self.retry_buffer_size = min(retry_buffer_size, max_body_size)
+        self._round_robin = itertools.cycle(self.ring.nodes)
+        self._down_until: Dict[str, float] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _candidates(self, scope: dict) -> List[str]:
+        """按优先顺序给出可用上游；没有session_id的请求轮询分发"""
+        key = extract_session_key(scope, self.header_name, self.cookie_name)
+        if key:
+            ordered = list(self.ring.preference_list(key))
+        else:
+            first = next(self._round_robin)
+            ordered = [first] + [n for n in self.ring.nodes if n != first]
+
+        now = time.monotonic()
+        healthy = [n for n in ordered if self._down_until.get(n, 0) <= now]
+        # 全部标记为不可用时仍按原顺序尝试
+        return healthy or ordered
+
+    def _mark_down(self, upstream: str) -> None:
+        self._down_until[upstream] = time.monotonic() + self.failure_cooldown
+        logger.warning(f"上游不可用，暂停路由{self.failure_cooldown:.0f}秒: {upstream}")
+
+    def _forward_headers(self, scope: dict) -> List[tuple]:
+        headers = [(k, v) for k, v in scope.get("headers", []) if k.lower() not in _HOP_BY_HOP_HEADERS]
+        client = scope.get("client")
+        if client:
+            headers.append((b"x-forwarded-for", client[0].encode("latin-1")))
+        return headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._proxy_http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._proxy_websocket(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._client = httpx.AsyncClient(timeout=self.timeout, limits=httpx.Limits(max_connections=None))
+                logger.info(f"会话亲和代理已启动，上游: {', '.join(self.ring.nodes)}")
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._client:
+                    await self._client.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _read_body(self, receive) -> Tuple[bytes, bool]:
+        """
+        读取请求体，最多读到 retry_buffer_size 字节之后的第一个分块
+
+        Returns:
+            (已读取的内容, 是否已读完)
+        """
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return b"".join(chunks), True
+            chunk = message.get("body", b"")
+            chunks.append(chunk)
+            size += len(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks), True
+            if size > self.retry_buffer_size:
+                return b"".join(chunks), False
+
+    async def _stream_body(self, head: bytes, receive) -> AsyncIterator[bytes]:
+        """先发送已读取的部分，其余边读边转发，累计超过上限时中止"""
+        received = len(head)
+        yield head
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunk = message.get("body", b"")
+            received += len(chunk)
+            if received > self.max_body_size:
+                raise _BodyTooLarge()
+            yield chunk
+            if not message.get("more_body", False):
+                return
+
+    async def _send_error(self, send, status: int, detail: str) -> None:
+        body = ('{"detail": "%s"}' % detail).encode("utf-8")
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _proxy_http(self, scope, receive, send):
+        too_large = f"请求体超过上限（最大{self.max_body_size // (1024 * 1024)}MB）"
+        # 声明了Content-Length时无需读取请求体即可拒绝
+        for key, value in scope.get("headers", []):
+            if key.lower() == b"content-length":
+                if value.isdigit() and int(value) > self.max_body_size:
+                    await self._send_error(send, 413, too_large)
+                    return
+                break
+
+        # 小请求体先读入，以便首选上游连接失败时可以重放到下一个上游；大请求体（简历上传）流式转发，
+        # 代理内存中最多保留 retry_buffer_size 字节
+        body, complete = await self._read_body(receive)
+        if len(body) > self.max_body_size:
+            await self._send_error(send, 413, too_large)
+            return
+        candidates = self._candidates(scope)
+        if not complete:
+            body = self._stream_body(body, receive)
+            candidates = candidates[:1]
+        target = scope.get("raw_path", scope["path"].encode()).decode("latin-1")
+        if scope.get("query_string"):
+            target += "?" + scope["query_string"].decode("latin-1")
+
+        for upstream in candidates:
+            request = self._client.build_request(
+                scope["method"], upstream + target,
+                headers=self._forward_headers(scope), content=body
+            )
+            try:
+                response = await self._client.send(request, stream=True)
+            except _BodyTooLarge:
+                await self._send_error(send, 413, too_large)
+                return
+            except httpx.TransportError:
+                self._mark_down(upstream)
+                continue
+
+            try:
+                headers = [(k, v) for k, v in response.headers.raw if k.lower() not in _HOP_BY_HOP_HEADERS]
+                headers.append((b"x-upstream", upstream.encode("latin-1")))
+                await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+                async for chunk in response.aiter_raw():
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+            finally:
+                await response.aclose()
+            return
+
+        await self._send_error(send, 502, "没有可用的上游服务")
+
+    async def _proxy_websocket(self, scope, receive, send):
+        from websockets.asyncio.client import connect
+        from websockets.exceptions import ConnectionClosed
+
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+
+        path = scope.get("raw_path", scope["path"].encode()).decode("latin-1")
+        if scope.get("query_string"):
+            path += "?" + scope["query_string"].decode("latin-1")
+        forwarded = [
+            (k.decode("latin-1"), v.decode("latin-1"))
+            for k, v in self._forward_headers(scope)
+            if k.lower() in (b"cookie", b"x-forwarded-for", b"user-agent", self.header_name.lower().encode("latin-1"))
+        ]
+
+        upstream_ws = None
+        for upstream in self._candidates(scope):
+            try:
+                upstream_ws = await connect(
+                    "ws" + upstream[len("http"):] + path,
+                    additional_headers=forwarded,
+                    max_size=None,
+                    open_timeout=self.timeout
+                )
+                break
+            except (OSError, asyncio.TimeoutError):
+                self._mark_down(upstream)
+
+        if upstream_ws is None:
+            await send({"type": "websocket.close", "code": 1013})
+            return
+
+        await send({"type": "websocket.accept"})
+
+        async def client_to_upstream():
+            try:
+                while True:
+                    incoming = await receive()
+                    if incoming["type"] == "websocket.disconnect":
+                        return
+                    if incoming.get("text") is not None:
+                        await upstream_ws.send(incoming["text"])
+                    elif incoming.get("bytes") is not None:
+                        await upstream_ws.send(incoming["bytes"])
+            except ConnectionClosed:
+                pass
+
+        async def upstream_to_client():
+            try:
+                async for data in upstream_ws:
+                    if isinstance(data, str):
+                        await send({"type": "websocket.send", "text": data})
+                    else:
+                        await send({"type": "websocket.send", "bytes": data})
+            except ConnectionClosed:
+                pass
+            await send({"type": "websocket.close", "code": upstream_ws.close_code or 1000})
+
+        tasks = [asyncio.create_task(client_to_upstream()), asyncio.create_task(upstream_to_client())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await upstream_ws.close()
+
+
+def create_proxy_app() -> AffinityProxy:
+    """uvicorn --factory 入口，从AFFINITY_UPSTREAMS读取上游列表"""
+    upstreams = [u.strip() for u in AffinityConfig.UPSTREAMS.split(",") if u.strip()]
+    return AffinityProxy(
+        upstreams,
+        virtual_nodes=AffinityConfig.VIRTUAL_NODES,
+        header_name=AffinityConfig.HEADER_NAME,
+        cookie_name=AffinityConfig.COOKIE_NAME,
+        failure_cooldown=AffinityConfig.FAILURE_COOLDOWN_S,
+        timeout=AffinityConfig.UPSTREAM_TIMEOUT_S,
+        # 与worker上 UploadSizeLimitMiddleware 的请求体上限一致
+        max_body_size=UploadConfig.MAX_SIZE_BYTES + UploadConfig.MULTIPART_OVERHEAD_BYTES,
+        retry_buffer_size=AffinityConfig.RETRY_BUFFER_BYTES
+    )
@@ -0,0 +1,347 @@
+"""
+面试评分分析模块
+
+招聘方需要按面试方向的分数分布、各维度平均分和随时间的趋势。逐条扫描评估结果并重新解析 dimension_scores
+的代价随评估数量线性增长，这里在保存评估时增量维护汇总：
+
+- 每个(日期, 面试方向)一行（SessionStore 的 score_rollups 表），值为定长float64向量：
+  评估数、总分和、总分平方和、总分直方图（每10分一档）、各维度分数和、各维度计数
+- 同一面试重新评估时先扣减旧结果再累加新结果，删除面试时扣减
+- 查询只读取区间内的汇总行，按列（numpy向量）求和，耗时只与天数和方向数有关，与评估数量无关
+
+原始数据导出（CSV / Parquet）按面试时间分批读取并逐批输出，不在内存中缓冲整个结果。
+"""
+import csv
+import io
+import math
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 取决于部署环境
+    pa = None
+    pq = None
+
+PARQUET_AVAILABLE = pa is not None
+
+SCORE_BINS = 10
+
+# 与评估结果 dimension_scores 的键一致
+DIMENSIONS = (
+    "technical_skills",
+    "communication",
+    "problem_solving",
+    "learning_adaptability",
+    "professional_attitude",
+)
+
+# 汇总向量的布局
+_COUNT = 0
+_SUM = 1
+_SQ_SUM = 2
+_HIST = slice(3, 3 + SCORE_BINS)
+_DIM_SUM = slice(_HIST.stop, _HIST.stop + len(DIMENSIONS))
+_DIM_COUNT = slice(_DIM_SUM.stop, _DIM_SUM.stop + len(DIMENSIONS))
+VECTOR_SIZE = _DIM_COUNT.stop
+
+EXPORT_COLUMNS = ("interview_id", "interviewed_at", "position", "duration", "total_score") + DIMENSIONS
+
+# 未匹配到面试方向的评估归入该方向
+UNKNOWN_POSITION = "general"
+
+
+def day_of(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+def _score(value: Any) -> Optional[float]:
+    """有限数值分数截断到0–100，其他值返回None"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        return None
+    return min(max(value, 0), 100)
+
+
+def _dimension_scores(evaluation: Any) -> Dict[str, Any]:
+    if not isinstance(evaluation, dict) or not isinstance(evaluation.get("dimension_scores"), dict):
+        return {}
+    return evaluation["dimension_scores"]
+
+
+def normalize_evaluation(evaluation: Any) -> Dict[str, Any]:
+    """
+    校验客户端提交的评估结果（迁移本地记录时附带），分数截断到0–100
+
+    Raises:
+        ValueError: 结构或分数类型不合法
+    """
+    if not isinstance(evaluation, dict):
+        raise ValueError("评估结果必须是对象")
+    normalized = dict(evaluation)
+    if normalized.get("total_score") is not None:
+        normalized["total_score"] = _score(normalized["total_score"])
+        if normalized["total_score"] is None:
+            raise ValueError("total_score必须是数值")
+    if not isinstance(normalized.get("summary") or "", str):
+        raise ValueError("summary必须是字符串")
+
+    dimension_scores = normalized.get("dimension_scores")
+    if dimension_scores is not None:
+        if not isinstance(dimension_scores, dict):
+            raise ValueError("dimension_scores必须是对象")
+        normalized["dimension_scores"] = {}
+        for name in DIMENSIONS:
+            if dimension_scores.get(name) is None:
+                continue
+            value = _score(dimension_scores[name])
+            if value is None:
+                raise ValueError(f"dimension_scores.{name}必须是数值")
+            normalized["dimension_scores"][name] = value
+    return normalized
+
+
+def evaluation_vector(evaluation: Dict[str, Any]) -> np.ndarray:
+    """单条评估结果对汇总的贡献；不合法的分数不计入"""
+    vector = np.zeros(VECTOR_SIZE)
+    score = _score(evaluation.get("total_score")) if isinstance(evaluation, dict) else None
+    if score is None:
+        return vector
+    vector[_COUNT] = 1
+    vector[_SUM] = score
+    vector[_SQ_SUM] = score * score
+    vector[_HIST.start + min(int(score // (100 / SCORE_BINS)), SCORE_BINS - 1)] = 1
+    dimension_scores = _dimension_scores(evaluation)
+    for index, name in enumerate(DIMENSIONS):
+        value = _score(dimension_scores.get(name))
+        if value is not None:
+            vector[_DIM_SUM.start + index] = value
+            vector[_DIM_COUNT.start + index] = 1
+    return vector
+
+
+def merge_stats(current: Optional[bytes], delta: bytes) -> bytes:
+    """SessionStore.update_rollups 的合并函数：向量相加"""
+    total = np.frombuffer(delta, dtype=np.float64).copy()
+    if current is not None:
+        total += np.frombuffer(current, dtype=np.float64)
+    return total.tobytes()
+
+
+def summarize(vector: np.ndarray) -> Dict[str, Any]:
+    """汇总向量 → 接口格式"""
+    # 扣减后的浮点误差不影响计数
+    count = int(round(vector[_COUNT]))
+    mean = float(vector[_SUM]) / count if count else None
+    stddev = math.sqrt(max(vector[_SQ_SUM] / count - mean * mean, 0.0)) if count else None
+    dimension_counts = vector[_DIM_COUNT]
+    return {
+        "count": count,
+        "mean": round(mean, 2) if mean is not None else None,
+        "stddev": round(stddev, 2) if stddev is not None else None,
+        "histogram": [int(round(v)) for v in vector[_HIST]],
+        "dimensions": {
+            name: round(float(vector[_DIM_SUM.start + i] / dimension_counts[i]), 2) if round(dimension_counts[i]) else None
+            for i, name in enumerate(DIMENSIONS)
+        }
+    }
+
+
+def _period_key(day: str, granularity: str) -> str:
+    if granularity == "day":
+        return day
+    parsed = date.fromisoformat(day)
+    if granularity == "week":
+        return (parsed - timedelta(days=parsed.weekday())).isoformat()
+    return day[:7]
+
+
+class ScoreAnalytics:
+    """评分汇总的维护、查询与导出"""
+
+    GRANULARITIES = ("day", "week", "month")
+
+    def __init__(self, store):
+        """
+        Args:
+            store: SessionStore
+        """
+        self.store = store
+
+    def save_evaluation(self, interview_id: str, owner_id: str, evaluation: Dict[str, Any],
+                        position: Optional[str]) -> bool:
+        """
+        保存评估结果并增量更新汇总（阻塞调用，在线程池中执行）
+
+        Returns:
+            面试属于其他客户端、未保存时返回False
+        """
+        position = position or UNKNOWN_POSITION
+        total_score = _score(evaluation.get("total_score"))
+        saved = self.store.save_interview_evaluation(
+            interview_id, owner_id, total_score, evaluation.get("summary") or "", evaluation, position
+        )
+        if saved is None:
+            return False
+
+        created_at, previous_position, previous = saved
+        day = day_of(created_at)
+        deltas = []
+        if previous is not None:
+            deltas.append((day, previous_position or UNKNOWN_POSITION, (-evaluation_vector(previous)).tobytes()))
+        deltas.append((day, position, evaluation_vector(evaluation).tobytes()))
+        self.store.update_rollups(deltas, merge_stats)
+        return True
+
+    def delete_interviews(self, owner_id: str, interview_id: Optional[str] = None) -> int:
+        """删除面试记录并扣减其评估结果（阻塞调用，在线程池中执行）"""
+        deleted, evaluations = self.store.delete_interviews(owner_id, interview_id)
+        if evaluations:
+            self.store.update_rollups([
+                (day_of(created_at), position or UNKNOWN_POSITION, (-evaluation_vector(evaluation)).tobytes())
+                for created_at, position, evaluation in evaluations
+            ], merge_stats)
+        return deleted
+
+    def rebuild(self) -> int:
+        """按已保存的全部评估结果重建汇总（升级前的评估或汇总不一致时使用）"""
+        totals: Dict[Tuple[str, str], np.ndarray] = {}
+        count = 0
+        for batch in self.store.iter_evaluations(0.0, float("inf")):
+            for _, created_at, _, position, evaluation in batch:
+                key = (day_of(created_at), position or UNKNOWN_POSITION)
+                totals[key] = totals.get(key, np.zeros(VECTOR_SIZE)) + evaluation_vector(evaluation)
+                count += 1
+        self.store.update_rollups(
+            [(day, position, vector.tobytes()) for (day, position), vector in totals.items()],
+            merge_stats,
+            replace=True
+        )
+        return count
+
+    def query(self, start: str, end: str, position: Optional[str] = None,
+              granularity: str = "day") -> Dict[str, Any]:
+        """
+        查询日期区间（含两端）内的分数分布、维度平均分和趋势
+
+        Args:
+            start: 起始日期 YYYY-MM-DD
+            end: 结束日期 YYYY-MM-DD
+            position: 只统计该面试方向
+            granularity: 趋势粒度 day / week / month
+        """
+        rows = self.store.get_rollups(start, end, position)
+        if rows:
+            matrix = np.vstack([np.frombuffer(stats, dtype=np.float64) for _, _, stats in rows])
+        else:
+            matrix = np.zeros((0, VECTOR_SIZE))
+
+        positions = sorted({row[1] for row in rows})
+        by_position = {}
+        for name in positions:
+            summary = summarize(matrix[[i for i, row in enumerate(rows) if row[1] == name]].sum(axis=0))
+            if summary["count"]:
+                by_position[name] = summary
+
+        periods: Dict[str, np.ndarray] = {}
+        for (day, _, _), vector in zip(rows, matrix):
+            key = _period_key(day, granularity)
+            periods[key] = periods[key] + vector if key in periods else vector.copy()
+        trend = []
+        for key in sorted(periods):
+            vector = periods[key]
+            count = int(round(vector[_COUNT]))
+            trend.append({
+                "period": key,
+                "count": count,
+                "mean": round(float(vector[_SUM]) / count, 2) if count else None
+            })
+
+        return {
+            "start": start,
+            "end": end,
+            "position": position,
+            "granularity": granularity,
+            "histogram_edges": [round(i * 100 / SCORE_BINS) for i in range(SCORE_BINS + 1)],
+            "overall": summarize(matrix.sum(axis=0)),
+            "by_position": by_position,
+            "trend": trend
+        }
+
+    def _export_rows(self, start: float, end: float, batch_size: int) -> Iterator[List[tuple]]:
+        for batch in self.store.iter_evaluations(start, end, batch_size):
+            rows = []
+            for interview_id, created_at, duration, position, evaluation in batch:
+                dimension_scores = _dimension_scores(evaluation)
+                rows.append((
+                    interview_id,
+                    datetime.fromtimestamp(created_at).isoformat(timespec="seconds"),
+                    position or UNKNOWN_POSITION,
+                    duration,
+                    _score(evaluation.get("total_score")) if isinstance(evaluation, dict) else None,
+                    *(_score(dimension_scores.get(name)) for name in DIMENSIONS)
+                ))
+            yield rows
+
+    def iter_csv(self, start: float, end: float, batch_size: int = 1000) -> Iterator[bytes]:
+        """逐批生成CSV（UTF-8 BOM，Excel可直接打开中文）"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield ("﻿" + buffer.getvalue()).encode("utf-8")
+        for rows in self._export_rows(start, end, batch_size):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+
+    def iter_parquet(self, start: float, end: float, batch_size: int = 1000) -> Iterator[bytes]:
+        """逐批生成Parquet，每批一个行组；需要安装pyarrow"""
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("Parquet导出需要安装pyarrow")
+        schema = pa.schema(
+            [("interview_id", pa.string()), ("interviewed_at", pa.string()), ("position", pa.string()),
+             ("duration", pa.int64()), ("total_score", pa.float64())]
+            + [(name, pa.float64()) for name in DIMENSIONS]
+        )
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema)
+        try:
+            for rows in self._export_rows(start, end, batch_size):
+                columns = list(zip(*rows))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+                ))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+
+class _ChunkSink(io.RawIOBase):
+    """只追加的输出流，写入的数据可分段取出，供ParquetWriter边写边发送"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
@@ -10,28 +10,63 @@ import os
 import tempfile
 import io
 import base64
-import hashlib
 import asyncio
 import re
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Union, BinaryIO
 from pathlib import Path
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File, Depends, Header
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
-# 文件解析库
-import PyPDF2
-from docx import Document
-
 # Azure OpenAI实时语音客户端
 from openai import AsyncAzureOpenAI
 
 # 导入提示词配置
-from prompts import get_interviewer_prompt, get_voice_call_prompt, get_interview_evaluation_prompt
+from prompts import InterviewPrompts, get_interviewer_prompt_parts, get_voice_call_prompt, get_interview_evaluation_messages
+from config import (
+    LoopWatchdogConfig, AdminConfig, ProfilerConfig, SessionStoreConfig, AffinityConfig, AdmissionConfig,
+    AzureRealtimeConfig, DeepSeekConfig, TokenBrokerConfig, RegionHealthConfig, UploadConfig,
+    PdfExtractConfig, SearchIndexConfig, PositionMatchConfig, NearDuplicateConfig, WsSendConfig, WsResumeConfig,
+    TranscriptLogConfig, HistoryConfig, AnalyticsConfig, ResumeProfileConfig
+)
+
+# 运行时指标与事件循环看门狗
+from backend.metrics import metrics
+from backend.loop_watchdog import LoopWatchdog
+from backend.profiler import RouteTrackingExecutor, RouteTrackingMiddleware, sampling_profiler
+from backend.session_store import SessionStore
+from backend.admission import AdmissionController, AdmissionRejected, HttpRateLimitMiddleware, client_ip
+from backend.token_broker import RealtimeTokenBroker, TokenBrokerError
+from backend.region_health import RegionHealthService, RegionReportRejected
+from backend.upload import (
+    UploadSizeLimitMiddleware, spool_upload, validate_file, generate_resume_hash, save_resume_to_file,
+    load_resume_from_file, RESUME_STORAGE_DIR
+)
+from backend.pdf_extract import PdfExtractor
+from backend.docx_extract import extract_docx_text as extract_docx_stream
+from backend.resume_profile import ResumeProfile, build_resume_profile, redact_resume_text
+from backend.search_index import InvertedIndex, make_snippet
+from backend.position_matcher import PositionMatcher
+from backend.near_duplicate import MinHasher
+from backend.llm_usage import record_usage
+from backend.ws_sender import CoalescingSender, QueuedSender
+from backend.ws_resume import ResumeRegistry
+from backend.transcript_log import TranscriptLog, TranscriptRecorder, INPUT_TRANSCRIPT_TYPE, to_messages
+from backend.session_store import INTERVIEW_SORTS
+from backend.analytics import ScoreAnalytics, PARQUET_AVAILABLE, normalize_evaluation
+from backend.history import (
+    is_valid_client_id, decode_cursor, parse_timestamp, summary_to_json, page_of
+)
+from backend.serialization import FastJSONResponse, loads as json_loads
 
 # 配置日志
 logging.basicConfig(
@@ -40,7 +75,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Azure语音面试官系统", description="基于Azure OpenAI实时语音模型的智能面试系统")
+# 默认响应类使用orjson（未安装时回退到标准库json）序列化
+app = FastAPI(
+    title="Azure语音面试官系统",
+    description="基于Azure OpenAI实时语音模型的智能面试系统",
+    default_response_class=FastJSONResponse
+)
 
 # 添加CORS中间件
 app.add_middleware(
@@ -51,17 +91,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 准入控制器（语音会话并发、消息速率、HTTP限流、评估排队）
+admission_controller = AdmissionController(
+    max_voice_sessions=AdmissionConfig.MAX_VOICE_SESSIONS,
+    max_voice_sessions_per_ip=AdmissionConfig.MAX_VOICE_SESSIONS_PER_IP,
+    voice_messages_per_sec=AdmissionConfig.VOICE_MESSAGES_PER_SEC,
+    voice_message_burst=AdmissionConfig.VOICE_MESSAGE_BURST,
+    voice_audio_seconds_per_sec=AdmissionConfig.VOICE_AUDIO_SECONDS_PER_SEC,
+    voice_audio_burst_seconds=AdmissionConfig.VOICE_AUDIO_BURST_SECONDS,
+    http_requests_per_sec=AdmissionConfig.HTTP_REQUESTS_PER_SEC,
+    http_burst=AdmissionConfig.HTTP_BURST,
+    evaluation_concurrency=AdmissionConfig.EVALUATION_CONCURRENCY,
+    evaluation_queue_size=AdmissionConfig.EVALUATION_QUEUE_SIZE,
+    evaluation_queue_timeout=AdmissionConfig.EVALUATION_QUEUE_TIMEOUT_S
+)
+
+if AdmissionConfig.ENABLED:
+    app.add_middleware(
+        HttpRateLimitMiddleware,
+        controller=admission_controller,
+        trust_forwarded_for=AdmissionConfig.TRUST_FORWARDED_FOR,
+        exempt_paths=("/api/metrics",)
+    )
+
+# 上传请求体边接收边计数，超过上限立即中止
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_size=UploadConfig.MAX_SIZE_BYTES + UploadConfig.MULTIPART_OVERHEAD_BYTES,
+    paths=("/api/upload-resume",)
+)
+
+# 登记请求所在任务，供采样分析按路由归类
+app.add_middleware(RouteTrackingMiddleware)
+
 # 挂载静态文件
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# 渲染后的提示词缓存，会话亲和路由下同一简历的请求固定落在本worker，缓存持续命中
+@lru_cache(maxsize=256)
+def render_interviewer_prompt_parts(resume_context: str, position: Optional[str] = None) -> tuple:
+    """渲染面试官提示词，返回(静态前缀, 候选人简历)"""
+    return get_interviewer_prompt_parts(position=position, resume_context=resume_context)
+
+@lru_cache(maxsize=256)
+def render_voice_call_prompt(resume_context: str, position: Optional[str] = None) -> str:
+    """渲染带简历上下文的语音通话提示词"""
+    return get_voice_call_prompt(resume_context=resume_context, position=position)
+
 class InterviewEvaluationService:
     """面试评分服务"""
     
     def __init__(self):
         # DeepSeek V3 配置
-        self.DEEPSEEK_API_URL = "https://ds.yovole.com/api"
-        self.DEEPSEEK_API_KEY = "sk-833480880d9d417fbcc7ce125ca7d78b"
-        self.DEEPSEEK_MODEL = "DeepSeek-V3"
+        self.DEEPSEEK_API_URL = DeepSeekConfig.API_URL
+        self.DEEPSEEK_API_KEY = DeepSeekConfig.API_KEY
+        self.DEEPSEEK_MODEL = DeepSeekConfig.MODEL
         
         # 初始化DeepSeek客户端
         import httpx
@@ -88,8 +172,8 @@ class InterviewEvaluationService:
             # 分析对话内容
             conversation_analysis = self._analyze_conversation(messages)
             
-            # 构建评估prompt
-            evaluation_prompt = get_interview_evaluation_prompt(
+            # 构建评估消息：静态评分标准作为system消息，候选人数据作为user消息
+            evaluation_messages = get_interview_evaluation_messages(
                 resume_context=resume_context,
                 conversation_history=conversation_analysis['formatted_conversation'],
                 duration=self._format_duration(duration),
@@ -98,7 +182,7 @@ class InterviewEvaluationService:
             )
             
             # 调用DeepSeek V3进行评估
-            evaluation_result = await self._call_deepseek_evaluation(evaluation_prompt)
+            evaluation_result, usage = await self._call_deepseek_evaluation(evaluation_messages)
             
             # 解析评估结果
             parsed_result = self._parse_evaluation_result(evaluation_result)
@@ -106,6 +190,7 @@ class InterviewEvaluationService:
             # 添加统计信息
             parsed_result.update({
                 'conversation_stats': conversation_analysis['stats'],
+                'usage': usage,
                 'evaluation_timestamp': datetime.now().isoformat(),
                 'model_used': self.DEEPSEEK_MODEL
             })
@@ -170,8 +255,16 @@ class InterviewEvaluationService:
             minutes = (duration_seconds % 3600) // 60
             return f"{hours}小时{minutes}分钟"
     
-    async def _call_deepseek_evaluation(self, prompt: str) -> str:
-        """调用DeepSeek V3进行评估"""
+    async def _call_deepseek_evaluation(self, messages: list) -> tuple:
+        """
+        调用DeepSeek V3进行评估
+        
+        Args:
+            messages: system + user 消息列表
+            
+        Returns:
+            tuple: (评估文本, 用量统计)
+        """
         try:
             headers = {
                 'Authorization': f'Bearer {self.DEEPSEEK_API_KEY}',
@@ -180,24 +273,26 @@ class InterviewEvaluationService:
             
             payload = {
                 'model': self.DEEPSEEK_MODEL,
-                'messages': [
-                    {"role": "user", "content": prompt}
-                ],
+                'messages': messages,
                 'temperature': 0.3,  # 较低的温度确保评估的一致性
                 'max_tokens': 2000,
                 'top_p': 0.9
             }
             
+            started = time.perf_counter()
             response = await self.http_client.post(
                 f"{self.DEEPSEEK_API_URL}/chat/completions",
                 headers=headers,
                 json=payload,
-                timeout=30.0
+                timeout=DeepSeekConfig.TIMEOUT_S
             )
             
             if response.status_code == 200:
                 result = response.json()
-                return result['choices'][0]['message']['content']
+                usage = record_usage("deepseek", result.get('usage'), time.perf_counter() - started)
+                logger.info(f"DeepSeek用量: 提示词{usage['prompt_tokens']}, 缓存命中{usage['cached_tokens']}, "
+                            f"生成{usage['completion_tokens']}")
+                return result['choices'][0]['message']['content'], usage
             else:
                 logger.error(f"DeepSeek API调用失败: {response.status_code}, {response.text}")
                 raise Exception(f"API调用失败: {response.status_code}")
@@ -313,26 +408,26 @@ class AzureVoiceService:
     def _init_client(self) -> None:
         """初始化Azure OpenAI客户端"""
         try:
-            # 从环境变量获取配置
-            azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "https://gpt-realtime-4o-mini.openai.azure.com")
+            # 端点与版本见 AzureRealtimeConfig，可指向本地模拟服务
             api_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = os.getenv("AZURE_API_VERSION", "2025-04-01-preview")
             
             if not api_key:
                 logger.error("Azure OpenAI API密钥未设置！")
                 return
             
             self.client = AsyncAzureOpenAI(
-                azure_endpoint=azure_endpoint,
+                azure_endpoint=AzureRealtimeConfig.ENDPOINT,
                 api_key=api_key,
-                api_version=api_version,
+                api_version=AzureRealtimeConfig.API_VERSION,
+                websocket_base_url=AzureRealtimeConfig.WEBSOCKET_BASE_URL or None,
             )
             logger.info("Azure OpenAI客户端初始化成功")
             
         except Exception as e:
             logger.error(f"Azure OpenAI客户端初始化失败: {e}")
     
-    async def chat_with_voice(self, message: str, websocket: WebSocket, resume_context: str = "") -> None:
+    async def chat_with_voice(self, message: str, websocket: WebSocket, resume_context: str = "",
+                              position: Optional[str] = None) -> None:
         """
         发送消息并接收语音回复
         
@@ -340,6 +435,7 @@ class AzureVoiceService:
             message: 用户消息
             websocket: WebSocket连接
             resume_context: 简历上下文
+            position: 面试方向（岗位类型）
         """
         if not self.client:
             await websocket.send_json({
@@ -350,23 +446,23 @@ class AzureVoiceService:
         
         try:
             async with self.client.beta.realtime.connect(
-                model="gpt-4o-mini-realtime-preview"
+                model=AzureRealtimeConfig.DEPLOYMENT
             ) as connection:
+                # 静态面试官指令放在会话instructions中，候选人简历作为单独的system消息
+                instructions, resume_message = self._build_system_prompt(resume_context, position)
+                
                 # 配置会话支持文本和音频
                 await connection.session.update(
-                    session={"modalities": ["text", "audio"]}
+                    session={"modalities": ["text", "audio"], "instructions": instructions}
                 )
                 
-                # 构建系统提示词
-                system_prompt = self._build_system_prompt(resume_context)
-                
                 # 发送系统消息（如果有简历上下文）
-                if resume_context:
+                if resume_message:
                     await connection.conversation.item.create(
                         item={
                             "type": "message",
                             "role": "system",
-                            "content": [{"type": "input_text", "text": system_prompt}],
+                            "content": [{"type": "input_text", "text": resume_message}],
                         }
                     )
                 
@@ -396,9 +492,9 @@ class AzureVoiceService:
                 "message": f"语音聊天错误: {str(e)}"
             })
     
-    def _build_system_prompt(self, resume_context: str) -> str:
-        """构建系统提示词"""
-        return get_interviewer_prompt(resume_context=resume_context)
+    def _build_system_prompt(self, resume_context: str, position: Optional[str] = None) -> tuple:
+        """构建系统提示词，返回(静态指令, 候选人简历)；静态指令只取决于岗位，可被上游提示词缓存复用"""
+        return render_interviewer_prompt_parts(resume_context, position)
     
     async def _handle_response_event(self, event: Any, websocket: WebSocket) -> None:
         """
@@ -431,6 +527,13 @@ class AzureVoiceService:
                     "content": event.delta
                 })
                 
+            elif event.type == "conversation.item.input_audio_transcription.completed":
+                # 语音输入转写完成，供前端展示和服务端对话记录
+                await websocket.send_json({
+                    "type": INPUT_TRANSCRIPT_TYPE,
+                    "content": event.transcript
+                })
+                
             elif event.type == "response.text.done":
                 # 文本完成
                 await websocket.send_json({
@@ -444,7 +547,10 @@ class AzureVoiceService:
                 })
                 
             elif event.type == "response.done":
-                # 响应完成
+                # 响应完成，记录提示词缓存命中情况
+                response = getattr(event, "response", None)
+                if response is not None and getattr(response, "usage", None) is not None:
+                    record_usage("realtime", response.usage)
                 await websocket.send_json({
                     "type": "response_done"
                 })
@@ -460,7 +566,8 @@ class AzureVoiceService:
         audio_format: str = "pcm_s16le",
         sample_rate: int = 24000,
         channels: int = 1,
-        vad_confidence: float = 0.0
+        vad_confidence: float = 0.0,
+        position: Optional[str] = None
     ) -> None:
         """
         处理FastRTC增强的音频数据
@@ -473,6 +580,7 @@ class AzureVoiceService:
             sample_rate: 采样率
             channels: 声道数
             vad_confidence: 语音活动检测置信度
+            position: 面试方向（岗位类型）
         """
         if not self.client:
             await websocket.send_json({
@@ -512,8 +620,11 @@ class AzureVoiceService:
                        f"阈值={dynamic_threshold:.4f}, 时长={audio_duration_ms:.1f}ms")
             
             async with self.client.beta.realtime.connect(
-                model="gpt-4o-mini-realtime-preview"
+                model=AzureRealtimeConfig.DEPLOYMENT
             ) as connection:
+                # 静态面试官指令只取决于岗位，放在会话instructions中
+                instructions, resume_message = self._build_system_prompt(resume_context, position)
+                
                 # 配置会话支持音频输入
                 await connection.session.update(
                     session={
@@ -522,18 +633,18 @@ class AzureVoiceService:
                         "output_audio_format": "pcm16",
                         "input_audio_transcription": {
                             "model": "whisper-1"
-                        }
+                        },
+                        "instructions": instructions
                     }
                 )
                 
-                # 构建系统提示词
-                if resume_context:
-                    system_prompt = self._build_system_prompt(resume_context)
+                # 候选人简历作为单独的system消息，放在静态指令之后
+                if resume_message:
                     await connection.conversation.item.create(
                         item={
                             "type": "message",
                             "role": "system",
-                            "content": [{"type": "input_text", "text": system_prompt}],
+                            "content": [{"type": "input_text", "text": resume_message}],
                         }
                     )
                 
@@ -564,153 +675,352 @@ class AzureVoiceService:
 # 全局Azure语音服务实例
 azure_voice_service: AzureVoiceService = None
 
-# 存储用户会话的简历内容
+# 存储用户会话的简历内容（进程内缓存，共享存储见session_store）
 user_sessions: Dict[str, str] = {}
 
+# 结构化简历渲染后的精简上下文（进程内LRU缓存，键为简历哈希）
+resume_profile_contexts: "OrderedDict[str, str]" = OrderedDict()
+
+# 简历哈希 → 规范简历哈希（近似重复的简历共享同一份缓存）
+canonical_resume_hashes: Dict[str, str] = {}
+
+# 事件循环看门狗
+loop_watchdog = LoopWatchdog(
+    threshold_ms=LoopWatchdogConfig.STALL_THRESHOLD_MS,
+    interval_ms=LoopWatchdogConfig.HEARTBEAT_INTERVAL_MS,
+    max_stacks=LoopWatchdogConfig.MAX_CAPTURED_STACKS
+)
+
+# 事件循环所在线程ID（启动时记录，供采样分析使用）
+main_loop_thread_id: Optional[int] = None
+
+# Realtime临时令牌池（需配置AZURE_OPENAI_API_KEY）
+token_broker: Optional[RealtimeTokenBroker] = None
+
+# Realtime区域健康检查
+region_health = RegionHealthService(
+    AzureRealtimeConfig.WEBRTC_CONFIGS,
+    probe_interval=RegionHealthConfig.PROBE_INTERVAL_S,
+    probe_timeout=RegionHealthConfig.PROBE_TIMEOUT_S,
+    alpha=RegionHealthConfig.EWMA_ALPHA,
+    failure_threshold=RegionHealthConfig.FAILURE_THRESHOLD,
+    cooldown=RegionHealthConfig.OPEN_COOLDOWN_S,
+    max_cooldown=RegionHealthConfig.MAX_COOLDOWN_S,
+    client_weight=RegionHealthConfig.CLIENT_REPORT_WEIGHT,
+    report_ttl=RegionHealthConfig.CLIENT_REPORT_TTL_S
+)
+
 # 简历存储目录
-RESUME_STORAGE_DIR = Path("resume_storage")
 RESUME_STORAGE_DIR.mkdir(exist_ok=True)
 
-def save_resume_to_file(resume_text: str, session_id: str) -> bool:
+# 跨worker共享的会话存储
+session_store = SessionStore(SessionStoreConfig.DB_PATH, busy_timeout_ms=SessionStoreConfig.BUSY_TIMEOUT_MS)
+
+# 服务端面试对话记录（/ws/voice 事件批量追加写入会话存储）
+transcript_log = TranscriptLog(
+    session_store,
+    flush_interval=TranscriptLogConfig.FLUSH_INTERVAL_MS / 1000,
+    max_batch=TranscriptLogConfig.MAX_BATCH,
+    max_pending=TranscriptLogConfig.MAX_PENDING
+) if TranscriptLogConfig.ENABLED else None
+
+# 面试评分汇总（保存评估时增量更新）
+score_analytics = ScoreAnalytics(session_store)
+
+# 简历全文倒排索引
+search_index = InvertedIndex(SearchIndexConfig.DIR, compact_threshold=SearchIndexConfig.COMPACT_THRESHOLD) \
+    if SearchIndexConfig.ENABLED else None
+
+# 简历与岗位匹配器（上传时自动选择面试方向）
+position_matcher = PositionMatcher(
+    InterviewPrompts.POSITION_SPECIFIC,
+    min_score=PositionMatchConfig.MIN_SCORE,
+    cache_size=PositionMatchConfig.CACHE_SIZE
+) if PositionMatchConfig.ENABLED else None
+
+# 近似重复简历检测（MinHash签名 + LSH分桶）
+min_hasher = MinHasher(num_perm=NearDuplicateConfig.NUM_PERM, bands=NearDuplicateConfig.BANDS) \
+    if NearDuplicateConfig.ENABLED else None
+
+# PDF解析器（长文档按页区间并行解析）
+pdf_extractor = PdfExtractor(
+    max_pages=PdfExtractConfig.MAX_PAGES,
+    page_timeout=PdfExtractConfig.PAGE_TIMEOUT_S,
+    parallel_min_pages=PdfExtractConfig.PARALLEL_MIN_PAGES,
+    workers=PdfExtractConfig.WORKERS,
+    pages_per_task=PdfExtractConfig.PAGES_PER_TASK
+)
+
+# /ws/voice 可恢复会话（断线后保留未确认的下行帧，带恢复令牌重连时重放）
+resume_registry = ResumeRegistry(
+    retention=WsResumeConfig.RETENTION_S,
+    max_frames=WsResumeConfig.MAX_FRAMES,
+    max_bytes=WsResumeConfig.MAX_BYTES,
+    max_sessions=WsResumeConfig.MAX_SESSIONS
+) if WsResumeConfig.ENABLED else None
+
+async def get_resume_context(session_id: str) -> str:
     """
-    将简历文本保存到文件
-    
+    按会话ID获取简历内容：进程内缓存 → 共享会话存储 → 简历文件
+
     Args:
-        resume_text: 简历文本内容
         session_id: 会话ID
-        
+
     Returns:
-        保存是否成功
+        简历文本内容，未找到时返回空字符串
     """
+    if not session_id:
+        return ""
+
+    cached = user_sessions.get(session_id)
+    if cached is not None:
+        return cached
+
+    content = None
     try:
-        resume_file = RESUME_STORAGE_DIR / f"{session_id}.txt"
-        with open(resume_file, 'w', encoding='utf-8') as f:
-            f.write(resume_text)
-        logger.info(f"简历已保存到文件: {resume_file}")
-        return True
+        content = await asyncio.to_thread(session_store.get_resume, session_id)
     except Exception as e:
-        logger.error(f"保存简历文件失败: {e}")
-        return False
+        logger.error(f"读取共享会话存储失败: {e}")
+
+    if content is None:
+        content = await asyncio.to_thread(load_resume_from_file, session_id)
 
-def load_resume_from_file(session_id: str) -> Optional[str]:
+    if content:
+        user_sessions[session_id] = content
+    return content or ""
+
+async def store_resume(session_id: str, resume_text: str) -> None:
     """
-    从文件加载简历文本
-    
+    保存简历内容到进程内缓存、共享会话存储和简历文件
+
     Args:
         session_id: 会话ID
-        
+        resume_text: 简历文本内容
+    """
+    user_sessions[session_id] = resume_text
+    try:
+        await asyncio.to_thread(session_store.save_resume, session_id, resume_text)
+    except Exception as e:
+        logger.error(f"写入共享会话存储失败: {e}")
+    await asyncio.to_thread(save_resume_to_file, resume_text, session_id)
+
+async def get_profile_context(resume_hash: str, resume_text: str = "") -> str:
+    """
+    获取注入prompt的精简简历上下文：进程内缓存 → 共享会话存储 → 由简历原文现场构建并保存
+
+    Args:
+        resume_hash: 简历内容哈希
+        resume_text: 简历原文，缓存未命中时用于构建
+
     Returns:
-        简历文本内容，如果文件不存在则返回None
+        精简后的简历上下文，无法获取时返回空字符串
     """
+    if not resume_hash:
+        return ""
+
+    cached = resume_profile_contexts.get(resume_hash)
+    if cached is not None:
+        resume_profile_contexts.move_to_end(resume_hash)
+        return cached
+
+    profile = None
     try:
-        resume_file = RESUME_STORAGE_DIR / f"{session_id}.txt"
-        if resume_file.exists():
-            with open(resume_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            logger.info(f"从文件加载简历: {resume_file}")
-            return content
-        return None
+        data = await asyncio.to_thread(session_store.get_profile, resume_hash)
+        if data:
+            profile = ResumeProfile.from_dict(data)
     except Exception as e:
-        logger.error(f"加载简历文件失败: {e}")
-        return None
+        logger.error(f"读取结构化简历失败: {e}")
+
+    if profile is None:
+        if not resume_text:
+            return ""
+        profile = await asyncio.to_thread(build_resume_profile, resume_text)
+        try:
+            await asyncio.to_thread(session_store.save_profile, resume_hash, profile.to_dict())
+        except Exception as e:
+            logger.error(f"写入结构化简历失败: {e}")
 
-def generate_resume_hash(resume_text: str) -> str:
+    # 规整后为空时退回去除联系方式并截断的原文，不注入原始简历
+    context = profile.to_context() or redact_resume_text(resume_text)
+    resume_profile_contexts[resume_hash] = context
+    while len(resume_profile_contexts) > ResumeProfileConfig.CONTEXT_CACHE_SIZE:
+        resume_profile_contexts.popitem(last=False)
+    return context
+
+async def get_session_prompt_context(session_id: str) -> str:
     """
-    生成简历内容的哈希值，用于去重和验证
-    
+    按会话ID获取精简简历上下文（会话ID即上传时的简历哈希，近似重复的简历使用规范简历的缓存）
+
     Args:
+        session_id: 会话ID
+
+    Returns:
+        精简后的简历上下文，未找到简历时返回空字符串
+    """
+    if not session_id:
+        return ""
+    canonical = await resolve_canonical_hash(session_id)
+    context = await get_profile_context(canonical)
+    if context:
+        return context
+    resume_text = await get_resume_context(session_id)
+    return await get_profile_context(canonical, resume_text) if resume_text else ""
+
+def _register_fingerprint(resume_hash: str, resume_text: str) -> tuple:
+    """计算MinHash签名，在LSH桶中查找近似重复的简历并登记（在工作线程中执行）"""
+    signature = min_hasher.signature(resume_text)
+    band_keys = min_hasher.band_keys(signature)
+    canonical, similarity = resume_hash, 1.0
+
+    existing = session_store.get_canonical_hash(resume_hash)
+    if existing:
+        return existing, similarity
+
+    match = min_hasher.best_match(signature, session_store.find_fingerprint_candidates(band_keys))
+    if match and match[0] != resume_hash and match[2] >= NearDuplicateConfig.THRESHOLD:
+        canonical, similarity = match[1], match[2]
+
+    session_store.save_fingerprint(resume_hash, canonical, min_hasher.to_bytes(signature), band_keys)
+    return canonical, similarity
+
+async def register_fingerprint(resume_hash: str, resume_text: str) -> tuple:
+    """
+    登记简历指纹并返回其规范简历哈希
+
+    Args:
+        resume_hash: 简历内容哈希
         resume_text: 简历文本内容
-        
+
     Returns:
-        简历内容的MD5哈希值
+        (规范简历哈希, 相似度)；不是近似重复时规范哈希即自身
     """
-    return hashlib.md5(resume_text.encode('utf-8')).hexdigest()[:16]
+    if min_hasher is None:
+        return resume_hash, 1.0
+    try:
+        canonical, similarity = await asyncio.to_thread(_register_fingerprint, resume_hash, resume_text)
+    except Exception as e:
+        logger.error(f"近似重复检测失败: {e}")
+        return resume_hash, 1.0
+    canonical_resume_hashes[resume_hash] = canonical
+    return canonical, similarity
 
-def extract_pdf_text(file_content: bytes) -> str:
+async def resolve_canonical_hash(resume_hash: str) -> str:
+    """获取简历的规范简历哈希（未登记时为自身）"""
+    if min_hasher is None or not resume_hash:
+        return resume_hash
+    canonical = canonical_resume_hashes.get(resume_hash)
+    if canonical is None:
+        try:
+            canonical = await asyncio.to_thread(session_store.get_canonical_hash, resume_hash) or resume_hash
+        except Exception as e:
+            logger.error(f"读取简历指纹失败: {e}")
+            return resume_hash
+        canonical_resume_hashes[resume_hash] = canonical
+    return canonical
+
+async def get_text_prompt_context(resume_text: str) -> str:
+    """由客户端提交的简历原文获取精简上下文，同一份简历只构建一次"""
+    if not resume_text:
+        return ""
+    canonical = await resolve_canonical_hash(generate_resume_hash(resume_text))
+    return await get_profile_context(canonical, resume_text)
+
+async def index_resume(session_id: str, resume_text: str, filename: str = "") -> None:
+    """
+    把简历加入全文索引（内容未变化时跳过）
+
+    Args:
+        session_id: 会话ID
+        resume_text: 简历文本内容
+        filename: 原始文件名
     """
-    从PDF文件内容中提取文本
+    if search_index is None:
+        return
+    meta = {"type": "resume", "session_id": session_id, "filename": filename, "indexed_at": time.time()}
+    try:
+        await asyncio.to_thread(search_index.add_document, f"resume:{session_id}", resume_text, meta)
+    except Exception as e:
+        logger.error(f"写入全文索引失败: {e}")
+
+def _load_search_index() -> None:
+    """加载全文索引；索引为空时从共享会话存储回填已有简历"""
+    search_index.load()
+    search_index.maybe_compact()
+    if search_index.document_count:
+        return
+    count = 0
+    for session_id, content in session_store.iter_resumes():
+        meta = {"type": "resume", "session_id": session_id, "filename": "", "indexed_at": time.time()}
+        search_index.add_document(f"resume:{session_id}", content, meta)
+        count += 1
+    if count:
+        search_index.compact()
+        logger.info(f"已为{count}份历史简历建立全文索引")
+
+async def get_session_position(session_id: str) -> Optional[str]:
+    """
+    获取会话简历匹配的面试方向（按简历哈希缓存，未命中时由简历原文计算）
+
+    Args:
+        session_id: 会话ID
+
+    Returns:
+        岗位类型，未启用匹配、没有简历或匹配度过低时返回None
+    """
+    if position_matcher is None or not session_id:
+        return None
+    resume_text = await get_resume_context(session_id)
+    if not resume_text:
+        return None
+    canonical = await resolve_canonical_hash(session_id)
+    position, _ = await asyncio.to_thread(position_matcher.select, canonical, resume_text)
+    return position
+
+def _as_stream(source: Union[bytes, BinaryIO]) -> BinaryIO:
+    """字节内容包装为文件流，文件流原样返回"""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return source
+
+def extract_pdf_text(source: Union[bytes, BinaryIO]) -> str:
+    """
+    从PDF文件中提取文本
     
     Args:
-        file_content: PDF文件的字节内容
+        source: PDF文件的字节内容或可seek的文件流
         
     Returns:
         提取出的文本内容
     """
     try:
-        pdf_file = io.BytesIO(file_content)
-        reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        
-        return text.strip()
+        return pdf_extractor.extract(source).text
     except Exception as e:
         logger.error(f"PDF解析失败: {e}")
         raise HTTPException(status_code=400, detail=f"PDF文件解析失败: {str(e)}")
 
-def extract_docx_text(file_content: bytes) -> str:
+def extract_docx_text(source: Union[bytes, BinaryIO]) -> str:
     """
-    从Word文档内容中提取文本
+    从Word文档中提取文本（流式解析document.xml，包含表格内容）
     
     Args:
-        file_content: Word文档的字节内容
+        source: Word文档的字节内容或可seek的文件流
         
     Returns:
         提取出的文本内容
     """
     try:
-        docx_file = io.BytesIO(file_content)
-        doc = Document(docx_file)
-        text = ""
-        
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text += paragraph.text + "\n"
-        
-        return text.strip()
+        return extract_docx_stream(_as_stream(source)).strip()
     except Exception as e:
         logger.error(f"Word文档解析失败: {e}")
         raise HTTPException(status_code=400, detail=f"Word文档解析失败: {str(e)}")
 
-def validate_file(file: UploadFile) -> None:
-    """
-    验证上传的文件
-    
-    Args:
-        file: 上传的文件对象
-    """
-    # 检查文件大小 (最大10MB)
-    max_size = 10 * 1024 * 1024  # 10MB
-    
-    # 检查文件类型
-    allowed_extensions = {'.pdf', '.doc', '.docx'}
-    allowed_mime_types = {
-        'application/pdf',
-        'application/msword',
-        'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-    }
-    
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="文件名不能为空")
-    
-    file_extension = Path(file.filename).suffix.lower()
-    if file_extension not in allowed_extensions:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"不支持的文件格式。支持的格式: {', '.join(allowed_extensions)}"
-        )
-    
-    if file.content_type not in allowed_mime_types:
-        logger.warning(f"文件MIME类型检查: {file.content_type}")
-        # 不强制检查MIME类型，因为有些浏览器可能发送不准确的类型
-
 @app.on_event("startup")
 async def startup_event():
     """应用启动时的初始化"""
-    global azure_voice_service, evaluation_service
+    global azure_voice_service, evaluation_service, main_loop_thread_id, token_broker
+    main_loop_thread_id = threading.get_ident()
+    # asyncio.to_thread 的工作按发起请求的路由归类，供按路由的采样分析统计
+    asyncio.get_running_loop().set_default_executor(RouteTrackingExecutor(thread_name_prefix="asyncio"))
     try:
         azure_voice_service = AzureVoiceService()
         evaluation_service = InterviewEvaluationService()
@@ -718,6 +1028,43 @@ async def startup_event():
     except Exception as e:
         logger.error(f"服务初始化失败: {e}")
 
+    if LoopWatchdogConfig.ENABLED:
+        loop_watchdog.start()
+
+    azure_api_key = os.getenv("AZURE_OPENAI_API_KEY")
+    if TokenBrokerConfig.ENABLED and azure_api_key:
+        token_broker = RealtimeTokenBroker(
+            sessions_url=AzureRealtimeConfig.SESSIONS_URL,
+            api_key=azure_api_key,
+            session_payload=AzureRealtimeConfig.get_session_payload(),
+            pool_size=TokenBrokerConfig.POOL_SIZE,
+            safety_margin=TokenBrokerConfig.SAFETY_MARGIN_S
+        )
+        token_broker.start()
+
+    if RegionHealthConfig.ENABLED:
+        region_health.start()
+
+    if transcript_log is not None:
+        transcript_log.start()
+
+    if search_index is not None:
+        try:
+            await asyncio.to_thread(_load_search_index)
+        except Exception as e:
+            logger.error(f"加载全文索引失败: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时的清理"""
+    await loop_watchdog.stop()
+    pdf_extractor.shutdown()
+    if token_broker:
+        await token_broker.stop()
+    await region_health.stop()
+    if transcript_log is not None:
+        await transcript_log.stop()
+
 @app.get("/")
 async def read_root():
     """返回主页面"""
@@ -727,10 +1074,29 @@ from pydantic import BaseModel
 
 class PromptRequest(BaseModel):
     resume_context: str = ""
+    session_id: str = ""
+
+class RegionReportRequest(BaseModel):
+    # /api/realtime/token 返回的会话ID
+    session_id: str
+    url: str
+    success: bool
+    latency_ms: Optional[float] = None
+    error: str = ""
+
+class InterviewRecordRequest(BaseModel):
+    interview_id: str
+    messages: list = []
+    duration: int = 0
+    session_id: str = ""
+    created_at: str = ""
+    # 迁移旧版本本地记录时附带的评估结果
+    evaluation: Optional[dict] = None
 
 class InterviewEvaluationRequest(BaseModel):
     interview_id: str
-    messages: list
+    # 为空时使用服务端记录的对话（/ws/voice 按 interview_id 记录）
+    messages: list = []
     resume_context: str = ""
     duration: int = 0
     session_id: str = ""
@@ -741,19 +1107,30 @@ async def get_voice_call_prompt_api(request: PromptRequest) -> JSONResponse:
     获取语音通话专用prompt
     
     Args:
-        request: 包含resume_context的请求体
+        request: 包含resume_context或session_id的请求体
         
     Returns:
         prompt指令
     """
     try:
-        resume_context = request.resume_context
-        instructions = get_voice_call_prompt(resume_context=resume_context)
+        # 使用上传时生成的精简简历上下文，而不是原始简历全文
+        position = None
+        if request.session_id:
+            resume_context = await get_session_prompt_context(request.session_id)
+            position = await get_session_position(request.session_id)
+        else:
+            resume_context = await get_text_prompt_context(request.resume_context)
+            if position_matcher is not None and request.resume_context:
+                position, _ = await asyncio.to_thread(
+                    position_matcher.select, generate_resume_hash(request.resume_context), request.resume_context
+                )
+        instructions = render_voice_call_prompt(resume_context, position)
         
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "success": True,
             "instructions": instructions,
-            "has_resume": bool(resume_context)
+            "has_resume": bool(resume_context),
+            "position": position
         })
         
     except Exception as e:
@@ -771,7 +1148,7 @@ async def get_voice_call_default_prompt() -> JSONResponse:
     try:
         from prompts import InterviewPrompts
         
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "success": True,
             "instructions": InterviewPrompts.VOICE_CALL_INTERVIEWER,
             "source": "prompts.py - VOICE_CALL_INTERVIEWER"
@@ -815,7 +1192,7 @@ async def list_prompts() -> JSONResponse:
             }
         }
         
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "success": True,
             "prompts": prompt_info,
             "message": "所有prompt配置已从prompts.py文件中集中管理"
@@ -859,7 +1236,7 @@ async def validate_prompt_management() -> JSONResponse:
             ]
         }
         
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "success": True,
             "validation": validation_result,
             "message": "Prompt管理验证完成 - 所有配置已集中到prompts.py"
@@ -870,7 +1247,8 @@ async def validate_prompt_management() -> JSONResponse:
         raise HTTPException(status_code=500, detail=f"服务器内部错误: {str(e)}")
 
 @app.post("/api/interview/evaluate")
-async def evaluate_interview_api(request: InterviewEvaluationRequest) -> JSONResponse:
+async def evaluate_interview_api(request: InterviewEvaluationRequest,
+                                 x_client_id: Optional[str] = Header(None)) -> JSONResponse:
     """
     评估面试表现
     
@@ -884,59 +1262,270 @@ async def evaluate_interview_api(request: InterviewEvaluationRequest) -> JSONRes
         logger.info(f"收到面试评估请求: ID={request.interview_id}")
         
         # 构建面试数据
+        # 评估同样使用精简简历上下文
+        if request.session_id:
+            resume_context = await get_session_prompt_context(request.session_id)
+        else:
+            resume_context = ""
+        if not resume_context:
+            resume_context = await get_text_prompt_context(request.resume_context)
+        
+        owner_id = x_client_id if is_valid_client_id(x_client_id) else ""
+        messages = request.messages
+        if not messages and transcript_log is not None:
+            # 只读取当前客户端记录的对话
+            messages = await transcript_log.get_messages(request.interview_id, owner_id)
+        if not messages:
+            raise HTTPException(status_code=404, detail="未找到该面试的对话记录")
+        
         interview_data = {
             'id': request.interview_id,
-            'messages': request.messages,
-            'resume_context': request.resume_context,
+            'messages': messages,
+            'resume_context': resume_context,
             'duration': request.duration,
             'session_id': request.session_id
         }
         
-        # 调用评分服务
-        evaluation_result = await evaluation_service.evaluate_interview(interview_data)
+        # 调用评分服务（经评估队列限流）
+        if AdmissionConfig.ENABLED:
+            async with admission_controller.evaluation_slot():
+                evaluation_result = await evaluation_service.evaluate_interview(interview_data)
+        else:
+            evaluation_result = await evaluation_service.evaluate_interview(interview_data)
         
         # 保存评估结果到面试记录
         if evaluation_result.get('success', False):
-            await save_evaluation_to_interview(request.interview_id, evaluation_result)
+            position = await get_session_position(request.session_id)
+            await save_evaluation_to_interview(request.interview_id, evaluation_result, owner_id, position)
         
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "success": True,
             "evaluation": evaluation_result,
             "message": "面试评估完成"
         })
         
+    except HTTPException:
+        raise
+    except AdmissionRejected as e:
+        logger.warning(f"面试评估被准入控制拒绝: {e.code}")
+        return FastJSONResponse(
+            status_code=e.status_code,
+            content=e.to_detail(),
+            headers={"Retry-After": str(max(1, int(e.retry_after + 0.999)))}
+        )
     except Exception as e:
         logger.error(f"面试评估API失败: {e}")
         raise HTTPException(status_code=500, detail=f"面试评估失败: {str(e)}")
 
-async def save_evaluation_to_interview(interview_id: str, evaluation_result: dict) -> bool:
+async def save_evaluation_to_interview(interview_id: str, evaluation_result: dict, owner_id: str = "",
+                                       position: Optional[str] = None) -> bool:
     """
-    保存评估结果到面试记录
+    保存评估结果到面试记录，并增量更新评分汇总
     
     Args:
         interview_id: 面试ID
         evaluation_result: 评估结果
+        owner_id: 客户端ID；为空时只能新建记录，不能覆盖已有记录
+        position: 面试方向，用于按方向统计评分
         
     Returns:
         bool: 保存是否成功
     """
     try:
-        # 这里可以实现将评估结果保存到数据库或文件
-        # 目前先记录日志
         logger.info(f"保存面试评估结果: ID={interview_id}, 总分={evaluation_result.get('total_score', 'N/A')}")
         
-        # 可以扩展为保存到数据库
-        # 例如: await db.interviews.update_one(
-        #     {"id": interview_id}, 
-        #     {"$set": {"evaluation": evaluation_result}}
-        # )
-        
-        return True
+        saved = await asyncio.to_thread(
+            score_analytics.save_evaluation, interview_id, owner_id, evaluation_result, position
+        )
+        if not saved:
+            logger.warning(f"面试记录已存在且不属于当前客户端，未覆盖评估结果: ID={interview_id}")
+        return saved
         
     except Exception as e:
         logger.error(f"保存评估结果失败: {e}")
         return False
 
+async def require_client_id(x_client_id: Optional[str] = Header(None)) -> str:
+    """
+    校验客户端ID，面试历史按它隔离
+
+    Args:
+        x_client_id: 请求头 X-Client-Id（浏览器生成并保存在本地）
+    """
+    if not is_valid_client_id(x_client_id):
+        raise HTTPException(status_code=400, detail="缺少或无效的X-Client-Id请求头")
+    return x_client_id
+
+@app.get("/api/interviews")
+async def list_interviews_api(cursor: str = "", limit: int = 0, sort: str = "date_desc",
+                              client_id: str = Depends(require_client_id)) -> JSONResponse:
+    """
+    分页获取面试历史摘要（不含对话和评估详情）
+
+    Args:
+        cursor: 上一页返回的 next_cursor，为空时返回第一页
+        limit: 每页条数
+        sort: date_desc / date_asc / duration_desc
+
+    Returns:
+        面试摘要列表和下一页游标（没有更多时为null）
+    """
+    if sort not in INTERVIEW_SORTS:
+        raise HTTPException(status_code=400, detail=f"不支持的排序方式: {sort}")
+    limit = min(max(limit or HistoryConfig.PAGE_SIZE, 1), HistoryConfig.MAX_PAGE_SIZE)
+    try:
+        after = decode_cursor(cursor, sort) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    items = await asyncio.to_thread(session_store.list_interviews, client_id, sort, after, limit + 1)
+    items, next_cursor = page_of(items, sort, limit)
+    return FastJSONResponse(content={
+        "success": True,
+        "interviews": [summary_to_json(item) for item in items],
+        "next_cursor": next_cursor
+    })
+
+@app.post("/api/interviews")
+async def save_interview_api(request: InterviewRecordRequest,
+                             client_id: str = Depends(require_client_id)) -> JSONResponse:
+    """
+    保存面试记录摘要
+
+    /ws/voice 已按 interview_id 记录了对话时只保存摘要；否则把请求中的 messages 写入对话记录
+    （WebRTC直连的语音面试只有前端持有对话）。
+    """
+    if not request.interview_id or len(request.interview_id) > 64:
+        raise HTTPException(status_code=400, detail="无效的面试ID")
+    if len(request.messages) > HistoryConfig.MAX_MESSAGES:
+        raise HTTPException(status_code=413, detail=f"对话条数超过上限 {HistoryConfig.MAX_MESSAGES}")
+    evaluation = None
+    if request.evaluation:
+        try:
+            evaluation = normalize_evaluation(request.evaluation)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"无效的评估结果: {e}")
+
+    if transcript_log is not None:
+        await transcript_log.flush()
+    message_count = await asyncio.to_thread(session_store.count_transcript, request.interview_id, client_id)
+    if not message_count and request.messages:
+        now = time.time()
+        entries = [
+            (request.interview_id, client_id, request.session_id, msg.get('type', ''), msg.get('content', ''),
+             parse_timestamp(msg.get('timestamp', ''), now))
+            for msg in request.messages
+            if isinstance(msg, dict) and msg.get('type') in ('user', 'assistant') and msg.get('content')
+        ]
+        message_count = await asyncio.to_thread(session_store.append_transcript, entries) if entries else 0
+
+    saved = await asyncio.to_thread(
+        session_store.save_interview,
+        request.interview_id, client_id, request.session_id,
+        parse_timestamp(request.created_at, time.time()), max(request.duration, 0), message_count
+    )
+    if not saved:
+        raise HTTPException(status_code=409, detail="面试ID已被占用")
+    if evaluation:
+        position = await get_session_position(request.session_id)
+        await save_evaluation_to_interview(request.interview_id, evaluation, client_id, position)
+    return FastJSONResponse(content={"success": True, "interview_id": request.interview_id,
+                                     "message_count": message_count})
+
+@app.get("/api/interviews/{interview_id}")
+async def get_interview_api(interview_id: str, client_id: str = Depends(require_client_id)) -> JSONResponse:
+    """
+    获取单场面试的完整记录（摘要、评估结果和对话）
+    """
+    item = await asyncio.to_thread(session_store.get_interview, client_id, interview_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="面试记录不存在")
+    interview = summary_to_json(item)
+    interview["evaluation"] = item["evaluation"]
+    if transcript_log is not None:
+        interview["messages"] = await transcript_log.get_messages(interview_id, client_id)
+    else:
+        interview["messages"] = to_messages(
+            await asyncio.to_thread(session_store.get_transcript, interview_id, client_id)
+        )
+    return FastJSONResponse(content={"success": True, "interview": interview})
+
+@app.delete("/api/interviews/{interview_id}")
+async def delete_interview_api(interview_id: str, client_id: str = Depends(require_client_id)) -> JSONResponse:
+    """删除单场面试记录及其对话"""
+    deleted = await asyncio.to_thread(score_analytics.delete_interviews, client_id, interview_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="面试记录不存在")
+    return FastJSONResponse(content={"success": True, "deleted": deleted})
+
+@app.delete("/api/interviews")
+async def clear_interviews_api(client_id: str = Depends(require_client_id)) -> JSONResponse:
+    """清空当前客户端的全部面试记录"""
+    deleted = await asyncio.to_thread(score_analytics.delete_interviews, client_id)
+    return FastJSONResponse(content={"success": True, "deleted": deleted})
+
+@app.post("/api/realtime/token")
+async def get_realtime_token() -> JSONResponse:
+    """
+    从预申请的令牌池中获取一个Realtime会话临时令牌
+
+    Returns:
+        临时令牌及WebRTC连接所需的部署、音色和端点信息
+    """
+    if token_broker is None:
+        raise HTTPException(status_code=503, detail="Realtime令牌服务未启用，请配置AZURE_OPENAI_API_KEY")
+
+    try:
+        token = await token_broker.acquire()
+    except TokenBrokerError as e:
+        logger.error(f"获取Realtime临时令牌失败: {e}")
+        raise HTTPException(status_code=502, detail=str(e))
+
+    region_health.allow_reports(token["session_id"])
+    return FastJSONResponse(content={
+        "success": True,
+        "session_id": token["session_id"],
+        "client_secret": token["client_secret"],
+        "expires_at": token["expires_at"],
+        "pool_hit": token["pool_hit"],
+        "deployment": AzureRealtimeConfig.DEPLOYMENT,
+        "voice": AzureRealtimeConfig.VOICE,
+        # 按区域健康得分排序，通话从最快的健康区域开始尝试
+        "webrtc_configs": region_health.ranked_configs()
+    })
+
+@app.get("/api/realtime/regions")
+async def get_realtime_regions() -> JSONResponse:
+    """
+    获取各Realtime区域的健康状态（按优先顺序）
+
+    Returns:
+        区域延迟、错误率、熔断状态和排序后的端点列表
+    """
+    return FastJSONResponse(content={
+        "success": True,
+        "regions": region_health.snapshot(),
+        "webrtc_configs": region_health.ranked_configs()
+    })
+
+@app.post("/api/realtime/regions/report")
+async def report_realtime_region(request: RegionReportRequest) -> JSONResponse:
+    """
+    上报客户端实际连接某区域的结果，计入该区域的客户端信号（权重有上限，不触发熔断）
+
+    Args:
+        request: 令牌会话ID、区域URL、是否成功、耗时和错误信息
+    """
+    try:
+        known = region_health.report(request.session_id, request.url, request.success, request.latency_ms)
+    except RegionReportRejected as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    if not known:
+        raise HTTPException(status_code=404, detail="未知的区域端点")
+    if not request.success:
+        logger.info(f"客户端上报区域连接失败: {request.url} {request.error}")
+    return FastJSONResponse(content={"success": True})
+
 @app.get("/api/resume/{session_id}")
 async def get_resume_content(session_id: str) -> JSONResponse:
     """
@@ -949,13 +1538,13 @@ async def get_resume_content(session_id: str) -> JSONResponse:
         简历内容
     """
     try:
-        # 从内存或文件获取简历内容
-        resume_content = user_sessions.get(session_id) or load_resume_from_file(session_id)
+        # 从内存、共享存储或文件获取简历内容
+        resume_content = await get_resume_context(session_id)
         
         if not resume_content:
             raise HTTPException(status_code=404, detail="未找到对应的简历内容")
         
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "success": True,
             "session_id": session_id,
             "content": resume_content,
@@ -981,18 +1570,18 @@ async def upload_resume(file: UploadFile = File(...)) -> JSONResponse:
     """
     try:
         # 验证文件
-        validate_file(file)
+        validate_file(file, UploadConfig.MAX_SIZE_BYTES)
         
-        # 读取文件内容
-        file_content = await file.read()
+        # 分块读取已落入临时文件的上传内容，超限立即中止，同时计算原始文件摘要
+        upload = await spool_upload(file, UploadConfig.MAX_SIZE_BYTES, UploadConfig.CHUNK_SIZE_BYTES)
         
-        # 根据文件类型解析文本
+        # 根据文件类型解析文本（解析器直接读取临时文件，在工作线程中执行避免阻塞事件循环）
         file_extension = Path(file.filename).suffix.lower()
         
         if file_extension == '.pdf':
-            resume_text = extract_pdf_text(file_content)
+            resume_text = await asyncio.to_thread(extract_pdf_text, upload.stream)
         elif file_extension in ['.doc', '.docx']:
-            resume_text = extract_docx_text(file_content)
+            resume_text = await asyncio.to_thread(extract_docx_text, upload.stream)
         else:
             raise HTTPException(status_code=400, detail="不支持的文件格式")
         
@@ -1004,19 +1593,44 @@ async def upload_resume(file: UploadFile = File(...)) -> JSONResponse:
         session_id = generate_resume_hash(resume_text)
         
         # 保存简历内容
-        user_sessions[session_id] = resume_text
-        save_resume_to_file(resume_text, session_id)
+        await store_resume(session_id, resume_text)
+        
+        # 近似重复检测：重新导出、个别字符改动的简历复用已有简历的缓存
+        canonical_id, similarity = await register_fingerprint(session_id, resume_text)
+        is_duplicate = canonical_id != session_id
+        if is_duplicate:
+            logger.info(f"检测到近似重复简历: {session_id} ≈ {canonical_id}, 相似度: {similarity:.3f}")
         
-        logger.info(f"简历上传成功: {file.filename}, 会话ID: {session_id}, 内容长度: {len(resume_text)}")
+        # 上传时一次性完成简历结构化，后续每轮对话和评估直接使用精简上下文
+        profile_context = await get_profile_context(canonical_id, resume_text)
+        if not is_duplicate:
+            await index_resume(session_id, resume_text, file.filename)
         
-        return JSONResponse(content={
+        # 自动匹配面试方向
+        position, position_scores = None, {}
+        if position_matcher is not None:
+            position, position_scores = await asyncio.to_thread(position_matcher.select, canonical_id, resume_text)
+        
+        logger.info(f"简历上传成功: {file.filename}, 会话ID: {session_id}, 文件大小: {upload.size}, 内容长度: {len(resume_text)}")
+        
+        response = FastJSONResponse(content={
             "success": True,
             "message": "简历上传并解析成功",
             "session_id": session_id,
             "filename": file.filename,
+            "file_size": upload.size,
+            "file_sha256": upload.sha256,
             "content_length": len(resume_text),
+            "profile_length": len(profile_context),
+            "position": position,
+            "position_scores": position_scores,
+            "duplicate_of": canonical_id if is_duplicate else None,
+            "similarity": round(similarity, 3),
             "preview": resume_text[:200] + "..." if len(resume_text) > 200 else resume_text
         })
+        # 会话cookie供亲和代理把后续请求路由到同一worker
+        response.set_cookie(AffinityConfig.COOKIE_NAME, session_id, httponly=True, samesite="lax")
+        return response
         
     except HTTPException:
         raise
@@ -1030,15 +1644,103 @@ async def websocket_voice_endpoint(websocket: WebSocket):
     await websocket.accept()
     logger.info("Azure语音WebSocket连接已建立 - FastRTC增强模式")
     
+    # 准入控制：语音会话并发上限（全局 / 单IP）
+    client_address = client_ip(websocket.scope, AdmissionConfig.TRUST_FORWARDED_FOR)
+    rate_limiter = None
+    if AdmissionConfig.ENABLED:
+        try:
+            admission_controller.acquire_voice_session(client_address)
+        except AdmissionRejected as e:
+            logger.warning(f"语音会话被准入控制拒绝: IP={client_address}, 原因={e.code}")
+            await websocket.send_json(e.to_frame())
+            await websocket.close(code=1013)
+            return
+        rate_limiter = admission_controller.voice_session_limiter()
+    
     # 存储当前活跃的Azure连接，用于打断处理
     current_azure_connection = None
     
+    # 下行帧统一经发送器：有界队列 + 独立写协程，慢客户端不会卡住上游事件处理；
+    # 再合并连续的文本/转录增量，减少小帧发送次数
+    send_queue = QueuedSender(
+        websocket,
+        max_frames=WsSendConfig.QUEUE_MAX_FRAMES,
+        policy=WsSendConfig.OVERFLOW_POLICY,
+        block_timeout=WsSendConfig.BLOCK_TIMEOUT_S
+    )
+    send_queue.start()
+    
+    # 会话恢复：下行帧经可恢复会话编号并保留到客户端确认；带 resume_token 重连时重放未确认的帧，
+    # 断线前进行中的回复会继续写入会话并在重连后送达
+    resume_session = None
+    downstream = send_queue
+    resume_token = websocket.query_params.get("resume_token", "")
+    # 客户端以 resume=1 声明支持序号与确认，未声明的旧客户端不保留下行帧
+    if resume_registry is not None and (resume_token or websocket.query_params.get("resume") == "1"):
+        last_seq = None
+        if resume_token:
+            resume_session = resume_registry.resume(resume_token)
+            if resume_session is not None:
+                try:
+                    last_seq = max(0, int(websocket.query_params.get("last_seq", "0")))
+                except ValueError:
+                    last_seq = 0
+            else:
+                logger.info("恢复令牌无效或已过期，创建新会话")
+        if resume_session is None:
+            resume_session = resume_registry.create()
+        replayed, previous = await resume_session.attach(send_queue, last_seq)
+        if last_seq is not None:
+            logger.info(f"语音会话已恢复: last_seq={last_seq}, 重放 {replayed} 帧")
+        if previous is not None:
+            # 旧连接尚未被发现断开，由新连接接管后关闭
+            try:
+                await previous.websocket.close(code=1000)
+            except Exception:
+                pass
+        downstream = resume_session
+    
+    coalescer = None
+    if WsSendConfig.COALESCE_INTERVAL_MS > 0:
+        coalescer = CoalescingSender(
+            downstream,
+            flush_interval=WsSendConfig.COALESCE_INTERVAL_MS / 1000,
+            max_chars=WsSendConfig.COALESCE_MAX_CHARS
+        )
+        downstream = coalescer
+    
+    # 对话记录：消息携带 interview_id（或连接参数指定）时记录候选人输入和面试官回复；
+    # 记录按连接参数 client_id 隔离，未提供有效客户端ID的连接不记录
+    recorder = None
+    default_interview_id = websocket.query_params.get("interview_id", "")
+    ws_client_id = websocket.query_params.get("client_id", "")
+    if transcript_log is not None and is_valid_client_id(ws_client_id):
+        recorder = TranscriptRecorder(downstream, transcript_log, ws_client_id)
+        downstream = recorder
+    sender = downstream
+    
     try:
         while True:
             # 接收消息
-            data = await websocket.receive_json()
+            data = json_loads(await websocket.receive_text())
             message_type = data.get("type")
             
+            if message_type == "ack":
+                # 客户端确认已收到的下行帧序号，释放保留的帧
+                if resume_session is not None:
+                    try:
+                        resume_session.ack(int(data.get("seq", 0)))
+                    except (TypeError, ValueError):
+                        pass
+                continue
+            
+            # 消息速率与音频时长速率限制，超限的消息直接丢弃并返回错误帧
+            if rate_limiter:
+                rejection = rate_limiter.check(data)
+                if rejection:
+                    await sender.send_json(rejection.to_frame())
+                    continue
+            
             if message_type == "chat":
                 message = data.get("message", "")
                 session_id = data.get("session_id", "")
@@ -1046,12 +1748,15 @@ async def websocket_voice_endpoint(websocket: WebSocket):
                 if message.strip():
                     logger.info(f"收到语音聊天消息: {message}")
                     
-                    # 获取简历上下文
-                    resume_context = ""
-                    if session_id:
-                        resume_context = user_sessions.get(session_id) or load_resume_from_file(session_id)
+                    # 获取精简简历上下文
+                    resume_context = await get_session_prompt_context(session_id)
+                    position = await get_session_position(session_id)
                     
-                    await azure_voice_service.chat_with_voice(message, websocket, resume_context)
+                    if recorder is not None:
+                        recorder.start_turn(data.get("interview_id") or default_interview_id, session_id, message)
+                    await azure_voice_service.chat_with_voice(message, sender, resume_context, position)
+                    if recorder is not None:
+                        recorder.end_turn()
                     
             elif message_type == "voice_input":
                 # FastRTC增强的语音输入处理
@@ -1065,21 +1770,25 @@ async def websocket_voice_endpoint(websocket: WebSocket):
                 if audio_data:
                     logger.info(f"收到FastRTC音频数据: 格式={audio_format}, 采样率={sample_rate}, VAD置信度={vad_confidence:.3f}")
                     
-                    # 获取简历上下文
-                    resume_context = ""
-                    if session_id:
-                        resume_context = user_sessions.get(session_id) or load_resume_from_file(session_id)
+                    # 获取精简简历上下文
+                    resume_context = await get_session_prompt_context(session_id)
+                    position = await get_session_position(session_id)
                     
-                    # 处理FastRTC音频输入
+                    # 处理FastRTC音频输入（候选人发言以转写帧记录）
+                    if recorder is not None:
+                        recorder.start_turn(data.get("interview_id") or default_interview_id, session_id)
                     await azure_voice_service.process_fastrtc_audio(
                         audio_data, 
-                        websocket, 
+                        sender, 
                         resume_context,
                         audio_format=audio_format,
                         sample_rate=sample_rate,
                         channels=channels,
-                        vad_confidence=vad_confidence
+                        vad_confidence=vad_confidence,
+                        position=position
                     )
+                    if recorder is not None:
+                        recorder.end_turn()
                     
             elif message_type == "interrupt_request":
                 # 处理打断请求
@@ -1100,7 +1809,7 @@ async def websocket_voice_endpoint(websocket: WebSocket):
                         logger.error(f"中断Azure连接失败: {e}")
                 
                 # 发送打断确认
-                await websocket.send_json({
+                await sender.send_json({
                     "type": "interrupt_acknowledged",
                     "session_id": session_id,
                     "timestamp": timestamp,
@@ -1115,25 +1824,36 @@ async def websocket_voice_endpoint(websocket: WebSocket):
                 session_id = data.get("session_id", "")
                 logger.info(f"语音输入结束: 会话ID={session_id}")
                 
-                await websocket.send_json({
+                await sender.send_json({
                     "type": "voice_input_complete",
                     "message": "语音输入处理完成"
                 })
                 
             elif message_type == "ping":
-                await websocket.send_json({"type": "pong"})
+                await sender.send_json({"type": "pong"})
                 
     except WebSocketDisconnect:
         logger.info("Azure语音WebSocket连接已断开")
     except Exception as e:
         logger.error(f"Azure语音WebSocket错误: {e}")
         try:
-            await websocket.send_json({
+            await sender.send_json({
                 "type": "error",
                 "message": f"服务器错误: {str(e)}"
             })
         except:
             pass
+    finally:
+        if resume_session is not None:
+            # 先解绑连接再刷出剩余帧，断开期间的帧只写入会话，等待重连重放
+            resume_registry.detach(resume_session, send_queue)
+        if recorder is not None:
+            recorder.end_turn()
+        if coalescer is not None:
+            await coalescer.close()
+        await send_queue.close()
+        if AdmissionConfig.ENABLED:
+            admission_controller.release_voice_session(client_address)
 
 @app.get("/health")
 async def health_check():
@@ -1144,6 +1864,277 @@ async def health_check():
         "azure_client_ready": azure_voice_service.client is not None if azure_voice_service else False
     }
 
+@app.get("/api/metrics")
+async def get_metrics() -> JSONResponse:
+    """
+    获取进程内运行时指标
+
+    Returns:
+        所有已注册指标的当前值
+    """
+    return FastJSONResponse(content={
+        "success": True,
+        "pid": os.getpid(),
+        "metrics": metrics.snapshot()
+    })
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    校验管理接口令牌
+
+    Args:
+        x_admin_token: 请求头 X-Admin-Token
+    """
+    if not AdminConfig.TOKEN:
+        raise HTTPException(status_code=403, detail="管理接口未启用，请配置ADMIN_TOKEN")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, AdminConfig.TOKEN):
+        raise HTTPException(status_code=401, detail="管理令牌无效")
+
+@app.get("/api/debug/loop-stalls", dependencies=[Depends(require_admin)])
+async def get_loop_stalls() -> JSONResponse:
+    """
+    获取事件循环阻塞统计及最近捕获的阻塞调用栈
+
+    Returns:
+        看门狗状态和最近N次阻塞记录
+    """
+    return FastJSONResponse(content={
+        "success": True,
+        "watchdog": loop_watchdog.stats(),
+        "stalls": loop_watchdog.recent_stalls()
+    })
+
+@app.post("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def run_sampling_profile(
+    duration: float = ProfilerConfig.DEFAULT_DURATION_S,
+    interval_ms: float = ProfilerConfig.DEFAULT_INTERVAL_MS,
+    route: Optional[str] = None,
+    include_idle: bool = False,
+    format: str = "collapsed"
+):
+    """
+    对当前进程执行一次限时统计采样
+
+    Args:
+        duration: 采样时长（秒），不超过PROFILER_MAX_DURATION_S
+        interval_ms: 采样间隔（毫秒）
+        route: 只统计匹配该路由前缀的请求，如 /api/upload-resume、/ws/voice
+        include_idle: 是否包含事件循环空闲样本
+        format: collapsed（flamegraph折叠栈文本）或 json
+
+    Returns:
+        折叠栈文本或JSON格式的采样结果
+    """
+    if not ProfilerConfig.ENABLED:
+        raise HTTPException(status_code=403, detail="采样分析未启用，请配置PROFILER_ENABLED")
+    if format not in ("collapsed", "json"):
+        raise HTTPException(status_code=400, detail="format仅支持collapsed或json")
+    if sampling_profiler.busy:
+        raise HTTPException(status_code=409, detail="已有分析会话正在进行")
+
+    duration = min(max(duration, 0.1), ProfilerConfig.MAX_DURATION_S)
+    interval = max(interval_ms, ProfilerConfig.MIN_INTERVAL_MS) / 1000.0
+
+    logger.info(f"开始采样分析: 时长={duration}s, 间隔={interval * 1000:.1f}ms, 路由={route or '全部'}")
+    try:
+        result = await asyncio.to_thread(
+            sampling_profiler.profile,
+            asyncio.get_running_loop(),
+            main_loop_thread_id or threading.get_ident(),
+            duration,
+            interval,
+            route,
+            include_idle
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    collapsed = sampling_profiler.to_collapsed(result["stacks"])
+    if format == "collapsed":
+        return PlainTextResponse(collapsed)
+
+    return FastJSONResponse(content={
+        "success": True,
+        "pid": os.getpid(),
+        "duration_s": result["duration_s"],
+        "interval_ms": result["interval_ms"],
+        "route": result["route"],
+        "ticks": result["ticks"],
+        "samples": result["samples"],
+        "excluded": result["excluded"],
+        "collapsed": collapsed
+    })
+
+@app.get("/api/positions/{position}/rank", dependencies=[Depends(require_admin)])
+async def rank_resumes_for_position(position: str, limit: int = 100) -> JSONResponse:
+    """
+    按与指定岗位的匹配度对所有已存储简历排序
+
+    Args:
+        position: 岗位类型 (frontend/backend/fullstack/ai_ml/data_science)
+        limit: 返回条数
+
+    Returns:
+        按匹配度降序的简历列表
+    """
+    if position_matcher is None:
+        raise HTTPException(status_code=503, detail="岗位匹配未启用")
+    if position not in position_matcher.names:
+        raise HTTPException(status_code=404, detail=f"未知岗位: {position}")
+
+    limit = min(max(limit, 1), PositionMatchConfig.MAX_RANK_RESULTS)
+    started = time.perf_counter()
+    results = await asyncio.to_thread(position_matcher.rank, position, session_store.iter_resumes(), limit)
+
+    return FastJSONResponse(content={
+        "success": True,
+        "position": position,
+        "total": len(results),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": results
+    })
+
+@app.get("/api/search", dependencies=[Depends(require_admin)])
+async def search_documents(q: str, limit: int = 20, type: Optional[str] = None) -> JSONResponse:
+    """
+    全文检索简历（多个关键词同时命中，按BM25相关度排序）
+
+    Args:
+        q: 检索词，如 "Kafka 消息队列"
+        limit: 返回结果数
+        type: 文档类型过滤，如 resume
+
+    Returns:
+        命中的文档列表及摘要
+    """
+    if search_index is None:
+        raise HTTPException(status_code=503, detail="全文检索未启用")
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="检索词不能为空")
+
+    limit = min(max(limit, 1), SearchIndexConfig.MAX_RESULTS)
+    started = time.perf_counter()
+
+    def run_search():
+        search_index.refresh()
+        return search_index.search(q, limit=limit, doc_type=type)
+
+    hits = await asyncio.to_thread(run_search)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    results = []
+    for hit in hits:
+        meta = hit["meta"]
+        snippet = ""
+        if meta.get("type") == "resume":
+            snippet = make_snippet(await get_resume_context(meta.get("session_id", "")), q)
+        results.append({
+            "id": hit["id"],
+            "type": meta.get("type"),
+            "session_id": meta.get("session_id"),
+            "filename": meta.get("filename"),
+            "score": hit["score"],
+            "snippet": snippet
+        })
+
+    return FastJSONResponse(content={
+        "success": True,
+        "query": q,
+        "total": len(results),
+        "took_ms": round(elapsed_ms, 2),
+        "results": results
+    })
+
+def parse_day(value: str, name: str) -> date:
+    """解析 YYYY-MM-DD 日期参数"""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name}应为YYYY-MM-DD格式的日期")
+
+def analytics_range(start: Optional[str], end: Optional[str]) -> tuple:
+    """统计区间（含两端），未指定时为最近 ANALYTICS_DEFAULT_DAYS 天"""
+    end_day = parse_day(end, "end") if end else date.today()
+    start_day = parse_day(start, "start") if start else end_day - timedelta(days=AnalyticsConfig.DEFAULT_DAYS - 1)
+    if start_day > end_day:
+        raise HTTPException(status_code=400, detail="start不能晚于end")
+    if (end_day - start_day).days + 1 > AnalyticsConfig.MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"日期跨度不能超过{AnalyticsConfig.MAX_DAYS}天")
+    return start_day, end_day
+
+@app.get("/api/analytics", dependencies=[Depends(require_admin)])
+async def get_score_analytics(start: Optional[str] = None, end: Optional[str] = None,
+                              position: Optional[str] = None, granularity: str = "day") -> JSONResponse:
+    """
+    面试评分统计：总体及各面试方向的分数分布、维度平均分，以及按日/周/月的趋势
+
+    Args:
+        start: 起始日期 YYYY-MM-DD（含），默认最近 ANALYTICS_DEFAULT_DAYS 天
+        end: 结束日期 YYYY-MM-DD（含），默认今天
+        position: 只统计该面试方向
+        granularity: 趋势粒度 day / week / month
+
+    Returns:
+        由预计算的（日期, 面试方向）汇总合并得到的统计结果
+    """
+    if granularity not in ScoreAnalytics.GRANULARITIES:
+        raise HTTPException(status_code=400, detail="granularity仅支持day、week或month")
+    start_day, end_day = analytics_range(start, end)
+
+    started = time.perf_counter()
+    result = await asyncio.to_thread(
+        score_analytics.query, start_day.isoformat(), end_day.isoformat(), position, granularity
+    )
+    return FastJSONResponse(content={
+        "success": True,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        **result
+    })
+
+@app.get("/api/analytics/export", dependencies=[Depends(require_admin)])
+async def export_score_analytics(start: Optional[str] = None, end: Optional[str] = None, format: str = "csv"):
+    """
+    流式导出区间内每场已评估面试的评分（按面试时间排序，分批读取，不在内存中缓冲全部结果）
+
+    Args:
+        start: 起始日期 YYYY-MM-DD（含）
+        end: 结束日期 YYYY-MM-DD（含）
+        format: csv 或 parquet（需要安装pyarrow）
+    """
+    if format not in ("csv", "parquet"):
+        raise HTTPException(status_code=400, detail="format仅支持csv或parquet")
+    start_day, end_day = analytics_range(start, end)
+    start_ts = datetime.combine(start_day, datetime.min.time()).timestamp()
+    end_ts = datetime.combine(end_day + timedelta(days=1), datetime.min.time()).timestamp()
+    filename = f"interview_scores_{start_day.isoformat()}_{end_day.isoformat()}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if format == "parquet":
+        if not PARQUET_AVAILABLE:
+            raise HTTPException(status_code=400, detail="Parquet导出需要安装pyarrow")
+        return StreamingResponse(
+            score_analytics.iter_parquet(start_ts, end_ts, AnalyticsConfig.EXPORT_BATCH),
+            media_type="application/vnd.apache.parquet",
+            headers=headers
+        )
+    return StreamingResponse(
+        score_analytics.iter_csv(start_ts, end_ts, AnalyticsConfig.EXPORT_BATCH),
+        media_type="text/csv; charset=utf-8",
+        headers=headers
+    )
+
+@app.post("/api/analytics/rebuild", dependencies=[Depends(require_admin)])
+async def rebuild_score_analytics() -> JSONResponse:
+    """按已保存的全部评估结果重建评分汇总（升级前已有的评估，或汇总与记录不一致时使用）"""
+    started = time.perf_counter()
+    count = await asyncio.to_thread(score_analytics.rebuild)
+    logger.info(f"评分汇总重建完成: {count}条评估")
+    return FastJSONResponse(content={
+        "success": True,
+        "evaluations": count,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    })
+
 if __name__ == "__main__":
     
     print("🚀 启动Azure语音面试官系统...")
@@ -0,0 +1,108 @@
+"""
+Word文档流式文本提取模块
+
+直接从docx压缩包中读取 word/document.xml，用iterparse增量解析，按文档顺序输出段落和表格行，
+处理完的元素立即清理，内存占用与文档大小基本无关；不构建python-docx的完整对象模型。
+
+表格每行输出为一行文本，单元格之间用 " | " 分隔（简历中的技能、时间线常放在表格里）。
+"""
+import zipfile
+from typing import BinaryIO, Iterator, List
+from xml.etree.ElementTree import iterparse
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_P = _W + "p"
+_T = _W + "t"
+_TAB = _W + "tab"
+_BR = _W + "br"
+_CR = _W + "cr"
+_TBL = _W + "tbl"
+_TR = _W + "tr"
+_TC = _W + "tc"
+_BODY = _W + "body"
+
+CELL_SEPARATOR = " | "
+
+
+def iter_docx_blocks(stream: BinaryIO) -> Iterator[str]:
+    """
+    按文档顺序逐个产出段落文本和表格行文本（空段落、空行跳过）
+
+    Args:
+        stream: docx文件的可seek二进制流
+
+    Raises:
+        ValueError: 不是有效的docx文件
+    """
+    try:
+        archive = zipfile.ZipFile(stream)
+        xml_file = archive.open("word/document.xml")
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"不是有效的docx文件: {e}")
+
+    # 段落、单元格、表格行各自的文本缓冲栈；文本框和嵌套表格会出现嵌套
+    paragraphs: List[List[str]] = []
+    cells: List[List[str]] = []
+    rows: List[List[str]] = []
+    body = None
+    depth = 0
+
+    def emit(text: str):
+        # 单元格内的内容归入单元格，否则直接输出
+        if cells:
+            cells[-1].append(text)
+            return None
+        return text
+
+    with archive, xml_file:
+        for event, elem in iterparse(xml_file, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                depth += 1
+                if tag == _P:
+                    paragraphs.append([])
+                elif tag == _TC:
+                    cells.append([])
+                elif tag == _TR:
+                    rows.append([])
+                elif tag == _BODY:
+                    body = elem
+                continue
+
+            depth -= 1
+            output = None
+            if tag == _T:
+                if paragraphs and elem.text:
+                    paragraphs[-1].append(elem.text)
+            elif tag == _TAB:
+                if paragraphs:
+                    paragraphs[-1].append("\t")
+            elif tag in (_BR, _CR):
+                if paragraphs:
+                    paragraphs[-1].append("\n")
+            elif tag == _P:
+                text = "".join(paragraphs.pop()).strip()
+                if text:
+                    output = emit(text)
+            elif tag == _TC:
+                text = " ".join(cells.pop())
+                if rows:
+                    rows[-1].append(text)
+            elif tag == _TR:
+                text = CELL_SEPARATOR.join(c for c in rows.pop() if c)
+                if text:
+                    output = emit(text)
+
+            # 结束事件时该元素的内容已经处理完毕
+            elem.clear()
+            if depth == 2 and body is not None:
+                # body的直接子元素处理完后释放，避免已清空的元素在body下累积
+                body.clear()
+
+            if output:
+                yield output
+
+
+def extract_docx_text(stream: BinaryIO) -> str:
+    """提取docx全文，段落和表格行之间以换行分隔"""
+    return "\n".join(iter_docx_blocks(stream))
@@ -0,0 +1,82 @@
+"""
+面试历史分页模块
+
+面试历史原先整体存放在浏览器localStorage中，每次保存或删除都要解析并重写整个数组，历史页一次渲染全部记录。
+服务端按客户端ID（请求头 X-Client-Id，由浏览器生成并保存）隔离历史记录，列表接口只返回摘要并使用键集分页：
+游标记录上一页最后一条的排序列取值，翻页代价与已翻过的页数无关，翻页期间新增或删除记录也不会重复或遗漏。
+"""
+import base64
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.session_store import INTERVIEW_SORTS
+
+_CLIENT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def is_valid_client_id(client_id: Optional[str]) -> bool:
+    return bool(client_id) and _CLIENT_ID_PATTERN.match(client_id) is not None
+
+
+def encode_cursor(sort: str, item: Dict[str, Any]) -> str:
+    """根据本页最后一条记录生成下一页游标"""
+    columns, _ = INTERVIEW_SORTS[sort]
+    payload = json.dumps([sort, [item[column] for column in columns]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> List[Any]:
+    """
+    解析游标
+
+    Raises:
+        ValueError: 游标格式错误或与排序方式不匹配
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"无效的分页游标: {e}")
+    columns, _ = INTERVIEW_SORTS[sort]
+    if cursor_sort != sort or not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("分页游标与排序方式不匹配")
+    return values
+
+
+def parse_timestamp(value: str, default: float) -> float:
+    """解析前端的ISO时间字符串，失败时返回默认值"""
+    if not value:
+        return default
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return default
+
+
+def summary_to_json(item: Dict[str, Any]) -> Dict[str, Any]:
+    """面试摘要的接口格式（字段名与前端记录一致）"""
+    return {
+        "id": item["interview_id"],
+        "sessionId": item["session_id"],
+        "createdAt": datetime.fromtimestamp(item["created_at"]).astimezone().isoformat(),
+        "duration": item["duration"],
+        "messageCount": item["message_count"],
+        "score": item["total_score"],
+        "summary": item["summary"],
+        "hasEvaluation": item["has_evaluation"]
+    }
+
+
+def page_of(items: List[Dict[str, Any]], sort: str, limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    截取一页并生成下一页游标
+
+    Args:
+        items: 按 limit + 1 条查询的结果，多出的一条用于判断是否还有下一页
+    """
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(sort, items[-1])
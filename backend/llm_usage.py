@@ -0,0 +1,65 @@
+"""
+大模型调用用量统计模块
+
+统一解析各上游返回的usage字段，记录提示词token、命中上游提示词缓存的token和生成token，
+用于衡量静态前缀布局带来的缓存命中率、延迟和成本变化。
+
+- OpenAI / Azure Chat Completions: prompt_tokens, prompt_tokens_details.cached_tokens
+- DeepSeek: prompt_cache_hit_tokens / prompt_cache_miss_tokens
+- Realtime response.done: input_tokens, input_token_details.cached_tokens, output_tokens
+"""
+from typing import Dict, Optional, Any
+
+from backend.metrics import metrics
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    if value is None:
+        return {}
+    if isinstance(value, dict):
+        return value
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return dict(getattr(value, "__dict__", {}))
+
+
+def normalize_usage(usage: Any) -> Dict[str, int]:
+    """把不同上游的usage字段转换为 prompt_tokens / cached_tokens / completion_tokens"""
+    usage = _as_dict(usage)
+    prompt_details = _as_dict(usage.get("prompt_tokens_details") or usage.get("input_token_details"))
+
+    prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens")) or 0
+    cached_tokens = usage.get("prompt_cache_hit_tokens")
+    if cached_tokens is None:
+        cached_tokens = prompt_details.get("cached_tokens") or 0
+    completion_tokens = usage.get("completion_tokens", usage.get("output_tokens")) or 0
+
+    return {
+        "prompt_tokens": int(prompt_tokens),
+        "cached_tokens": int(cached_tokens),
+        "completion_tokens": int(completion_tokens)
+    }
+
+
+def record_usage(provider: str, usage: Any, latency: Optional[float] = None) -> Dict[str, Any]:
+    """
+    记录一次调用的用量
+
+    Args:
+        provider: 上游名称，如 deepseek、realtime
+        usage: 上游响应中的usage字段
+        latency: 调用耗时（秒）
+
+    Returns:
+        归一化后的用量，附带缓存命中比例
+    """
+    normalized = normalize_usage(usage)
+    metrics.counter(f"llm_{provider}_requests_total", f"{provider}调用次数").inc()
+    metrics.counter(f"llm_{provider}_prompt_tokens_total", f"{provider}提示词token数").inc(normalized["prompt_tokens"])
+    metrics.counter(f"llm_{provider}_cached_tokens_total", f"{provider}命中提示词缓存的token数").inc(normalized["cached_tokens"])
+    metrics.counter(f"llm_{provider}_completion_tokens_total", f"{provider}生成token数").inc(normalized["completion_tokens"])
+    if latency is not None:
+        metrics.histogram(f"llm_{provider}_request_seconds", f"{provider}调用耗时").observe(latency)
+
+    prompt_tokens = normalized["prompt_tokens"]
+    return dict(normalized, cache_hit_ratio=round(normalized["cached_tokens"] / prompt_tokens, 3) if prompt_tokens else 0.0)
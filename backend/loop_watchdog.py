@@ -0,0 +1,157 @@
+"""
+事件循环阻塞检测模块
+
+心跳协程定期在事件循环上打点，独立的采样线程在心跳超时时抓取事件循环所在线程的调用栈，
+用于定位文件解析、同步IO等阻塞事件循环导致的语音卡顿
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+from backend.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 阻塞时长分桶（秒）
+STALL_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+
+class LoopWatchdog:
+    """事件循环看门狗"""
+
+    def __init__(self, threshold_ms: float = 100.0, interval_ms: float = 50.0, max_stacks: int = 20):
+        """
+        Args:
+            threshold_ms: 判定为阻塞的心跳延迟阈值（毫秒）
+            interval_ms: 心跳间隔（毫秒）
+            max_stacks: 保留的最近阻塞调用栈数量
+        """
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.max_stacks = max_stacks
+
+        self._lock = threading.Lock()
+        self._stalls: deque = deque(maxlen=max_stacks)
+        self._pending_capture: Optional[Dict[str, Any]] = None
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self._stall_counter = metrics.counter("event_loop_stalls_total", "事件循环阻塞次数")
+        self._stall_histogram = metrics.histogram(
+            "event_loop_stall_seconds", "事件循环阻塞时长", buckets=STALL_BUCKETS
+        )
+        self._lag_gauge = metrics.gauge("event_loop_lag_seconds", "最近一次心跳延迟")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """启动看门狗，必须在事件循环内调用"""
+        if self.running:
+            return
+
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop_event.clear()
+
+        self._task = loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._sample, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"事件循环看门狗已启动: 阈值={self.threshold * 1000:.0f}ms, 心跳间隔={self.interval * 1000:.0f}ms")
+
+    async def stop(self) -> None:
+        """停止心跳协程和采样线程"""
+        self._stop_event.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        """心跳协程：测量每次sleep的实际唤醒延迟"""
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - before - self.interval)
+
+            with self._lock:
+                self._last_beat = now
+                capture = self._pending_capture
+                self._pending_capture = None
+
+            self._lag_gauge.set(lag)
+            if lag >= self.threshold:
+                self._record_stall(lag, capture)
+
+    def _sample(self) -> None:
+        """采样线程：心跳超时时抓取事件循环线程的调用栈"""
+        while not self._stop_event.wait(self.interval / 2):
+            with self._lock:
+                overdue = time.monotonic() - self._last_beat - self.interval
+                already_captured = self._pending_capture is not None
+
+            if overdue < self.threshold or already_captured:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = traceback.format_stack(frame) if frame is not None else []
+
+            with self._lock:
+                if self._pending_capture is None:
+                    self._pending_capture = {
+                        "stack": "".join(stack),
+                        "overdue_ms": round(overdue * 1000, 1)
+                    }
+
+    def _record_stall(self, lag: float, capture: Optional[Dict[str, Any]]) -> None:
+        """记录一次阻塞"""
+        self._stall_counter.inc()
+        self._stall_histogram.observe(lag)
+
+        record = {
+            "timestamp": datetime.now().isoformat(),
+            "duration_ms": round(lag * 1000, 1),
+            # 阻塞时间短于采样间隔时可能没有抓到调用栈
+            "stack": capture["stack"] if capture else None,
+            "captured_after_ms": capture["overdue_ms"] if capture else None
+        }
+        with self._lock:
+            self._stalls.append(record)
+
+        logger.warning(f"检测到事件循环阻塞: {record['duration_ms']}ms")
+
+    def recent_stalls(self) -> List[Dict[str, Any]]:
+        """最近的阻塞记录（新的在前）"""
+        with self._lock:
+            return list(reversed(self._stalls))
+
+    def stats(self) -> Dict[str, Any]:
+        """看门狗状态概要"""
+        histogram = self._stall_histogram.snapshot()
+        return {
+            "running": self.running,
+            "threshold_ms": self.threshold * 1000,
+            "interval_ms": self.interval * 1000,
+            "stall_count": int(self._stall_counter.value),
+            "stall_total_ms": round(histogram["sum"] * 1000, 1),
+            "stall_max_ms": round(histogram["max"] * 1000, 1),
+            "last_lag_ms": round(self._lag_gauge.value * 1000, 1)
+        }
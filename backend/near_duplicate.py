@@ -0,0 +1,101 @@
+"""
+简历近似重复检测模块
+
+同一份简历重新导出PDF、改动个别字符后MD5完全不同，会得到新的session_id并重新走一遍下游缓存。
+这里在上传时计算MinHash签名（词三元组shingle，num_perm个哈希函数），并按LSH分段：
+签名切成bands段，每段的哈希作为桶键，任意一段相同即为候选，再用签名估计Jaccard相似度确认。
+每份简历只需查bands个桶，与已存储简历数量无关。
+"""
+import hashlib
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from backend.search_index import tokenize
+
+# 大于2^32的素数；a、h均小于2^32，a*h+b不会溢出uint64
+_PRIME = np.uint64(4294967311)
+_MASK = np.uint64(0xFFFFFFFF)
+
+
+class MinHasher:
+    """MinHash签名与LSH分段"""
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, shingle_size: int = 3, seed: int = 1):
+        """
+        Args:
+            num_perm: 哈希函数个数（签名长度）
+            bands: LSH段数，每段 num_perm // bands 行；行数越多，进入候选所需的相似度越高
+            shingle_size: 每个shingle包含的词数
+            seed: 哈希函数参数的随机种子，修改后已保存的签名全部失效
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm必须能被bands整除")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+
+    def _shingles(self, text: str) -> np.ndarray:
+        tokens = tokenize(text)
+        size = self.shingle_size
+        if len(tokens) < size:
+            grams = [" ".join(tokens)] if tokens else []
+        else:
+            grams = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """计算MinHash签名（uint32数组）；空文本返回全1签名"""
+        shingles = self._shingles(text)
+        if not len(shingles):
+            return np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint32)
+        # (num_perm, 1) × (1, n) 一次算出所有哈希函数下的取值，再按行取最小
+        hashed = (self._a[:, None] * shingles[None, :] + self._b[:, None]) % _PRIME & _MASK
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        """各LSH段的桶键（有符号64位整数，便于存入SQLite）"""
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(bytes([band]) + chunk, digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "big", signed=True))
+        return keys
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        """由签名估计Jaccard相似度"""
+        return float(np.mean(a == b))
+
+    @staticmethod
+    def to_bytes(signature: np.ndarray) -> bytes:
+        return signature.astype(np.uint32).tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> np.ndarray:
+        return np.frombuffer(data, dtype=np.uint32)
+
+    def best_match(self, signature: np.ndarray,
+                   candidates: List[Tuple[str, str, bytes]]) -> Optional[Tuple[str, str, float]]:
+        """
+        在LSH候选中找相似度最高的一份
+
+        Args:
+            signature: 新简历的签名
+            candidates: (简历哈希, 规范简历哈希, 签名字节) 列表
+
+        Returns:
+            (简历哈希, 规范简历哈希, 相似度)，没有候选时返回None
+        """
+        best = None
+        for resume_hash, canonical, data in candidates:
+            score = self.similarity(signature, self.from_bytes(data))
+            if best is None or score > best[2]:
+                best = (resume_hash, canonical, score)
+        return best
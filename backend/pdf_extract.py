@@ -0,0 +1,217 @@
+"""
+PDF文本提取模块
+
+小文件在当前线程逐页提取；页数较多的文件按页码区间切分，交给进程池并行解析
+（PyPDF2为纯Python实现，受GIL限制，线程无法并行）。
+
+- 页数上限：超过上限的页直接忽略，避免超长文件占满解析资源
+- 单页超时：进程池内借助SIGALRM中断卡住的页；当前线程解析时只能在页与页之间检查耗时
+- 各页文本收集到列表后一次性拼接，避免字符串反复拼接
+- 并行解析时只向子进程传递文件路径，子进程按需读取所需的对象，不把整个文件读入内存再逐任务复制；
+  上传的简历（内存中的SpooledTemporaryFile）先分块写入临时文件
+"""
+import io
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union, BinaryIO
+
+import PyPDF2
+
+logger = logging.getLogger(__name__)
+
+
+class PageTimeout(Exception):
+    """单页解析超时"""
+
+
+@dataclass
+class PdfExtractionResult:
+    """PDF提取结果"""
+
+    text: str
+    total_pages: int
+    extracted_pages: int
+    truncated: bool = False
+    skipped_pages: List[int] = field(default_factory=list)
+    elapsed: float = 0.0
+    parallel: bool = False
+
+
+def _raise_page_timeout(signum, frame):
+    raise PageTimeout()
+
+
+def _extract_page(page, page_timeout: float, use_alarm: bool) -> Optional[str]:
+    """提取单页文本，超时返回None"""
+    if not use_alarm:
+        return page.extract_text() or ""
+
+    signal.setitimer(signal.ITIMER_REAL, page_timeout)
+    try:
+        return page.extract_text() or ""
+    except PageTimeout:
+        return None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _extract_range(path: str, start: int, end: int, page_timeout: float) -> Tuple[List[str], List[int]]:
+    """
+    进程池任务：打开PDF文件并提取[start, end)区间内的页
+
+    Returns:
+        (各页文本, 超时跳过的页码)
+    """
+    use_alarm = hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_page_timeout)
+
+    texts, skipped = [], []
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        for index in range(start, end):
+            text = _extract_page(reader.pages[index], page_timeout, use_alarm)
+            if text is None:
+                skipped.append(index)
+                text = ""
+            texts.append(text)
+    return texts, skipped
+
+
+def _file_path(stream) -> Optional[str]:
+    """文件流对应的磁盘路径；内存中的流或匿名临时文件返回None"""
+    name = getattr(stream, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name
+    return None
+
+
+class PdfExtractor:
+    """按页数选择串行或进程池并行提取的PDF解析器"""
+
+    def __init__(
+        self,
+        max_pages: int = 200,
+        page_timeout: float = 2.0,
+        parallel_min_pages: int = 16,
+        workers: int = 0,
+        pages_per_task: int = 8
+    ):
+        """
+        Args:
+            max_pages: 最多提取的页数
+            page_timeout: 单页解析超时（秒）
+            parallel_min_pages: 页数达到该值时使用进程池
+            workers: 进程池大小，0表示使用CPU核数；1表示始终串行
+            pages_per_task: 每个进程池任务处理的页数
+        """
+        self.max_pages = max_pages
+        self.page_timeout = page_timeout
+        self.parallel_min_pages = parallel_min_pages
+        self.workers = workers or multiprocessing.cpu_count()
+        self.pages_per_task = max(1, pages_per_task)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn避免在带后台线程的服务进程中fork
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def extract(self, source: Union[bytes, BinaryIO]) -> PdfExtractionResult:
+        """
+        提取PDF文本
+
+        Args:
+            source: PDF文件的字节内容或可seek的文件流
+        """
+        started = time.monotonic()
+        stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+        reader = PyPDF2.PdfReader(stream)
+        total_pages = len(reader.pages)
+        page_count = min(total_pages, self.max_pages)
+
+        if self.workers > 1 and page_count >= self.parallel_min_pages:
+            texts, skipped = self._extract_parallel_stream(stream, page_count)
+            parallel = True
+        else:
+            texts, skipped = self._extract_serial(reader, page_count)
+            parallel = False
+
+        result = PdfExtractionResult(
+            text="\n".join(t for t in texts if t).strip(),
+            total_pages=total_pages,
+            extracted_pages=page_count - len(skipped),
+            truncated=total_pages > page_count,
+            skipped_pages=skipped,
+            elapsed=time.monotonic() - started,
+            parallel=parallel
+        )
+        if result.truncated or result.skipped_pages:
+            logger.warning(
+                f"PDF未完整提取: 共{total_pages}页, 提取{result.extracted_pages}页, "
+                f"超时跳过{len(skipped)}页, 页数上限{self.max_pages}"
+            )
+        return result
+
+    def _extract_serial(self, reader, page_count: int) -> Tuple[List[str], List[int]]:
+        """当前线程逐页提取；无法中断单页，累计耗时超出预算后跳过剩余页"""
+        deadline = time.monotonic() + self.page_timeout * max(1, page_count)
+        texts, skipped = [], []
+        for index in range(page_count):
+            if time.monotonic() > deadline:
+                skipped.extend(range(index, page_count))
+                break
+            texts.append(reader.pages[index].extract_text() or "")
+        return texts, skipped
+
+    def _extract_parallel_stream(self, stream: BinaryIO, page_count: int) -> Tuple[List[str], List[int]]:
+        """流已对应磁盘文件时直接传路径，否则分块写入临时文件后传路径"""
+        path = _file_path(stream)
+        if path is not None:
+            return self._extract_parallel(path, page_count)
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spooled:
+            stream.seek(0)
+            shutil.copyfileobj(stream, spooled)
+        try:
+            return self._extract_parallel(spooled.name, page_count)
+        finally:
+            os.unlink(spooled.name)
+
+    def _extract_parallel(self, path: str, page_count: int) -> Tuple[List[str], List[int]]:
+        """按页码区间分发到进程池，按区间顺序合并结果"""
+        executor = self._get_executor()
+        ranges = [
+            (start, min(start + self.pages_per_task, page_count))
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+        futures = [executor.submit(_extract_range, path, start, end, self.page_timeout) for start, end in ranges]
+
+        # 单页超时由子进程自行处理；这里的等待上限只兜底子进程整体卡死的情况
+        deadline = time.monotonic() + self.page_timeout * self.pages_per_task * (len(ranges) + 1)
+        texts, skipped = [], []
+        for (start, end), future in zip(ranges, futures):
+            try:
+                range_texts, range_skipped = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                future.cancel()
+                range_texts, range_skipped = [""] * (end - start), list(range(start, end))
+            texts.extend(range_texts)
+            skipped.extend(range_skipped)
+        return texts, skipped
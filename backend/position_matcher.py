@@ -0,0 +1,175 @@
+"""
+简历与岗位匹配模块
+
+以 InterviewPrompts.POSITION_SPECIFIC 中各岗位的描述加上岗位关键词构建TF-IDF向量，预先计算好
+岗位矩阵（岗位数 × 词表大小，已L2归一化）。一份简历只需向量化一次，再与岗位矩阵做一次矩阵乘法
+即可得到对所有岗位的余弦相似度；批量排序时多份简历组成矩阵一起计算。
+
+切词与全文索引一致：英文按词，中文按字符二元组。
+"""
+import math
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+import numpy as np
+
+from backend.metrics import metrics
+from backend.search_index import tokenize
+
+# 各岗位的补充关键词（岗位提示词本身较短，只靠它区分度不够）
+POSITION_KEYWORDS = {
+    "frontend": "html css javascript typescript react vue angular webpack vite node.js 前端 页面 浏览器 "
+                "小程序 组件 响应式 移动端 性能优化 jquery sass less redux next.js",
+    "backend": "java python go golang c++ spring django flask fastapi mysql postgresql redis kafka rabbitmq "
+               "微服务 分布式 高并发 后端 接口 数据库 缓存 消息队列 rpc grpc linux nginx",
+    "fullstack": "全栈 前端 后端 react vue node.js express django docker kubernetes k8s ci/cd devops "
+                 "部署 架构 javascript typescript mysql mongodb",
+    "ai_ml": "机器学习 深度学习 神经网络 pytorch tensorflow keras 模型 训练 推理 算法 nlp cv 计算机视觉 "
+             "自然语言处理 transformer bert llm 大模型 特征工程 强化学习 cuda",
+    "data_science": "数据分析 数据挖掘 统计 pandas numpy sql excel tableau power bi 可视化 spark hadoop hive "
+                    "a/b 指标 报表 建模 r语言 数据仓库 etl 商业分析",
+}
+
+
+class PositionMatcher:
+    """TF-IDF余弦相似度岗位匹配器"""
+
+    def __init__(self, positions: Dict[str, str], min_score: float = 0.05, cache_size: int = 4096):
+        """
+        Args:
+            positions: 岗位名称 → 岗位提示词
+            min_score: 最高得分低于该值时不选择岗位（使用通用面试官）
+            cache_size: 缓存的简历得分数量
+        """
+        self.names = list(positions)
+        self.min_score = min_score
+        self.cache_size = cache_size
+
+        documents = [
+            Counter(tokenize(positions[name] + " " + POSITION_KEYWORDS.get(name, "")))
+            for name in self.names
+        ]
+        self.vocabulary = {term: i for i, term in enumerate(sorted(set().union(*documents)))}
+
+        # 平滑IDF：只在少数岗位出现的词区分度更高
+        df = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for document in documents:
+            for term in document:
+                df[self.vocabulary[term]] += 1
+        self.idf = np.log((1 + len(documents)) / (1 + df)) + 1
+
+        self.position_matrix = self._normalize(np.vstack([self._tf(document) * self.idf for document in documents]))
+
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._cache_hits = metrics.counter("position_match_cache_hits_total", "岗位匹配缓存命中次数")
+        self._cache_misses = metrics.counter("position_match_cache_misses_total", "岗位匹配缓存未命中次数")
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def _tf(self, counts: Counter) -> np.ndarray:
+        """次线性词频向量（1 + log tf），词表之外的词忽略"""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term, count in counts.items():
+            index = self.vocabulary.get(term)
+            if index is not None:
+                vector[index] = 1 + math.log(count)
+        return vector
+
+    def vectorize(self, texts: Iterable[str]) -> np.ndarray:
+        """把多份简历转换为归一化的TF-IDF矩阵（简历数 × 词表大小）"""
+        rows = [self._tf(Counter(tokenize(text))) for text in texts]
+        if not rows:
+            return np.zeros((0, len(self.vocabulary)), dtype=np.float32)
+        return self._normalize(np.vstack(rows) * self.idf)
+
+    def score_many(self, texts: List[str]) -> np.ndarray:
+        """多份简历对所有岗位的相似度（简历数 × 岗位数）"""
+        return self.vectorize(texts) @ self.position_matrix.T
+
+    def scores(self, resume_hash: str, resume_text: str) -> Dict[str, float]:
+        """
+        单份简历对所有岗位的相似度，按简历哈希缓存
+
+        Args:
+            resume_hash: 简历内容哈希
+            resume_text: 简历文本（缓存命中时不使用）
+        """
+        with self._lock:
+            cached = self._cache.get(resume_hash)
+            if cached is not None:
+                self._cache.move_to_end(resume_hash)
+                self._cache_hits.inc()
+        if cached is None:
+            self._cache_misses.inc()
+            cached = self.score_many([resume_text])[0]
+            self._remember(resume_hash, cached)
+        return {name: round(float(score), 4) for name, score in zip(self.names, cached)}
+
+    def _remember(self, resume_hash: str, scores: np.ndarray) -> None:
+        with self._lock:
+            self._cache[resume_hash] = scores
+            self._cache.move_to_end(resume_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def select(self, resume_hash: str, resume_text: str) -> Tuple[Optional[str], Dict[str, float]]:
+        """
+        为简历选择面试方向
+
+        Returns:
+            (得分最高的岗位，得分过低时为None；各岗位得分)
+        """
+        scores = self.scores(resume_hash, resume_text)
+        best = max(scores, key=scores.get)
+        return (best if scores[best] >= self.min_score else None), scores
+
+    def rank(self, position: str, resumes: Iterable[Tuple[str, str]], limit: int = 100,
+             batch_size: int = 512) -> List[Dict[str, Any]]:
+        """
+        按与指定岗位的相似度对大量简历排序
+
+        Args:
+            position: 岗位名称
+            resumes: (简历哈希, 简历文本) 序列
+            limit: 返回条数
+            batch_size: 每批向量化的简历数
+        """
+        column = self.names.index(position)
+        ids: List[str] = []
+        scores: List[np.ndarray] = []
+
+        batch_ids, batch_texts = [], []
+
+        def flush():
+            if batch_texts:
+                matrix = self.score_many(batch_texts)
+                for resume_hash, row in zip(batch_ids, matrix):
+                    self._remember(resume_hash, row)
+                ids.extend(batch_ids)
+                scores.append(matrix[:, column])
+                batch_ids.clear()
+                batch_texts.clear()
+
+        for resume_hash, text in resumes:
+            with self._lock:
+                cached = self._cache.get(resume_hash)
+            if cached is not None:
+                ids.append(resume_hash)
+                scores.append(cached[column:column + 1])
+                continue
+            batch_ids.append(resume_hash)
+            batch_texts.append(text)
+            if len(batch_texts) >= batch_size:
+                flush()
+        flush()
+
+        if not ids:
+            return []
+        all_scores = np.concatenate(scores)
+        top = np.argsort(-all_scores)[:limit]
+        return [{"session_id": ids[i], "score": round(float(all_scores[i]), 4)} for i in top]
@@ -0,0 +1,230 @@
+"""
+采样式性能分析模块
+
+基于 sys._current_frames() 的纯Python统计采样器，输出flamegraph兼容的折叠栈（collapsed stacks）。
+配合 RouteTrackingMiddleware 记录每个请求所在的asyncio任务，可以只统计匹配指定路由的样本；
+RouteTrackingExecutor 作为事件循环的默认线程池，把 asyncio.to_thread 中的工作（简历解析、SQLite读写等）
+归入发起它的请求所在路由。进程池中的工作（PDF并行解析）不在本进程内执行，无法采样。
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Any
+
+
+class RouteRegistry:
+    """记录正在处理请求的asyncio任务与路由路径的对应关系"""
+
+    def __init__(self):
+        self._routes: Dict[asyncio.Task, str] = {}
+        # 工作线程ID → 正在为其执行任务的路由
+        self._threads: Dict[int, str] = {}
+
+    def enter(self, task: Optional[asyncio.Task], path: str) -> None:
+        if task is not None:
+            self._routes[task] = path
+
+    def exit(self, task: Optional[asyncio.Task]) -> None:
+        if task is not None:
+            self._routes.pop(task, None)
+
+    def route_of(self, task: Optional[asyncio.Task]) -> Optional[str]:
+        if task is None:
+            return None
+        return self._routes.get(task)
+
+    def enter_thread(self, thread_id: int, path: str) -> None:
+        self._threads[thread_id] = path
+
+    def exit_thread(self, thread_id: int) -> None:
+        self._threads.pop(thread_id, None)
+
+    def route_of_thread(self, thread_id: int) -> Optional[str]:
+        return self._threads.get(thread_id)
+
+    def active(self) -> Dict[str, int]:
+        """当前各路由的在途请求数"""
+        return dict(Counter(self._routes.values()))
+
+
+# 全局路由登记表
+route_registry = RouteRegistry()
+
+
+class RouteTrackingMiddleware:
+    """纯ASGI中间件：登记HTTP/WebSocket请求所在任务，供采样器按路由归类"""
+
+    def __init__(self, app, registry: RouteRegistry = route_registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        self.registry.enter(task, scope.get("path", ""))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.registry.exit(task)
+
+
+class RouteTrackingExecutor(ThreadPoolExecutor):
+    """事件循环的默认线程池：提交时记录调用方任务的路由，工作线程执行期间登记该路由"""
+
+    def __init__(self, *args, registry: RouteRegistry = route_registry, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.registry = registry
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        try:
+            route = self.registry.route_of(asyncio.current_task())
+        except RuntimeError:
+            # 不是从事件循环线程提交的
+            route = None
+        if route is None:
+            return super().submit(fn, *args, **kwargs)
+        return super().submit(self._run_for_route, route, fn, args, kwargs)
+
+    def _run_for_route(self, route: str, fn, args, kwargs):
+        thread_id = threading.get_ident()
+        self.registry.enter_thread(thread_id, route)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.registry.exit_thread(thread_id)
+
+
+def _frame_label(frame) -> str:
+    """折叠栈中单个栈帧的名称"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    """将栈帧链转换为从根到叶、以分号分隔的折叠栈"""
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class SamplingProfiler:
+    """统计采样分析器，同一时刻只允许一个分析会话"""
+
+    def __init__(self, registry: RouteRegistry = route_registry, ignored_threads: Optional[set] = None):
+        self.registry = registry
+        # 看门狗等自身的监控线程不计入样本
+        self.ignored_threads = ignored_threads or {"loop-watchdog"}
+        self._session_lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._session_lock.locked()
+
+    def profile(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        loop_thread_id: int,
+        duration: float,
+        interval: float,
+        route: Optional[str] = None,
+        include_idle: bool = False
+    ) -> Dict[str, Any]:
+        """
+        在调用线程中执行一次限时采样（应放在工作线程中运行，避免阻塞事件循环）
+
+        Args:
+            loop: 被分析的事件循环
+            loop_thread_id: 事件循环所在线程ID
+            duration: 采样时长（秒）
+            interval: 采样间隔（秒）
+            route: 只统计路径以此开头的请求（包括其提交到默认线程池的工作）；为空时统计所有线程
+            include_idle: 是否统计事件循环空闲（没有任务在运行）时的样本
+
+        Returns:
+            dict: 折叠栈计数及采样统计
+        """
+        if not self._session_lock.acquire(blocking=False):
+            raise RuntimeError("已有分析会话正在进行")
+
+        try:
+            own_thread = threading.get_ident()
+            thread_names = {t.ident: t.name for t in threading.enumerate()}
+            stacks: Counter = Counter()
+            ticks = 0
+            matched = 0
+
+            started = time.monotonic()
+            deadline = started + duration
+            while time.monotonic() < deadline:
+                ticks += 1
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+
+                    name = thread_names.get(thread_id)
+                    if name is None:
+                        thread_names = {t.ident: t.name for t in threading.enumerate()}
+                        name = thread_names.get(thread_id, str(thread_id))
+                    if name in self.ignored_threads:
+                        continue
+
+                    if thread_id == loop_thread_id:
+                        task = self._current_task(loop)
+                        task_route = self.registry.route_of(task)
+                        if route is not None and not (task_route or "").startswith(route):
+                            continue
+                        if task is None and not include_idle:
+                            continue
+                        prefix = f"thread:{name};route:{task_route or '-'}"
+                    else:
+                        # 按路由过滤时只统计正在为该路由执行 to_thread 工作的线程
+                        thread_route = self.registry.route_of_thread(thread_id)
+                        if route is not None and not (thread_route or "").startswith(route):
+                            continue
+                        prefix = f"thread:{name};route:{thread_route}" if thread_route else f"thread:{name}"
+
+                    stacks[f"{prefix};{_collapse(frame)}"] += 1
+                    matched += 1
+
+                time.sleep(interval)
+
+            elapsed = time.monotonic() - started
+        finally:
+            self._session_lock.release()
+
+        return {
+            "duration_s": round(elapsed, 3),
+            "interval_ms": interval * 1000,
+            "route": route,
+            "ticks": ticks,
+            "samples": matched,
+            "stacks": stacks,
+            "excluded": "进程池中的工作（PDF并行解析）在子进程中执行，不在采样范围内"
+        }
+
+    @staticmethod
+    def _current_task(loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Task]:
+        """跨线程读取事件循环当前正在执行的任务（采样用途，允许偶发不一致）"""
+        try:
+            return asyncio.current_task(loop)
+        except Exception:
+            return None
+
+    @staticmethod
+    def to_collapsed(stacks: Counter) -> str:
+        """输出flamegraph.pl / speedscope可直接读取的折叠栈文本"""
+        return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+
+# 全局分析器实例
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,290 @@
+"""
+Realtime区域健康检查模块
+
+定期探测各WebRTC区域端点的延迟和错误率，以EWMA平滑打分，并对连续失败的区域启用熔断。
+语音通话建立时按得分给出区域顺序，优先使用最快的健康区域，避免在不可用的区域上等待超时。
+
+客户端上报的实际连接结果（SDP交换耗时与成败）与服务端探测衡量的不是同一件事，且来自不可信的客户端，
+因此单独统计，不进入探测的EWMA和熔断：
+- 只有持有 /api/realtime/token 签发的会话ID才能上报，每个会话对每个区域只计一次，有效期有限
+- 客户端失败率只按有上限的权重放大得分（最多 1 + client_weight 倍），不能单独熔断或压过探测结果
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Set, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from backend.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 熔断器状态
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 客户端上报耗时的上限（毫秒），超出按上限计
+MAX_CLIENT_LATENCY_MS = 60000.0
+
+
+class RegionReportRejected(Exception):
+    """客户端上报未携带有效的会话ID，或该会话已上报过该区域"""
+
+
+class CircuitBreaker:
+    """连续失败达到阈值后熔断，冷却期后放行一次试探"""
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._state = CLOSED
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+        return self._state
+
+    @property
+    def available(self) -> bool:
+        return self.state != OPEN
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.cooldown = self.base_cooldown
+        self._state = CLOSED
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            # 试探失败，冷却时间翻倍
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._trip()
+        elif self.consecutive_failures >= self.failure_threshold:
+            self._trip()
+
+    def _trip(self) -> None:
+        self._state = OPEN
+        self.opened_at = time.monotonic()
+
+
+class RegionHealth:
+    """单个区域端点的健康状态"""
+
+    def __init__(self, config: Dict[str, Any], index: int, alpha: float, breaker: CircuitBreaker,
+                 client_weight: float = 0.5):
+        self.config = config
+        self.url = config["url"]
+        self.name = urlparse(self.url).hostname.split(".")[0]
+        self.index = index
+        self.alpha = alpha
+        self.breaker = breaker
+        self.latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.last_checked: Optional[float] = None
+        self.last_error: Optional[str] = None
+        # 客户端上报的独立信号
+        self.client_weight = client_weight
+        self.client_latency_ms: Optional[float] = None
+        self.client_error_rate = 0.0
+        self.client_samples = 0
+
+        self._latency_gauge = metrics.gauge(f"realtime_region_{self.name}_latency_ms", f"{self.name} EWMA延迟")
+        self._error_gauge = metrics.gauge(f"realtime_region_{self.name}_error_rate", f"{self.name} EWMA错误率")
+
+    def record(self, success: bool, latency_ms: Optional[float] = None, error: Optional[str] = None) -> None:
+        """记录一次探测结果"""
+        self.samples += 1
+        self.last_checked = time.time()
+        self.error_rate = self.alpha * (0.0 if success else 1.0) + (1 - self.alpha) * self.error_rate
+
+        if success:
+            if latency_ms is not None:
+                self.latency_ms = latency_ms if self.latency_ms is None else \
+                    self.alpha * latency_ms + (1 - self.alpha) * self.latency_ms
+            self.last_error = None
+            self.breaker.record_success()
+        else:
+            self.last_error = error
+            self.breaker.record_failure()
+
+        if self.latency_ms is not None:
+            self._latency_gauge.set(self.latency_ms)
+        self._error_gauge.set(self.error_rate)
+
+    def record_client(self, success: bool, latency_ms: Optional[float] = None) -> None:
+        """记录一次客户端上报的连接结果（不影响探测EWMA和熔断）"""
+        self.client_samples += 1
+        self.client_error_rate = self.alpha * (0.0 if success else 1.0) + (1 - self.alpha) * self.client_error_rate
+        if success and latency_ms is not None:
+            latency_ms = min(max(latency_ms, 0.0), MAX_CLIENT_LATENCY_MS)
+            self.client_latency_ms = latency_ms if self.client_latency_ms is None else \
+                self.alpha * latency_ms + (1 - self.alpha) * self.client_latency_ms
+
+    @property
+    def score(self) -> float:
+        """
+        得分越低越优先；错误率按比例放大延迟，未探测过的区域保持配置顺序排在已知健康区域之后。
+        客户端失败率最多把得分放大 1 + client_weight 倍。
+        """
+        if self.latency_ms is None:
+            return 1e9 + self.index
+        return self.latency_ms * (1 + 4 * self.error_rate) * (1 + self.client_weight * self.client_error_rate)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "url": self.url,
+            "state": self.breaker.state,
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "score": round(self.score, 1),
+            "samples": self.samples,
+            "last_checked": self.last_checked,
+            "last_error": self.last_error,
+            "client_latency_ms": round(self.client_latency_ms, 1) if self.client_latency_ms is not None else None,
+            "client_error_rate": round(self.client_error_rate, 3),
+            "client_samples": self.client_samples
+        }
+
+
+class RegionHealthService:
+    """区域健康探测与排序服务"""
+
+    def __init__(
+        self,
+        configs: List[Dict[str, Any]],
+        probe_interval: float = 30.0,
+        probe_timeout: float = 3.0,
+        alpha: float = 0.3,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        max_cooldown: float = 300.0,
+        client_weight: float = 0.5,
+        report_ttl: float = 300.0,
+        max_report_sessions: int = 10000
+    ):
+        """
+        Args:
+            client_weight: 客户端失败率对得分的最大放大权重
+            report_ttl: 签发令牌后允许上报的时间（秒）
+            max_report_sessions: 同时允许上报的会话数上限，超出时淘汰最早签发的
+        """
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.report_ttl = report_ttl
+        self.max_report_sessions = max_report_sessions
+        self.regions = [
+            RegionHealth(config, i, alpha, CircuitBreaker(failure_threshold, cooldown, max_cooldown), client_weight)
+            for i, config in enumerate(configs)
+        ]
+        self._by_url = {region.url: region for region in self.regions}
+        # 允许上报的会话：会话ID → (过期时间, 已上报的区域URL)
+        self._report_sessions: "OrderedDict[str, Tuple[float, Set[str]]]" = OrderedDict()
+        self._rejected = metrics.counter("realtime_region_reports_rejected_total", "无效会话或重复的客户端区域上报数")
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def start(self) -> None:
+        """启动后台探测任务，必须在事件循环内调用"""
+        if self._task is not None:
+            return
+        self._client = httpx.AsyncClient(timeout=self.probe_timeout)
+        self._task = asyncio.get_running_loop().create_task(self._probe_loop())
+        logger.info(f"Realtime区域健康检查已启动: {', '.join(r.name for r in self.regions)}")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self.probe_interval)
+
+    async def probe_all(self) -> None:
+        """并发探测所有区域（熔断中的区域在冷却期内跳过）"""
+        await asyncio.gather(*(self._probe(region) for region in self.regions if region.breaker.available))
+
+    async def _probe(self, region: RegionHealth) -> None:
+        """
+        探测单个区域：能在超时内返回非5xx响应即视为可达（未携带令牌时返回401/405属正常）
+        """
+        started = time.monotonic()
+        try:
+            response = await self._client.options(region.url)
+            latency_ms = (time.monotonic() - started) * 1000
+            if response.status_code >= 500:
+                region.record(False, error=f"HTTP {response.status_code}")
+            else:
+                region.record(True, latency_ms)
+        except httpx.HTTPError as e:
+            region.record(False, error=type(e).__name__)
+
+    def allow_reports(self, session_id: str) -> None:
+        """/api/realtime/token 签发令牌时调用，允许该会话在有效期内上报连接结果"""
+        if not session_id:
+            return
+        self._expire_report_sessions()
+        while len(self._report_sessions) >= self.max_report_sessions:
+            self._report_sessions.popitem(last=False)
+        self._report_sessions[session_id] = (time.monotonic() + self.report_ttl, set())
+
+    def _expire_report_sessions(self) -> None:
+        now = time.monotonic()
+        while self._report_sessions:
+            session_id, (deadline, _) = next(iter(self._report_sessions.items()))
+            if deadline > now:
+                break
+            self._report_sessions.popitem(last=False)
+
+    def report(self, session_id: str, url: str, success: bool, latency_ms: Optional[float] = None) -> bool:
+        """
+        记录客户端实际建立连接的结果（计入独立的客户端信号）
+
+        Returns:
+            url是否为已知区域
+
+        Raises:
+            RegionReportRejected: 会话ID无效、已过期，或该会话已上报过该区域
+        """
+        region = self._by_url.get(url.split("?")[0])
+        if region is None:
+            return False
+        self._expire_report_sessions()
+        entry = self._report_sessions.get(session_id) if session_id else None
+        if entry is None or region.url in entry[1]:
+            self._rejected.inc()
+            raise RegionReportRejected("无效的会话ID或重复上报")
+        entry[1].add(region.url)
+        # 连接成功后会话不再尝试其他区域
+        if success or len(entry[1]) >= len(self.regions):
+            self._report_sessions.pop(session_id, None)
+        region.record_client(success, latency_ms)
+        return True
+
+    def ranked_configs(self) -> List[Dict[str, Any]]:
+        """按得分排序的端点配置；熔断中的区域排在最后，作为最后的回退"""
+        ordered = sorted(self.regions, key=lambda r: (not r.breaker.available, r.score))
+        return [region.config for region in ordered]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        ordered = sorted(self.regions, key=lambda r: (not r.breaker.available, r.score))
+        return [region.snapshot() for region in ordered]
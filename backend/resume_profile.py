@@ -0,0 +1,195 @@
+"""
+简历结构化模块
+
+上传时对简历文本做一次规整：去掉联系方式等与面试无关的个人信息，按标题切分为技能、工作经历、
+项目经历、教育背景等段落，合并空白、去除重复行，并限制各段长度。
+面试对话和评估的prompt使用渲染后的精简文本，代替每轮都注入的原始简历全文。
+"""
+import re
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Any
+
+# 段落名称 → 识别标题的关键词（按行首匹配，标题行通常很短）
+SECTION_KEYWORDS = {
+    "summary": ["个人简介", "自我评价", "个人总结", "个人优势", "求职意向", "summary", "profile", "objective"],
+    "skills": ["专业技能", "技能清单", "技术栈", "技能特长", "技能", "skills", "technical skills"],
+    "experience": ["工作经历", "工作经验", "实习经历", "实习经验", "职业经历", "experience", "work experience", "employment"],
+    "projects": ["项目经历", "项目经验", "项目", "projects"],
+    "education": ["教育背景", "教育经历", "学历", "education"],
+    "awards": ["获奖情况", "荣誉奖项", "证书", "荣誉", "awards", "certifications"],
+}
+
+SECTION_TITLES = {
+    "summary": "个人概述",
+    "skills": "技能",
+    "experience": "工作经历",
+    "projects": "项目经历",
+    "education": "教育背景",
+    "awards": "证书与奖项",
+    "other": "其他",
+}
+
+# 各段落在精简上下文中的字符上限
+SECTION_LIMITS = {
+    "summary": 300,
+    "skills": 600,
+    "experience": 1500,
+    "projects": 1200,
+    "education": 300,
+    "awards": 200,
+    "other": 1500,
+}
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE = re.compile(r"(?<!\d)(?:\+?86[- ]?)?1[3-9]\d[- ]?\d{4}[- ]?\d{4}(?!\d)|(?<!\d)0\d{2,3}-\d{7,8}(?!\d)")
+_ID_CARD = re.compile(r"(?<!\d)\d{17}[\dXx](?!\d)")
+_URL = re.compile(r"https?://\S+|www\.\S+")
+# 只包含个人信息的行直接删除；PDF提取的文本常在中文标签的字间插入空格（"姓    名 ："）
+_CONTACT_LABELS = (
+    "姓名", "电话", "手机", "联系电话", "联系方式", "邮箱", "电子邮件", "微信", "地址", "住址", "现居", "身份证",
+    "出生日期", "出生年月", "生日", "年龄", "性别", "民族", "籍贯", "婚姻状况", "政治面貌"
+)
+_CONTACT_LINE = re.compile(
+    r"^\s*(" + "|".join(r"\s*".join(label) for label in _CONTACT_LABELS)
+    + r"|e-?mail|wechat|qq|phone|tel|mobile|address)\s*[:：]",
+    re.IGNORECASE
+)
+_PAGE_MARK = re.compile(r"^(第\s*\d+\s*页.*|page \d+( of \d+)?|\d{1,3}\s*/\s*\d{1,3})$", re.IGNORECASE)
+_SKILL_SPLIT = re.compile(r"[,，、;；/|·•\n]+")
+_BULLET = re.compile(r"^[\s\-*•·●▪◆■\d.、)）]+")
+
+
+@dataclass
+class ResumeProfile:
+    """结构化简历"""
+
+    sections: Dict[str, str] = field(default_factory=dict)
+    skills: List[str] = field(default_factory=list)
+    source_length: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ResumeProfile":
+        return cls(
+            sections=dict(data.get("sections") or {}),
+            skills=list(data.get("skills") or []),
+            source_length=int(data.get("source_length") or 0)
+        )
+
+    def to_context(self) -> str:
+        """渲染为注入prompt的精简文本"""
+        parts = []
+        if self.skills:
+            parts.append(f"【技能】{'、'.join(self.skills)}")
+        for name in SECTION_TITLES:
+            if name == "skills" or not self.sections.get(name):
+                continue
+            parts.append(f"【{SECTION_TITLES[name]}】\n{self.sections[name]}")
+        return "\n".join(parts)
+
+
+def _strip_contact(line: str) -> str:
+    if _CONTACT_LINE.match(line):
+        return ""
+    for pattern in (_EMAIL, _PHONE, _ID_CARD, _URL):
+        line = pattern.sub("", line)
+    return line
+
+
+def _match_heading(line: str) -> Optional[str]:
+    """标题行返回段落名称"""
+    heading = line.strip(" :：#*-—|【】[]").lower()
+    if not heading or len(heading) > 20:
+        return None
+    for name, keywords in SECTION_KEYWORDS.items():
+        if any(heading == k or heading.startswith(k) and len(heading) <= len(k) + 4 for k in keywords):
+            return name
+    return None
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut if cut > limit // 2 else limit].rstrip() + " …"
+
+
+def _parse_skills(text: str, limit: int = 40) -> List[str]:
+    skills = []
+    seen = set()
+    for token in _SKILL_SPLIT.split(text):
+        token = _BULLET.sub("", token).strip(" .。:：")
+        # 过长的通常是描述性句子而不是技能名
+        if not token or len(token) > 30:
+            continue
+        key = token.lower()
+        if key not in seen:
+            seen.add(key)
+            skills.append(token)
+        if len(skills) >= limit:
+            break
+    return skills
+
+
+def build_resume_profile(resume_text: str) -> ResumeProfile:
+    """
+    将简历原文规整为结构化简历
+
+    Args:
+        resume_text: 简历原文
+
+    Returns:
+        ResumeProfile: 去除联系方式、按段落切分后的简历
+    """
+    buckets: Dict[str, List[str]] = {}
+    current = "summary"
+    seen_lines = set()
+    found_heading = False
+
+    for raw_line in resume_text.splitlines():
+        line = re.sub(r"\s+", " ", _strip_contact(raw_line)).strip()
+        if not line or _PAGE_MARK.match(line):
+            continue
+        heading = _match_heading(line)
+        if heading:
+            current = heading
+            found_heading = True
+            continue
+        # "专业技能：Python、Go" 这类标题与内容同行的情况
+        title, sep, rest = line.partition("：") if "：" in line else line.partition(":")
+        heading = _match_heading(title) if sep and rest.strip() else None
+        if heading:
+            current = heading
+            found_heading = True
+            line = rest.strip()
+        # PDF页眉页脚等重复行只保留一次
+        if line in seen_lines:
+            continue
+        seen_lines.add(line)
+        buckets.setdefault(current, []).append(line)
+
+    # 没有识别出任何标题时，全文作为其他信息保留（不按个人概述的长度截断）
+    if not found_heading and buckets:
+        buckets = {"other": buckets["summary"]}
+
+    sections = {
+        name: _truncate("\n".join(lines), SECTION_LIMITS.get(name, 300))
+        for name, lines in buckets.items()
+        if name != "skills"
+    }
+    skills = _parse_skills("\n".join(buckets.get("skills", [])))
+    return ResumeProfile(sections=sections, skills=skills, source_length=len(resume_text))
+
+
+def redact_resume_text(resume_text: str, limit: int = SECTION_LIMITS["other"]) -> str:
+    """
+    去除联系方式并截断的简历原文，结构化结果为空时代替原文注入prompt
+
+    Args:
+        resume_text: 简历原文
+        limit: 字符上限
+    """
+    lines = (re.sub(r"\s+", " ", _strip_contact(line)).strip() for line in resume_text.splitlines())
+    return _truncate("\n".join(line for line in lines if line), limit)
@@ -0,0 +1,453 @@
+"""
+全文倒排索引模块
+
+对已上传的简历（以及后续的面试记录）建立倒排索引，支持中英文混合检索：
+- 英文/数字按词切分并转小写，保留 c++、c#、node.js 这类技术名词
+- 中文按字符二元组（bigram）切分，不依赖分词词典；索引时同时写入单字，单字查询（如姓氏、"锁"）也能命中，
+  多字查询仍只用二元组匹配
+- 多个检索词取交集，按BM25打分排序
+
+磁盘格式：
+- index.bin  快照，zlib压缩；文档表为JSON，倒排表为varint编码的（文档号差值, 词频）序列
+- index.log  追加写的JSON行日志，每次上传追加一条，启动时在快照之上重放
+
+多worker部署时各进程各自维护内存索引，检索前检查日志增长并重放其他进程追加的记录；
+日志记录以内容哈希去重，重复重放是幂等的。快照和日志记录带格式版本，切分规则变化后旧版本的数据被忽略，
+启动时由共享会话存储回填。
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+from backend.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"RIDX1\n"
+# 切分规则或记录格式变化时递增
+_INDEX_VERSION = 2
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*|[\u3400-\u4dbf\u4e00-\u9fff]+")
+_CJK_START = "\u3400"
+
+# BM25参数
+_K1 = 1.2
+_B = 0.75
+
+
+def tokenize(text: str, unigrams: bool = False) -> List[str]:
+    """
+    切分检索词
+
+    英文/数字词转小写并去掉末尾标点；连续的中文按字符二元组切分，单字保留为一元组。
+
+    Args:
+        unigrams: 连续中文同时输出每个单字（建立索引时使用）
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        if token[0] >= _CJK_START:
+            if len(token) == 1:
+                tokens.append(token)
+            else:
+                tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+                if unigrams:
+                    tokens.extend(token)
+        else:
+            token = token.rstrip(".-")
+            if token:
+                tokens.append(token)
+    return tokens
+
+
+def _encode_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_postings(buf: bytes) -> Iterator[Tuple[int, int]]:
+    """解码倒排表，依次产出(文档号, 词频)"""
+    doc = 0
+    value = shift = 0
+    expect_doc = True
+    for byte in buf:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if expect_doc:
+            doc += value
+        else:
+            yield doc, value
+        expect_doc = not expect_doc
+        value = shift = 0
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+class InvertedIndex:
+    """支持增量追加、可持久化的倒排索引"""
+
+    def __init__(self, directory: str, compact_threshold: int = 1000):
+        """
+        Args:
+            directory: 索引文件目录
+            compact_threshold: 日志记录数超过该值时在启动/关闭时合并为快照
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.directory / "index.bin"
+        self.log_path = self.directory / "index.log"
+        self.lock_path = self.directory / "index.lock"
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.RLock()
+        self._reset()
+
+        self._docs_gauge = metrics.gauge("search_index_documents", "倒排索引中的文档数")
+        self._search_latency = metrics.histogram("search_query_seconds", "全文检索耗时")
+
+    def _reset(self) -> None:
+        # 文档号 → 文档ID / 长度 / 元数据 / 内容哈希；删除或被替换的文档号记为墓碑
+        self._doc_ids: List[Optional[str]] = []
+        self._doc_lengths: List[int] = []
+        self._doc_meta: List[Dict[str, Any]] = []
+        self._doc_hashes: List[str] = []
+        self._doc_numbers: Dict[str, int] = {}
+        # 日志中追加的文档号 → 词项（删除时扣减文档频率）；快照中的文档删除时扫描倒排表
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._tombstones = set()
+        self._total_length = 0
+        # 词项 → varint编码的倒排表 / 文档频率 / 最后一个文档号（用于差值编码）
+        self._postings: Dict[str, bytearray] = {}
+        self._df: Dict[str, int] = {}
+        self._last_doc: Dict[str, int] = {}
+        self._log_offset = 0
+        self._log_records = 0
+        self._snapshot_mtime = 0.0
+
+    # 状态
+
+    @property
+    def document_count(self) -> int:
+        return len(self._doc_numbers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": self.document_count,
+                "terms": len(self._postings),
+                "tombstones": len(self._tombstones),
+                "postings_bytes": sum(len(p) for p in self._postings.values()),
+                "log_records": self._log_records
+            }
+
+    # 加载与持久化
+
+    def load(self) -> None:
+        """加载快照并重放日志"""
+        with self._lock:
+            self._reset()
+            if self.snapshot_path.exists():
+                self._load_snapshot()
+            self._replay_log()
+            self._docs_gauge.set(self.document_count)
+        logger.info(f"全文索引已加载: 文档{self.document_count}个, 词项{len(self._postings)}个")
+
+    def refresh(self) -> None:
+        """重放其他进程追加的日志；快照被其他进程重写时整体重新加载"""
+        try:
+            snapshot_mtime = self.snapshot_path.stat().st_mtime if self.snapshot_path.exists() else 0.0
+            log_size = self.log_path.stat().st_size if self.log_path.exists() else 0
+        except OSError:
+            return
+        if snapshot_mtime != self._snapshot_mtime or log_size < self._log_offset:
+            self.load()
+        elif log_size > self._log_offset:
+            with self._lock:
+                self._replay_log()
+                self._docs_gauge.set(self.document_count)
+
+    def _load_snapshot(self) -> None:
+        raw = self.snapshot_path.read_bytes()
+        self._snapshot_mtime = self.snapshot_path.stat().st_mtime
+        if not raw.startswith(_MAGIC):
+            logger.warning(f"全文索引快照格式不正确，已忽略: {self.snapshot_path}")
+            return
+        payload = zlib.decompress(raw[len(_MAGIC):])
+
+        header_end = payload.index(b"\n")
+        header = json.loads(payload[:header_end])
+        if header.get("version") != _INDEX_VERSION:
+            logger.warning(f"全文索引快照版本已过期，将重新建立: {self.snapshot_path}")
+            return
+        for doc_id, length, doc_hash, meta in header["docs"]:
+            self._doc_numbers[doc_id] = len(self._doc_ids)
+            self._doc_ids.append(doc_id)
+            self._doc_lengths.append(length)
+            self._doc_hashes.append(doc_hash)
+            self._doc_meta.append(meta)
+            self._total_length += length
+
+        pos = header_end + 1
+        while pos < len(payload):
+            term_length, pos = _read_varint(payload, pos)
+            term = payload[pos:pos + term_length].decode("utf-8")
+            pos += term_length
+            df, pos = _read_varint(payload, pos)
+            last_doc, pos = _read_varint(payload, pos)
+            size, pos = _read_varint(payload, pos)
+            self._postings[term] = bytearray(payload[pos:pos + size])
+            self._df[term] = df
+            self._last_doc[term] = last_doc
+            pos += size
+
+    def _replay_log(self) -> None:
+        if not self.log_path.exists():
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                # 只处理完整的行，写到一半的记录留到下次
+                if not line.endswith(b"\n"):
+                    break
+                self._log_offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("v") != _INDEX_VERSION:
+                    continue
+                self._log_records += 1
+                if record.get("op") == "add":
+                    self._apply_add(record["id"], record["hash"], record["len"], record["meta"], record["tf"])
+                elif record.get("op") == "delete":
+                    self._apply_delete(record["id"])
+
+    def compact(self) -> None:
+        """把当前索引写为快照并清空日志（去掉墓碑，重新编号）"""
+        with self._file_lock(exclusive=True), self._lock:
+            # 先合并其他进程追加但本进程尚未重放的记录
+            self._replay_log()
+            live = [n for n, doc_id in enumerate(self._doc_ids) if doc_id is not None and n not in self._tombstones]
+            renumber = {old: new for new, old in enumerate(live)}
+
+            header = {"version": _INDEX_VERSION, "docs": [
+                [self._doc_ids[n], self._doc_lengths[n], self._doc_hashes[n], self._doc_meta[n]] for n in live
+            ]}
+            body = bytearray(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+            for term, postings in self._postings.items():
+                encoded = bytearray()
+                previous = df = 0
+                for doc, tf in _decode_postings(postings):
+                    if doc not in renumber:
+                        continue
+                    new_doc = renumber[doc]
+                    _encode_varint(new_doc - previous, encoded)
+                    _encode_varint(tf, encoded)
+                    previous = new_doc
+                    df += 1
+                if not df:
+                    continue
+                term_bytes = term.encode("utf-8")
+                _encode_varint(len(term_bytes), body)
+                body += term_bytes
+                _encode_varint(df, body)
+                _encode_varint(previous, body)
+                _encode_varint(len(encoded), body)
+                body += encoded
+
+            tmp_path = self.snapshot_path.with_suffix(".tmp")
+            tmp_path.write_bytes(_MAGIC + zlib.compress(bytes(body), 6))
+            os.replace(tmp_path, self.snapshot_path)
+            open(self.log_path, "wb").close()
+            self.load()
+
+    def maybe_compact(self) -> None:
+        if self._log_records >= self.compact_threshold or self._tombstones:
+            self.compact()
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """跨进程文件锁：追加日志持共享锁，合并快照持排他锁（不支持fcntl的平台上不加锁）"""
+        with open(self.lock_path, "a") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _append_log(self, record: Dict[str, Any]) -> None:
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        # O_APPEND单次写入，多进程追加时各条记录不会交错
+        with self._file_lock(exclusive=False):
+            fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    # 增量更新
+
+    def add_document(self, doc_id: str, text: str, meta: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        索引或更新一个文档
+
+        Args:
+            doc_id: 文档ID，如 resume:<session_id>
+            text: 文档全文
+            meta: 随检索结果返回的元数据
+
+        Returns:
+            是否有变化（内容未变时返回False）
+        """
+        doc_hash = hashlib.md5(text.encode("utf-8")).hexdigest()
+        tokens = tokenize(text, unigrams=True)
+        record = {
+            "v": _INDEX_VERSION, "op": "add", "id": doc_id, "hash": doc_hash, "len": len(tokens),
+            "meta": meta or {}, "tf": dict(Counter(tokens))
+        }
+        with self._lock:
+            number = self._doc_numbers.get(doc_id)
+            if number is not None and self._doc_hashes[number] == doc_hash:
+                return False
+            self._append_log(record)
+            self._apply_add(doc_id, doc_hash, record["len"], record["meta"], record["tf"])
+            self._docs_gauge.set(self.document_count)
+        return True
+
+    def delete_document(self, doc_id: str) -> None:
+        with self._lock:
+            if doc_id in self._doc_numbers:
+                self._append_log({"v": _INDEX_VERSION, "op": "delete", "id": doc_id})
+                self._apply_delete(doc_id)
+                self._docs_gauge.set(self.document_count)
+
+    def _apply_add(self, doc_id: str, doc_hash: str, length: int, meta: Dict[str, Any], tf: Dict[str, int]) -> None:
+        number = self._doc_numbers.get(doc_id)
+        if number is not None:
+            if self._doc_hashes[number] == doc_hash:
+                return
+            self._apply_delete(doc_id)
+
+        number = len(self._doc_ids)
+        self._doc_numbers[doc_id] = number
+        self._doc_ids.append(doc_id)
+        self._doc_lengths.append(length)
+        self._doc_hashes.append(doc_hash)
+        self._doc_meta.append(meta)
+        self._total_length += length
+        self._doc_terms[number] = tuple(tf)
+
+        for term, count in tf.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = bytearray()
+            _encode_varint(number - self._last_doc.get(term, 0), postings)
+            _encode_varint(count, postings)
+            self._last_doc[term] = number
+            self._df[term] = self._df.get(term, 0) + 1
+
+    def _apply_delete(self, doc_id: str) -> None:
+        number = self._doc_numbers.pop(doc_id, None)
+        if number is None:
+            return
+        self._tombstones.add(number)
+        self._total_length -= self._doc_lengths[number]
+        # 文档频率只统计存活文档，否则IDF在下次合并快照前持续偏移
+        terms = self._doc_terms.pop(number, None)
+        if terms is None:
+            terms = [term for term, postings in self._postings.items()
+                     if any(doc == number for doc, _ in _decode_postings(postings))]
+        for term in terms:
+            self._df[term] -= 1
+
+    # 检索
+
+    def search(self, query: str, limit: int = 20, doc_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        检索同时包含所有查询词的文档，按BM25得分降序返回
+
+        Args:
+            query: 查询文本
+            limit: 返回结果数上限
+            doc_type: 只返回该类型的文档（元数据中的type字段）
+        """
+        started = time.perf_counter()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            if any(not self._df.get(term) for term in terms):
+                return []
+            live_docs = max(1, self.document_count)
+            avg_length = self._total_length / live_docs if self._total_length else 1.0
+
+            # 从文档频率最低的词开始求交集，候选集合尽快缩小
+            terms.sort(key=lambda t: self._df[t])
+            scores: Optional[Dict[int, float]] = None
+            for term in terms:
+                idf = math.log(1 + (live_docs - self._df[term] + 0.5) / (self._df[term] + 0.5))
+                term_scores = {}
+                for doc, tf in _decode_postings(self._postings[term]):
+                    if doc in self._tombstones or (scores is not None and doc not in scores):
+                        continue
+                    norm = _K1 * (1 - _B + _B * self._doc_lengths[doc] / avg_length)
+                    term_scores[doc] = idf * tf * (_K1 + 1) / (tf + norm)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc: scores[doc] + s for doc, s in term_scores.items()}
+                if not scores:
+                    break
+
+            hits = []
+            for doc, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+                meta = self._doc_meta[doc]
+                if doc_type and meta.get("type") != doc_type:
+                    continue
+                hits.append({"id": self._doc_ids[doc], "score": round(score, 4), "meta": meta})
+                if len(hits) >= limit:
+                    break
+
+        self._search_latency.observe(time.perf_counter() - started)
+        return hits
+
+
+def make_snippet(text: str, query: str, width: int = 80) -> str:
+    """截取首个命中词附近的一段原文作为摘要"""
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in tokenize(query)]
+    positions = [p for p in positions if p >= 0]
+    start = max(0, min(positions) - width // 4) if positions else 0
+    snippet = re.sub(r"\s+", " ", text[start:start + width]).strip()
+    return ("…" if start > 0 else "") + snippet + ("…" if start + width < len(text) else "")
@@ -0,0 +1,49 @@
+"""
+JSON序列化模块
+
+/ws/voice 的音频帧携带大段base64字符串，评估结果、简历接口的响应体也较大，标准库json在这些路径上
+占用了可观的CPU。这里统一提供 dumps / loads：安装了orjson时使用orjson，否则回退到标准库，
+输出与Starlette的 send_json / JSONResponse 一致（UTF-8、不转义非ASCII、紧凑分隔符）。
+"""
+import json
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于部署环境
+    orjson = None
+
+# 非字符串键（如整数ID）和numpy标量/数组按标准库json的方式处理
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+BACKEND = "orjson" if orjson else "json"
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """序列化为UTF-8字节"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    """序列化为字符串（WebSocket文本帧）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """反序列化"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """使用 dumps_bytes 渲染的JSONResponse，用作应用的默认响应类"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
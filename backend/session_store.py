@@ -0,0 +1,592 @@
+"""
+共享会话存储模块
+
+基于SQLite（WAL模式）的跨进程简历会话存储，多worker部署时任意worker都能按session_id读取简历
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 面试历史的排序方式 → (键集分页的排序列, 方向)；最后一列为主键，保证顺序唯一
+INTERVIEW_SORTS = {
+    "date_desc": (("created_at", "interview_id"), "DESC"),
+    "date_asc": (("created_at", "interview_id"), "ASC"),
+    "duration_desc": (("duration", "created_at", "interview_id"), "DESC"),
+}
+
+_INTERVIEW_SUMMARY_COLUMNS = (
+    "interview_id", "session_id", "created_at", "duration", "message_count", "total_score", "summary"
+)
+
+
+class SessionStore:
+    """SQLite会话存储，每个线程持有独立连接"""
+
+    def __init__(self, db_path: str, busy_timeout_ms: int = 5000):
+        """
+        Args:
+            db_path: SQLite数据库文件路径
+            busy_timeout_ms: 写锁等待超时（毫秒）
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000.0, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+            # WAL允许多个worker进程并发读、单写不阻塞读
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS resumes (
+                session_id TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS resume_profiles (
+                resume_hash TEXT PRIMARY KEY,
+                profile TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS resume_fingerprints (
+                resume_hash TEXT PRIMARY KEY,
+                canonical_hash TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS resume_lsh_buckets (
+                band_key INTEGER NOT NULL,
+                resume_hash TEXT NOT NULL,
+                PRIMARY KEY (band_key, resume_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        # 面试对话记录，只追加不修改；自增id即写入顺序；按客户端ID隔离，interview_id 由客户端生成不能作为凭据
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcript_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                interview_id TEXT NOT NULL,
+                session_id TEXT NOT NULL DEFAULT '',
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                owner_id TEXT NOT NULL DEFAULT ''
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transcript_interview ON transcript_entries (interview_id, id)"
+        )
+        # 面试历史摘要（列表只读这张表），完整对话在 transcript_entries，评估结果单独一列按需读取
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS interviews (
+                interview_id TEXT PRIMARY KEY,
+                owner_id TEXT NOT NULL,
+                session_id TEXT NOT NULL DEFAULT '',
+                created_at REAL NOT NULL,
+                duration INTEGER NOT NULL DEFAULT 0,
+                message_count INTEGER NOT NULL DEFAULT 0,
+                total_score REAL,
+                summary TEXT NOT NULL DEFAULT '',
+                evaluation TEXT,
+                updated_at REAL NOT NULL,
+                position TEXT NOT NULL DEFAULT ''
+            )
+            """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(interviews)")}
+        if "position" not in columns:
+            conn.execute("ALTER TABLE interviews ADD COLUMN position TEXT NOT NULL DEFAULT ''")
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(transcript_entries)")}
+        if "owner_id" not in columns:
+            conn.execute("ALTER TABLE transcript_entries ADD COLUMN owner_id TEXT NOT NULL DEFAULT ''")
+            # 已有记录归属于已保存面试的客户端
+            conn.execute(
+                "UPDATE transcript_entries SET owner_id = COALESCE("
+                "(SELECT owner_id FROM interviews WHERE interviews.interview_id = transcript_entries.interview_id), '')"
+            )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transcript_owner ON transcript_entries (owner_id, interview_id, id)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_interviews_owner_date ON interviews (owner_id, created_at, interview_id)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_interviews_owner_duration "
+            "ON interviews (owner_id, duration, created_at, interview_id)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_interviews_evaluated ON interviews (created_at, interview_id) "
+            "WHERE evaluation IS NOT NULL"
+        )
+        # 评分汇总：每个(日期, 面试方向)一行，stats为定长数值向量（布局见 backend.analytics）
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS score_rollups (
+                day TEXT NOT NULL,
+                position TEXT NOT NULL,
+                stats BLOB NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (day, position)
+            ) WITHOUT ROWID
+            """
+        )
+
+    def save_resume(self, session_id: str, resume_text: str) -> None:
+        """
+        保存简历内容（同一session_id重复上传时覆盖）
+
+        Args:
+            session_id: 会话ID
+            resume_text: 简历文本内容
+        """
+        now = time.time()
+        self._connect().execute(
+            """
+            INSERT INTO resumes (session_id, content, created_at, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET content = excluded.content, updated_at = excluded.updated_at
+            """,
+            (session_id, resume_text, now, now)
+        )
+
+    def get_resume(self, session_id: str) -> Optional[str]:
+        """
+        读取简历内容
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            简历文本内容，不存在时返回None
+        """
+        row = self._connect().execute(
+            "SELECT content FROM resumes WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def iter_resumes(self, batch_size: int = 500) -> Iterator[Tuple[str, str]]:
+        """
+        按session_id顺序分批遍历所有简历
+
+        Yields:
+            (session_id, 简历文本内容)
+        """
+        last = ""
+        while True:
+            rows = self._connect().execute(
+                "SELECT session_id, content FROM resumes WHERE session_id > ? ORDER BY session_id LIMIT ?",
+                (last, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last = rows[-1][0]
+
+    def save_profile(self, resume_hash: str, profile: Dict[str, Any]) -> None:
+        """
+        保存结构化简历（简历内容相同则哈希相同，直接覆盖）
+
+        Args:
+            resume_hash: 简历内容哈希
+            profile: 结构化简历
+        """
+        self._connect().execute(
+            "INSERT OR REPLACE INTO resume_profiles (resume_hash, profile, created_at) VALUES (?, ?, ?)",
+            (resume_hash, json.dumps(profile, ensure_ascii=False), time.time())
+        )
+
+    def get_profile(self, resume_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        读取结构化简历
+
+        Args:
+            resume_hash: 简历内容哈希
+
+        Returns:
+            结构化简历，不存在时返回None
+        """
+        row = self._connect().execute(
+            "SELECT profile FROM resume_profiles WHERE resume_hash = ?", (resume_hash,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_fingerprint(self, resume_hash: str, canonical_hash: str, signature: bytes, band_keys: List[int]) -> None:
+        """
+        保存简历的MinHash签名及LSH桶
+
+        Args:
+            resume_hash: 简历内容哈希
+            canonical_hash: 近似重复时指向最早的那份简历，否则为自身
+            signature: MinHash签名
+            band_keys: LSH各段桶键
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO resume_fingerprints (resume_hash, canonical_hash, signature, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (resume_hash, canonical_hash, signature, time.time())
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO resume_lsh_buckets (band_key, resume_hash) VALUES (?, ?)",
+                [(key, resume_hash) for key in band_keys]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def find_fingerprint_candidates(self, band_keys: List[int], limit: int = 50) -> List[Tuple[str, str, bytes]]:
+        """
+        查找与任一LSH桶相同的简历
+
+        Returns:
+            (简历哈希, 规范简历哈希, 签名) 列表
+        """
+        placeholders = ",".join("?" * len(band_keys))
+        return self._connect().execute(
+            f"""
+            SELECT f.resume_hash, f.canonical_hash, f.signature FROM resume_fingerprints f
+            WHERE f.resume_hash IN (
+                SELECT DISTINCT resume_hash FROM resume_lsh_buckets WHERE band_key IN ({placeholders})
+            )
+            LIMIT ?
+            """,
+            (*band_keys, limit)
+        ).fetchall()
+
+    def get_canonical_hash(self, resume_hash: str) -> Optional[str]:
+        """简历对应的规范简历哈希，未登记时返回None"""
+        row = self._connect().execute(
+            "SELECT canonical_hash FROM resume_fingerprints WHERE resume_hash = ?", (resume_hash,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def append_transcript(self, entries: List[Tuple[str, str, str, str, str, float]]) -> int:
+        """
+        批量追加面试对话记录（单个事务）；面试已保存且属于其他客户端时跳过该条
+
+        Args:
+            entries: (interview_id, owner_id, session_id, role, content, created_at) 列表
+
+        Returns:
+            实际写入的条数
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT INTO transcript_entries (interview_id, owner_id, session_id, role, content, created_at)
+                SELECT ?1, ?2, ?3, ?4, ?5, ?6 WHERE NOT EXISTS (
+                    SELECT 1 FROM interviews WHERE interview_id = ?1 AND owner_id NOT IN ('', ?2)
+                )
+                """,
+                entries
+            )
+            written = conn.total_changes - before
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return written
+
+    def get_transcript(self, interview_id: str, owner_id: str) -> List[Dict[str, Any]]:
+        """
+        按写入顺序读取客户端一场面试的对话记录
+
+        Returns:
+            [{"role", "content", "session_id", "created_at"}]
+        """
+        rows = self._connect().execute(
+            "SELECT role, content, session_id, created_at FROM transcript_entries "
+            "WHERE owner_id = ? AND interview_id = ? ORDER BY id",
+            (owner_id, interview_id)
+        ).fetchall()
+        return [
+            {"role": role, "content": content, "session_id": session_id, "created_at": created_at}
+            for role, content, session_id, created_at in rows
+        ]
+
+    def save_interview(self, interview_id: str, owner_id: str, session_id: str, created_at: float,
+                       duration: int, message_count: int) -> bool:
+        """
+        保存面试摘要（重复保存时更新时长和消息数，保留已有的评估结果）
+
+        Args:
+            interview_id: 面试ID
+            owner_id: 客户端ID，历史记录按它隔离
+            session_id: 简历会话ID
+            created_at: 面试开始时间（时间戳）
+            duration: 面试时长（秒）
+            message_count: 对话条数
+
+        Returns:
+            该面试已属于其他客户端时返回False
+        """
+        cursor = self._connect().execute(
+            """
+            INSERT INTO interviews (interview_id, owner_id, session_id, created_at, duration, message_count, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(interview_id) DO UPDATE SET
+                owner_id = excluded.owner_id, session_id = excluded.session_id, duration = excluded.duration,
+                message_count = excluded.message_count, updated_at = excluded.updated_at
+            WHERE interviews.owner_id IN ('', excluded.owner_id)
+            """,
+            (interview_id, owner_id, session_id, created_at, duration, message_count, time.time())
+        )
+        return cursor.rowcount > 0
+
+    def save_interview_evaluation(self, interview_id: str, owner_id: str, total_score: Optional[float],
+                                  summary: str, evaluation: Dict[str, Any],
+                                  position: str = "") -> Optional[Tuple[float, str, Optional[Dict[str, Any]]]]:
+        """
+        保存面试评估结果；面试摘要尚未保存时先创建
+
+        已有记录只允许其所属客户端（或认领无主记录的客户端）更新；未提供客户端ID时只能新建，不能覆盖已有记录。
+
+        Args:
+            interview_id: 面试ID
+            owner_id: 客户端ID，为空表示匿名请求
+            total_score: 总分
+            summary: 评估总结
+            evaluation: 完整评估结果
+            position: 面试方向
+
+        Returns:
+            (面试创建时间, 之前的面试方向, 之前的评估结果)，供增量更新评分汇总；未写入（面试属于其他客户端或匿名覆盖）时返回None
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            previous = conn.execute(
+                "SELECT created_at, position, evaluation FROM interviews WHERE interview_id = ?", (interview_id,)
+            ).fetchone()
+            cursor = conn.execute(
+                """
+                INSERT INTO interviews (interview_id, owner_id, created_at, total_score, summary, evaluation,
+                                        updated_at, position)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(interview_id) DO UPDATE SET
+                    owner_id = CASE WHEN interviews.owner_id = '' THEN excluded.owner_id ELSE interviews.owner_id END,
+                    total_score = excluded.total_score, summary = excluded.summary,
+                    evaluation = excluded.evaluation, updated_at = excluded.updated_at, position = excluded.position
+                WHERE excluded.owner_id <> '' AND interviews.owner_id IN ('', excluded.owner_id)
+                """,
+                (interview_id, owner_id, now, total_score, summary, json.dumps(evaluation, ensure_ascii=False),
+                 now, position)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if cursor.rowcount <= 0:
+            return None
+        if previous is None:
+            return now, "", None
+        created_at, previous_position, previous_evaluation = previous
+        return created_at, previous_position, json.loads(previous_evaluation) if previous_evaluation else None
+
+    def list_interviews(self, owner_id: str, sort: str = "date_desc", after: Optional[List[Any]] = None,
+                        limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        键集分页读取面试摘要（不读取评估结果和对话）
+
+        Args:
+            owner_id: 客户端ID
+            sort: INTERVIEW_SORTS 中的排序方式
+            after: 上一页最后一条的排序列取值，None表示第一页
+            limit: 条数
+
+        Returns:
+            面试摘要列表，含 has_evaluation
+        """
+        columns, direction = INTERVIEW_SORTS[sort]
+        where = "owner_id = ?"
+        params: List[Any] = [owner_id]
+        if after:
+            operator = "<" if direction == "DESC" else ">"
+            where += f" AND ({', '.join(columns)}) {operator} ({', '.join('?' * len(columns))})"
+            params.extend(after)
+        order = ", ".join(f"{column} {direction}" for column in columns)
+        rows = self._connect().execute(
+            f"SELECT {', '.join(_INTERVIEW_SUMMARY_COLUMNS)}, evaluation IS NOT NULL FROM interviews "
+            f"WHERE {where} ORDER BY {order} LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        items = []
+        for row in rows:
+            item = dict(zip(_INTERVIEW_SUMMARY_COLUMNS, row))
+            item["has_evaluation"] = bool(row[-1])
+            items.append(item)
+        return items
+
+    def get_interview(self, owner_id: str, interview_id: str) -> Optional[Dict[str, Any]]:
+        """
+        读取面试摘要和评估结果
+
+        Returns:
+            不存在或不属于该客户端时返回None
+        """
+        row = self._connect().execute(
+            f"SELECT {', '.join(_INTERVIEW_SUMMARY_COLUMNS)}, evaluation FROM interviews "
+            "WHERE interview_id = ? AND owner_id = ?",
+            (interview_id, owner_id)
+        ).fetchone()
+        if not row:
+            return None
+        item = dict(zip(_INTERVIEW_SUMMARY_COLUMNS, row))
+        item["evaluation"] = json.loads(row[-1]) if row[-1] else None
+        item["has_evaluation"] = item["evaluation"] is not None
+        return item
+
+    def delete_interviews(self, owner_id: str,
+                          interview_id: Optional[str] = None) -> Tuple[int, List[Tuple[float, str, Dict[str, Any]]]]:
+        """
+        删除面试记录及其对话；interview_id 为None时删除该客户端的全部记录
+
+        Returns:
+            (删除的面试数, 被删除面试的 (创建时间, 面试方向, 评估结果) 列表)，后者用于扣减评分汇总
+        """
+        conn = self._connect()
+        where = "owner_id = ?" + (" AND interview_id = ?" if interview_id is not None else "")
+        params = (owner_id,) if interview_id is None else (owner_id, interview_id)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            evaluations = conn.execute(
+                f"SELECT created_at, position, evaluation FROM interviews WHERE {where} AND evaluation IS NOT NULL",
+                params
+            ).fetchall()
+            conn.execute(f"DELETE FROM transcript_entries WHERE {where}", params)
+            deleted = conn.execute(f"DELETE FROM interviews WHERE {where}", params).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return deleted, [
+            (created_at, position, json.loads(evaluation)) for created_at, position, evaluation in evaluations
+        ]
+
+    def iter_evaluations(self, start: float, end: float,
+                         batch_size: int = 1000) -> Iterator[List[Tuple[str, float, int, str, Dict[str, Any]]]]:
+        """
+        按面试时间顺序分批遍历已评估的面试
+
+        Args:
+            start: 起始时间戳（含）
+            end: 结束时间戳（不含）
+
+        Yields:
+            每批 (interview_id, 创建时间, 时长, 面试方向, 评估结果) 列表
+        """
+        last = (start, "")
+        while True:
+            rows = self._connect().execute(
+                """
+                SELECT interview_id, created_at, duration, position, evaluation FROM interviews
+                WHERE evaluation IS NOT NULL AND (created_at, interview_id) > (?, ?) AND created_at < ?
+                ORDER BY created_at, interview_id LIMIT ?
+                """,
+                (last[0], last[1], end, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            yield [(row[0], row[1], row[2], row[3], json.loads(row[4])) for row in rows]
+            last = (rows[-1][1], rows[-1][0])
+
+    def update_rollups(self, deltas: List[Tuple[str, str, bytes]], merge: Callable[[Optional[bytes], bytes], bytes],
+                       replace: bool = False) -> None:
+        """
+        在一个事务中累加评分汇总
+
+        Args:
+            deltas: (日期, 面试方向, 增量) 列表
+            merge: (已有值或None, 增量) → 新值
+            replace: 为真时先清空全部汇总（重建）
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if replace:
+                conn.execute("DELETE FROM score_rollups")
+            now = time.time()
+            for day, position, delta in deltas:
+                row = conn.execute(
+                    "SELECT stats FROM score_rollups WHERE day = ? AND position = ?", (day, position)
+                ).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO score_rollups (day, position, stats, updated_at) VALUES (?, ?, ?, ?)",
+                    (day, position, merge(row[0] if row else None, delta), now)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_rollups(self, start_day: str, end_day: str, position: Optional[str] = None) -> List[Tuple[str, str, bytes]]:
+        """
+        读取日期区间（含两端）内的评分汇总
+
+        Returns:
+            (日期, 面试方向, 汇总值) 列表，按日期排序
+        """
+        sql = "SELECT day, position, stats FROM score_rollups WHERE day >= ? AND day <= ?"
+        params: List[Any] = [start_day, end_day]
+        if position is not None:
+            sql += " AND position = ?"
+            params.append(position)
+        return self._connect().execute(sql + " ORDER BY day", params).fetchall()
+
+    def count_transcript(self, interview_id: str, owner_id: str) -> int:
+        """客户端一场面试已记录的对话条数"""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM transcript_entries WHERE owner_id = ? AND interview_id = ?", (owner_id, interview_id)
+        ).fetchone()[0]
+
+    def count(self) -> int:
+        """已存储的简历数量"""
+        return self._connect().execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def close(self) -> None:
+        """关闭当前线程的连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,181 @@
+"""
+Realtime临时令牌代理模块
+
+后端预先向Azure OpenAI申请一小批Realtime会话临时令牌（ephemeral key）放入池中，
+后台任务按需补充并在过期前丢弃。浏览器发起语音通话时只需一次本地请求即可拿到令牌，
+不再需要跨区域往返，也不再需要在前端持有API密钥。
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Optional, Any
+
+import httpx
+
+from backend.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBrokerError(Exception):
+    """临时令牌申请失败"""
+
+
+class RealtimeTokenBroker:
+    """预申请的Realtime临时令牌池"""
+
+    def __init__(
+        self,
+        sessions_url: str,
+        api_key: str,
+        session_payload: Dict[str, Any],
+        pool_size: int = 3,
+        safety_margin: float = 15.0,
+        default_ttl: float = 60.0,
+        request_timeout: float = 10.0
+    ):
+        """
+        Args:
+            sessions_url: Realtime sessions接口地址
+            api_key: Azure OpenAI API密钥（仅保存在服务端）
+            session_payload: 创建会话的请求体
+            pool_size: 池中保持的令牌数量
+            safety_margin: 距过期不足该秒数的令牌不再发放
+            default_ttl: 响应中没有expires_at时假定的有效期（秒）
+            request_timeout: 申请令牌的请求超时
+        """
+        self.sessions_url = sessions_url
+        self.api_key = api_key
+        self.session_payload = session_payload
+        self.pool_size = pool_size
+        self.safety_margin = safety_margin
+        self.default_ttl = default_ttl
+        self.request_timeout = request_timeout
+
+        self._pool: deque = deque()
+        self._refill_event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self._pool_gauge = metrics.gauge("realtime_token_pool_size", "可用的预申请临时令牌数")
+        self._hits = metrics.counter("realtime_token_pool_hits_total", "命中令牌池的次数")
+        self._misses = metrics.counter("realtime_token_pool_misses_total", "令牌池为空时同步申请的次数")
+        self._expired = metrics.counter("realtime_token_expired_total", "过期前被丢弃的令牌数")
+        self._mint_latency = metrics.histogram("realtime_token_mint_seconds", "申请临时令牌耗时")
+
+    def start(self) -> None:
+        """启动后台补充任务，必须在事件循环内调用"""
+        if self._task is not None:
+            return
+        self._client = httpx.AsyncClient(timeout=self.request_timeout)
+        self._task = asyncio.get_running_loop().create_task(self._refill_loop())
+        logger.info(f"Realtime临时令牌池已启动: 容量={self.pool_size}")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def acquire(self) -> Dict[str, Any]:
+        """
+        取出一个可用令牌（每个令牌只发放一次）；池为空时同步申请
+
+        Returns:
+            dict: 包含session_id、client_secret、expires_at及是否命中池
+        """
+        self._discard_expiring()
+        if self._pool:
+            token = self._pool.popleft()
+            self._hits.inc()
+            pool_hit = True
+        else:
+            self._misses.inc()
+            token = await self._mint()
+            pool_hit = False
+
+        self._pool_gauge.set(len(self._pool))
+        self._refill_event.set()
+        return dict(token, pool_hit=pool_hit)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "pool_size": len(self._pool),
+            "capacity": self.pool_size,
+            "seconds_to_expiry": [round(t["expires_at"] - now, 1) for t in self._pool]
+        }
+
+    def _discard_expiring(self) -> None:
+        """丢弃即将过期的令牌"""
+        deadline = time.time() + self.safety_margin
+        while self._pool and self._pool[0]["expires_at"] <= deadline:
+            self._pool.popleft()
+            self._expired.inc()
+
+    async def _mint(self) -> Dict[str, Any]:
+        """向Azure申请一个新的Realtime会话令牌"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.request_timeout)
+
+        started = time.monotonic()
+        try:
+            response = await self._client.post(
+                self.sessions_url,
+                headers={"api-key": self.api_key, "Content-Type": "application/json"},
+                json=self.session_payload
+            )
+        except httpx.HTTPError as e:
+            raise TokenBrokerError(f"申请临时令牌失败: {e}")
+        finally:
+            self._mint_latency.observe(time.monotonic() - started)
+
+        if response.status_code != 200:
+            raise TokenBrokerError(f"申请临时令牌失败: {response.status_code} {response.text[:200]}")
+
+        data = response.json()
+        secret = data.get("client_secret") or {}
+        if not secret.get("value"):
+            raise TokenBrokerError("响应中缺少client_secret")
+
+        return {
+            "session_id": data.get("id"),
+            "client_secret": secret["value"],
+            "expires_at": float(secret.get("expires_at") or time.time() + self.default_ttl)
+        }
+
+    async def _refill_loop(self) -> None:
+        """保持池中有pool_size个未过期的令牌"""
+        backoff = 1.0
+        while True:
+            self._discard_expiring()
+            try:
+                while len(self._pool) < self.pool_size:
+                    self._pool.append(await self._mint())
+                    # 按过期时间排序，优先发放最早过期的令牌
+                    self._pool = deque(sorted(self._pool, key=lambda t: t["expires_at"]))
+                backoff = 1.0
+            except Exception as e:
+                logger.warning(f"补充临时令牌失败，{backoff:.0f}秒后重试: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            finally:
+                self._pool_gauge.set(len(self._pool))
+
+            # 等到最早的令牌进入安全边界或有令牌被取走时再检查
+            wait = self.default_ttl
+            if self._pool:
+                wait = max(0.5, self._pool[0]["expires_at"] - self.safety_margin - time.time())
+            self._refill_event.clear()
+            try:
+                await asyncio.wait_for(self._refill_event.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
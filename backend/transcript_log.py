@@ -0,0 +1,184 @@
+"""
+服务端面试对话记录模块
+
+对话记录原先只存在浏览器的localStorage中，评估时由前端上传完整的消息列表。这里在 /ws/voice 上直接记录
+候选人输入（文字消息、语音输入转写）和面试官回复（text_delta / transcript_delta 拼接），按 interview_id
+追加写入共享存储（SessionStore 的 transcript_entries 表），评估接口可以只传 interview_id。
+
+interview_id 由客户端生成，不能作为凭据：记录按客户端ID（/ws/voice 的 client_id 参数，HTTP接口的
+X-Client-Id 请求头）隔离，读取和追加都限定在同一客户端内；未提供客户端ID的连接不记录。
+
+写入经 TranscriptLog 批量进行：append 只把条目放入内存缓冲，后台任务按时间间隔或条数批量写入一个事务，
+不在语音事件处理路径上等待SQLite。
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Any
+
+from backend.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 面试官回复的来源帧类型
+ASSISTANT_FIELDS = {
+    "text_delta": "content",
+    "transcript_delta": "content",
+}
+
+# 语音输入转写完成后下发的帧类型
+INPUT_TRANSCRIPT_TYPE = "input_transcript"
+
+
+class TranscriptLog:
+    """只追加的对话记录，批量写入SessionStore"""
+
+    def __init__(self, store, flush_interval: float = 1.0, max_batch: int = 200, max_pending: int = 10000):
+        """
+        Args:
+            store: SessionStore
+            flush_interval: 批量写入间隔（秒）
+            max_batch: 缓冲达到该条数时立即写入
+            max_pending: 缓冲上限，存储持续不可用时丢弃最旧的条目
+        """
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+
+        self._pending: List[tuple] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self._appended = metrics.counter("transcript_entries_total", "记录的对话条目数")
+        self._batches = metrics.counter("transcript_flush_batches_total", "对话记录批量写入次数")
+        self._dropped = metrics.counter("transcript_dropped_entries_total", "写入失败且超出缓冲上限而丢弃的条目数")
+        self._rejected = metrics.counter("transcript_rejected_entries_total", "面试属于其他客户端而未写入的条目数")
+        self._flush_seconds = metrics.histogram("transcript_flush_seconds", "对话记录单批写入耗时")
+
+    def start(self) -> None:
+        """启动后台写入任务，必须在事件循环内调用"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """停止后台任务并写入剩余条目"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def append(self, interview_id: str, owner_id: str, role: str, content: str, session_id: str = "") -> None:
+        """追加一条记录（只进入缓冲，不等待写入）"""
+        if not interview_id or not owner_id or not content.strip():
+            return
+        self._pending.append((interview_id, owner_id, session_id or "", role, content, time.time()))
+        self._appended.inc()
+        if len(self._pending) > self.max_pending:
+            overflow = len(self._pending) - self.max_pending
+            del self._pending[:overflow]
+            self._dropped.inc(overflow)
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """把缓冲中的条目写入存储；失败时放回缓冲等待下次重试"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            started = time.perf_counter()
+            try:
+                written = await asyncio.to_thread(self.store.append_transcript, batch)
+            except Exception as e:
+                logger.error(f"写入对话记录失败（{len(batch)}条，稍后重试）: {e}")
+                self._pending[:0] = batch
+                return
+            if written < len(batch):
+                self._rejected.inc(len(batch) - written)
+            self._batches.inc()
+            self._flush_seconds.observe(time.perf_counter() - started)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def get_messages(self, interview_id: str, owner_id: str) -> List[Dict[str, Any]]:
+        """
+        读取客户端一场面试的对话记录，格式与前端上传的 messages 一致
+
+        Returns:
+            [{"type": "user" | "assistant", "content", "timestamp"}]
+        """
+        # 先写入缓冲中的条目，保证读到完整记录
+        await self.flush()
+        if not owner_id:
+            return []
+        return to_messages(await asyncio.to_thread(self.store.get_transcript, interview_id, owner_id))
+
+
+def to_messages(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """SessionStore.get_transcript 的结果转为前端 messages 格式"""
+    return [
+        {
+            "type": entry["role"],
+            "content": entry["content"],
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(entry["created_at"]))
+        }
+        for entry in entries
+    ]
+
+
+class TranscriptRecorder:
+    """包装下行发送器：转发帧的同时把候选人输入和面试官回复写入对话记录"""
+
+    def __init__(self, sender, log: TranscriptLog, owner_id: str):
+        """
+        Args:
+            sender: 下游发送器（CoalescingSender / QueuedSender / ResumableSession）
+            log: 对话记录
+            owner_id: 连接所属的客户端ID
+        """
+        self.sender = sender
+        self.log = log
+        self.owner_id = owner_id
+        self.interview_id = ""
+        self.session_id = ""
+        self._parts: Dict[str, List[str]] = {}
+
+    def start_turn(self, interview_id: str, session_id: str = "", user_message: str = "") -> None:
+        """开始一轮对话；文字输入直接记录，语音输入等待转写帧"""
+        self.end_turn()
+        self.interview_id = interview_id
+        self.session_id = session_id
+        if interview_id and user_message:
+            self.log.append(interview_id, self.owner_id, "user", user_message, session_id)
+
+    def end_turn(self) -> None:
+        """记录本轮面试官回复（优先使用文本，没有文本时使用语音转录）"""
+        parts = self._parts.get("text_delta") or self._parts.get("transcript_delta")
+        self._parts = {}
+        if self.interview_id and parts:
+            self.log.append(self.interview_id, self.owner_id, "assistant", "".join(parts), self.session_id)
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        frame_type = data.get("type")
+        if self.interview_id:
+            field = ASSISTANT_FIELDS.get(frame_type)
+            if field is not None:
+                self._parts.setdefault(frame_type, []).append(data.get(field) or "")
+            elif frame_type == INPUT_TRANSCRIPT_TYPE:
+                self.log.append(self.interview_id, self.owner_id, "user", data.get("content") or "", self.session_id)
+            elif frame_type == "response_done":
+                self.end_turn()
+        await self.sender.send_json(data)
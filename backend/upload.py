@@ -0,0 +1,204 @@
+"""
+简历上传处理模块
+
+上传请求体在ASGI层按字节计数，超过上限立即以413中止；multipart解析后的文件由Starlette写入
+SpooledTemporaryFile（小文件在内存，大文件落盘），这里按块读取该文件完成大小校验并增量计算摘要，
+解析器直接从该文件流读取，不再在内存中保留整份文件副本。
+"""
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException, UploadFile
+
+logger = logging.getLogger(__name__)
+
+# 简历存储目录
+RESUME_STORAGE_DIR = Path("resume_storage")
+
+ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx'}
+ALLOWED_MIME_TYPES = {
+    'application/pdf',
+    'application/msword',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+}
+
+
+def _too_large_detail(max_size: int) -> str:
+    return f"文件大小超过限制（最大{max_size // (1024 * 1024)}MB）"
+
+
+@dataclass
+class SpooledUpload:
+    """已校验大小的上传文件"""
+
+    stream: BinaryIO
+    size: int
+    sha256: str
+
+
+async def spool_upload(file: UploadFile, max_size: int, chunk_size: int = 64 * 1024) -> SpooledUpload:
+    """
+    按块读取上传文件，超过大小上限立即中止，同时增量计算SHA-256
+
+    Args:
+        file: 上传的文件对象
+        max_size: 文件大小上限（字节）
+        chunk_size: 每次读取的块大小
+
+    Returns:
+        SpooledUpload: 已回到文件开头的文件流、大小和摘要
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    await file.seek(0)
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise HTTPException(status_code=413, detail=_too_large_detail(max_size))
+        digest.update(chunk)
+
+    await file.seek(0)
+    return SpooledUpload(stream=file.file, size=size, sha256=digest.hexdigest())
+
+
+class UploadSizeLimitMiddleware:
+    """纯ASGI中间件：限制指定路径的请求体大小，边接收边计数，超限立即返回413"""
+
+    def __init__(self, app, max_body_size: int, paths: tuple):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        # 声明了Content-Length时无需读取请求体即可拒绝
+        for key, value in scope.get("headers", []):
+            if key.lower() == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > self.max_body_size:
+                    await self._reject(send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # FastAPI解析请求体时会原样抛出HTTPException，由异常处理返回413
+                    raise HTTPException(status_code=413, detail=_too_large_detail(self.max_body_size))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send) -> None:
+        body = ('{"detail": "%s"}' % _too_large_detail(self.max_body_size)).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def validate_file(file: UploadFile, max_size: int) -> None:
+    """
+    验证上传的文件
+
+    Args:
+        file: 上传的文件对象
+        max_size: 文件大小上限（字节）
+    """
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="文件名不能为空")
+
+    file_extension = Path(file.filename).suffix.lower()
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的文件格式。支持的格式: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+
+    # multipart解析时已知大小的直接拒绝，流式读取时还会再次校验
+    if file.size is not None and file.size > max_size:
+        raise HTTPException(status_code=413, detail=_too_large_detail(max_size))
+
+    if file.content_type not in ALLOWED_MIME_TYPES:
+        logger.warning(f"文件MIME类型检查: {file.content_type}")
+        # 不强制检查MIME类型，因为有些浏览器可能发送不准确的类型
+
+
+def generate_resume_hash(resume_text: str) -> str:
+    """
+    生成简历内容的哈希值，用于去重和验证
+
+    Args:
+        resume_text: 简历文本内容
+
+    Returns:
+        简历内容的MD5哈希值
+    """
+    return hashlib.md5(resume_text.encode('utf-8')).hexdigest()[:16]
+
+
+def save_resume_to_file(resume_text: str, session_id: str, storage_dir: Path = RESUME_STORAGE_DIR) -> bool:
+    """
+    将简历文本保存到文件
+
+    Args:
+        resume_text: 简历文本内容
+        session_id: 会话ID
+        storage_dir: 存储目录
+
+    Returns:
+        保存是否成功
+    """
+    try:
+        resume_file = storage_dir / f"{session_id}.txt"
+        with open(resume_file, 'w', encoding='utf-8') as f:
+            f.write(resume_text)
+        logger.info(f"简历已保存到文件: {resume_file}")
+        return True
+    except Exception as e:
+        logger.error(f"保存简历文件失败: {e}")
+        return False
+
+
+def load_resume_from_file(session_id: str, storage_dir: Path = RESUME_STORAGE_DIR) -> Optional[str]:
+    """
+    从文件加载简历文本
+
+    Args:
+        session_id: 会话ID
+        storage_dir: 存储目录
+
+    Returns:
+        简历文本内容，如果文件不存在则返回None
+    """
+    try:
+        resume_file = storage_dir / f"{session_id}.txt"
+        if resume_file.exists():
+            with open(resume_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            logger.info(f"从文件加载简历: {resume_file}")
+            return content
+        return None
+    except Exception as e:
+        logger.error(f"加载简历文件失败: {e}")
+        return None
@@ -0,0 +1,247 @@
+"""
+/ws/voice 会话恢复模块
+
+候选人网络短暂中断时，原来的 /ws/voice 连接直接结束，进行中的回复（Realtime上游仍在生成）全部丢失，
+客户端只能重新提问，又要付出一次新的Azure会话和提示词开销。这里为每个连接签发恢复令牌（resume token），
+下行帧经 ResumableSession 编号（seq）并保留在日志中，直到客户端确认（ack）：
+
+- 客户端以 /ws/voice?resume=1 声明支持恢复（未声明的连接不编号、不保留帧）
+- 新连接收到 session_ready 帧，携带 resume_token；之后每个下行帧带递增的 seq
+- 客户端定期发送 {"type": "ack", "seq": N}，服务端丢弃 seq <= N 的已确认帧
+- 连接断开后会话进入保留窗口，期间进行中的回复继续写入日志
+- 客户端带 resume_token 和 last_seq 重连，服务端回复 session_resumed 并重放 seq > last_seq 的帧，
+  之后的帧直接发往新连接，一次往返即可恢复
+
+日志按帧数和字节数限制，超出时淘汰最旧的帧，此时 session_resumed 的 complete 为false。
+会话只保存在进程内，多worker部署时需要会话亲和（客户端重连时携带相同的 session_id）。
+"""
+import asyncio
+import logging
+import secrets
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Any, Tuple
+
+from backend.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_size(frame: Dict[str, Any]) -> int:
+    """估算帧大小：只计算音频/文本载荷，其余字段按固定开销"""
+    payload = frame.get("audio_data") or frame.get("content") or ""
+    return len(payload) + 64
+
+
+class ResumableSession:
+    """可恢复的下行会话：为帧编号、保留未确认帧，并转发到当前连接的发送器"""
+
+    def __init__(self, token: str, retention: float, max_frames: int = 512, max_bytes: int = 2 * 1024 * 1024):
+        """
+        Args:
+            token: 恢复令牌
+            retention: 断开后的保留时间（秒），随 session_ready 告知客户端
+            max_frames: 日志最多保留的未确认帧数
+            max_bytes: 日志最多保留的未确认帧字节数（估算）
+        """
+        self.token = token
+        self.retention = retention
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.created_at = time.time()
+        self.detached_at: Optional[float] = None
+        self.last_seq = 0
+        self.acked_seq = 0
+
+        self._journal: deque = deque()  # (seq, frame, size)
+        self._journal_bytes = 0
+        self._transport = None
+        self._lock = asyncio.Lock()
+
+        self._evicted = metrics.counter("ws_resume_evicted_frames_total", "超出保留上限被淘汰的未确认帧数")
+        self._replayed = metrics.counter("ws_resume_replayed_frames_total", "会话恢复时重放的帧数")
+
+    @property
+    def attached(self) -> bool:
+        return self._transport is not None
+
+    @property
+    def pending(self) -> int:
+        """未确认的帧数"""
+        return len(self._journal)
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        """编号并记录一帧，已连接时转发给当前发送器；断开期间只写入日志"""
+        async with self._lock:
+            self.last_seq += 1
+            frame = dict(data)
+            frame["seq"] = self.last_seq
+            self._retain(frame)
+            if self._transport is not None:
+                await self._transport.send_json(frame)
+
+    def _retain(self, frame: Dict[str, Any]) -> None:
+        size = _frame_size(frame)
+        self._journal.append((frame["seq"], frame, size))
+        self._journal_bytes += size
+        while len(self._journal) > self.max_frames or self._journal_bytes > self.max_bytes:
+            _, _, evicted = self._journal.popleft()
+            self._journal_bytes -= evicted
+            self._evicted.inc()
+
+    def ack(self, seq: int) -> None:
+        """客户端确认已收到 seq 及之前的帧"""
+        seq = min(int(seq), self.last_seq)
+        if seq <= self.acked_seq:
+            return
+        self.acked_seq = seq
+        while self._journal and self._journal[0][0] <= seq:
+            _, _, size = self._journal.popleft()
+            self._journal_bytes -= size
+
+    async def attach(self, transport, last_seq: Optional[int] = None) -> Tuple[int, Any]:
+        """
+        绑定新连接的发送器
+
+        last_seq 为None表示新会话，发送 session_ready；否则发送 session_resumed 并重放 seq > last_seq 的帧。
+        持锁完成重放，保证重放帧在之后的实时帧之前。
+
+        Returns:
+            (重放帧数, 被替换的旧发送器)；旧连接尚未被服务端发现断开时由调用方关闭
+        """
+        async with self._lock:
+            previous = self._transport
+            self._transport = transport
+            self.detached_at = None
+
+            if last_seq is None:
+                await transport.send_json({
+                    "type": "session_ready",
+                    "resume_token": self.token,
+                    "retention_s": self.retention
+                })
+                return 0, previous
+
+            self.ack(last_seq)
+            replay = [frame for seq, frame, _ in self._journal if seq > last_seq]
+            # 日志开头恰好接在 last_seq 之后（或没有更新的帧）时才是完整重放
+            if self._journal:
+                complete = self._journal[0][0] <= last_seq + 1
+            else:
+                complete = self.last_seq <= last_seq
+            await transport.send_json({
+                "type": "session_resumed",
+                "resume_token": self.token,
+                "last_seq": last_seq,
+                "replayed": len(replay),
+                "complete": complete
+            })
+            for frame in replay:
+                await transport.send_json(frame)
+            self._replayed.inc(len(replay))
+            return len(replay), previous
+
+    def detach(self, transport) -> bool:
+        """连接结束时解绑；会话已被新连接接管时返回False"""
+        if self._transport is not transport:
+            return False
+        self._transport = None
+        self.detached_at = time.time()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "last_seq": self.last_seq,
+            "acked_seq": self.acked_seq,
+            "pending_frames": len(self._journal),
+            "pending_bytes": self._journal_bytes,
+            "attached": self.attached
+        }
+
+
+class ResumeRegistry:
+    """进程内的可恢复会话表：已断开的会话保留 retention 秒后过期"""
+
+    def __init__(self, retention: float = 30.0, max_frames: int = 512, max_bytes: int = 2 * 1024 * 1024,
+                 max_sessions: int = 10000):
+        """
+        Args:
+            retention: 断开后的保留时间（秒）
+            max_frames: 每个会话保留的未确认帧数上限
+            max_bytes: 每个会话保留的未确认帧字节数上限
+            max_sessions: 会话总数上限，超出时提前淘汰最早断开的会话
+        """
+        self.retention = retention
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.max_sessions = max_sessions
+
+        self._sessions: Dict[str, ResumableSession] = {}
+        # 已断开的会话，按过期时间排序：令牌 → 过期时间
+        self._detached: "OrderedDict[str, float]" = OrderedDict()
+
+        self._sessions_gauge = metrics.gauge("ws_resume_sessions", "保留中的可恢复会话数")
+        self._detached_gauge = metrics.gauge("ws_resume_detached_sessions", "已断开、等待恢复的会话数")
+        self._resumed = metrics.counter("ws_resume_success_total", "成功恢复的会话数")
+        self._failed = metrics.counter("ws_resume_failed_total", "恢复令牌无效或已过期的重连数")
+        self._expired = metrics.counter("ws_resume_expired_total", "保留窗口内未恢复而过期的会话数")
+
+    def create(self) -> ResumableSession:
+        """创建新会话"""
+        self._expire()
+        while len(self._sessions) >= self.max_sessions and self._detached:
+            token, _ = self._detached.popitem(last=False)
+            self._discard(token)
+        session = ResumableSession(secrets.token_urlsafe(24), self.retention, self.max_frames, self.max_bytes)
+        self._sessions[session.token] = session
+        self._update_gauges()
+        return session
+
+    def resume(self, token: str) -> Optional[ResumableSession]:
+        """按令牌取回保留中的会话；令牌无效或已过期时返回None"""
+        self._expire()
+        session = self._sessions.get(token) if token else None
+        if session is None:
+            self._failed.inc()
+            return None
+        self._detached.pop(token, None)
+        self._resumed.inc()
+        self._update_gauges()
+        return session
+
+    def detach(self, session: ResumableSession, transport) -> None:
+        """连接结束：会话进入保留窗口（已被新连接接管的除外）"""
+        if not session.detach(transport):
+            return
+        if session.token in self._sessions:
+            self._detached[session.token] = time.monotonic() + self.retention
+            self._detached.move_to_end(session.token)
+        self._expire()
+        self._update_gauges()
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        while self._detached:
+            token, deadline = next(iter(self._detached.items()))
+            if deadline > now:
+                break
+            self._detached.popitem(last=False)
+            self._discard(token)
+            self._expired.inc()
+
+    def _discard(self, token: str) -> None:
+        session = self._sessions.pop(token, None)
+        if session is not None and session.pending:
+            logger.info(f"可恢复会话过期，丢弃 {session.pending} 个未确认帧")
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        self._sessions_gauge.set(len(self._sessions))
+        self._detached_gauge.set(len(self._detached))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "detached": len(self._detached),
+            "retention_s": self.retention
+        }
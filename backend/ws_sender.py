@@ -0,0 +1,375 @@
+"""
+WebSocket下行发送模块
+
+文本增量合并（CoalescingSender）：
+Realtime上游的 response.text.delta / response.audio_transcript.delta 往往只有一两个字符，逐个转发时
+数百个会话就是每秒数万次极小的发送。CoalescingSender 按连接把同类型的连续文本增量在一个短时间窗口
+（或累计到一定长度）内合并为一帧：
+
+- 只合并 text_delta / transcript_delta，按 content 字段拼接
+- 音频增量与文本增量相互独立，audio_delta 直接发送，不打断文本合并（窗口内二者的相对顺序可能变化，
+  各自流内的顺序不变）
+- 其他帧（*_done、response_done、错误等）发送前先刷出待合并内容，保证完成事件在全部增量之后
+
+有界发送队列（QueuedSender）：
+候选人网络慢时，直接 await websocket.send_json 会卡住 Realtime 事件循环，进而积压上游连接。
+QueuedSender 把帧放入按连接的有界队列，由独立的写协程序列化（orjson）并发送，调用方只在队列满时才可能等待。
+队列满时：
+
+1. 先无损压缩：新的文本增量并入队列中同类型的增量，队列中同类型的连续文本增量合并为一帧；帧带序号（会话恢复）
+   时合并不跨过中间的音频帧，否则合并帧取后一帧的序号，客户端确认它时会连带确认尚未收到的音频帧
+2. drop_text 策略只丢弃最旧的语音转录增量（transcript_delta，仅作字幕参考）；text_delta 组成前端显示的
+   回复正文且 text_done 不携带全文，和音频帧、控制帧一样从不丢弃
+3. 仍然没有空间时等待写协程腾出空间（反压到上游），超时则判定为慢消费者并关闭连接（1013）；
+   close 策略不等待，队列满立即关闭
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Optional, Any
+
+from backend.metrics import metrics
+from backend.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# 可合并的帧类型 → 拼接的字段
+COALESCE_FIELDS = {
+    "text_delta": "content",
+    "transcript_delta": "content",
+}
+
+# 不刷出待合并文本、直接发送的帧类型
+PASSTHROUGH_TYPES = frozenset({"audio_delta"})
+
+# drop_text 策略下允许丢弃的帧类型
+DROPPABLE_TYPES = frozenset({"transcript_delta"})
+
+
+def _can_skip(frame: Dict[str, Any]) -> bool:
+    """文本增量合并时能否跨过该帧：只有不带序号的音频帧可以"""
+    return frame.get("type") in PASSTHROUGH_TYPES and "seq" not in frame
+
+
+def _merge_text(frame: Dict[str, Any], later: Dict[str, Any], field: str) -> Dict[str, Any]:
+    """把后一个文本增量拼接到前一个上；带序号（会话恢复）时取后一帧的序号"""
+    merged = dict(frame)
+    merged[field] = (merged.get(field) or "") + (later.get(field) or "")
+    if "seq" in later:
+        merged["seq"] = later["seq"]
+    return merged
+
+
+class CoalescingSender:
+    """合并文本增量帧的发送器，接口与 WebSocket.send_json 一致"""
+
+    def __init__(self, websocket, flush_interval: float = 0.04, max_chars: int = 200,
+                 fields: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            websocket: 下游WebSocket连接
+            flush_interval: 首个增量进入后最多等待的时间（秒）
+            max_chars: 累计字符数达到该值时立即发送
+            fields: 可合并的帧类型 → 拼接字段，默认 COALESCE_FIELDS
+        """
+        self.websocket = websocket
+        self.flush_interval = flush_interval
+        self.max_chars = max_chars
+        self.fields = fields or COALESCE_FIELDS
+
+        self._pending: Optional[Dict[str, Any]] = None
+        self._parts: list = []
+        self._chars = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock = asyncio.Lock()
+
+        self.frames_in = 0
+        self.frames_out = 0
+        self._in_counter = metrics.counter("ws_delta_frames_in_total", "合并前的文本增量帧数")
+        self._out_counter = metrics.counter("ws_delta_frames_out_total", "合并后发送的文本增量帧数")
+        self._saved_counter = metrics.counter("ws_delta_frames_saved_total", "合并节省的WebSocket帧数")
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        """发送一帧；文本增量进入合并缓冲，其他帧按类型直接发送或先刷出缓冲"""
+        frame_type = data.get("type")
+        field = self.fields.get(frame_type)
+
+        async with self._lock:
+            if field is None:
+                if frame_type not in PASSTHROUGH_TYPES:
+                    await self._flush_locked()
+                await self.websocket.send_json(data)
+                return
+
+            self.frames_in += 1
+            self._in_counter.inc()
+            if self._pending is not None and self._pending.get("type") != frame_type:
+                await self._flush_locked()
+
+            content = data.get(field) or ""
+            if self._pending is None:
+                self._pending = dict(data)
+                self._parts = [content]
+                self._chars = len(content)
+                self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._on_timer)
+            else:
+                self._parts.append(content)
+                self._chars += len(content)
+
+            if self._chars >= self.max_chars:
+                await self._flush_locked()
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        asyncio.ensure_future(self._timed_flush())
+
+    async def _timed_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            # 连接已断开等情况，由接收循环负责清理
+            logger.debug(f"定时刷出增量帧失败: {e}")
+
+    async def flush(self) -> None:
+        """立即发送待合并的增量"""
+        async with self._lock:
+            await self._flush_locked()
+
+    async def _flush_locked(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending is None:
+            return
+
+        frame = self._pending
+        frame[self.fields[frame["type"]]] = "".join(self._parts)
+        merged = len(self._parts)
+        self._pending = None
+        self._parts = []
+        self._chars = 0
+
+        self.frames_out += 1
+        self._out_counter.inc()
+        if merged > 1:
+            self._saved_counter.inc(merged - 1)
+        await self.websocket.send_json(frame)
+
+    async def close(self) -> None:
+        """刷出剩余内容（连接已断开时丢弃）"""
+        try:
+            await self.flush()
+        except Exception:
+            self._pending = None
+        if self.frames_in:
+            logger.info(f"文本增量帧合并: {self.frames_in} → {self.frames_out}，"
+                        f"节省 {self.frames_in - self.frames_out} 帧")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "frames_saved": self.frames_in - self.frames_out
+        }
+
+
+class QueuedSender:
+    """有界发送队列 + 独立写协程，接口与 WebSocket.send_json 一致"""
+
+    POLICIES = ("drop_text", "block", "close")
+
+    def __init__(self, websocket, max_frames: int = 256, policy: str = "drop_text", block_timeout: float = 5.0):
+        """
+        Args:
+            websocket: 下游WebSocket连接
+            max_frames: 队列最多容纳的帧数
+            policy: 队列满时的策略，drop_text / block / close
+            block_timeout: 等待队列腾出空间的最长时间（秒），超时关闭连接
+        """
+        if policy not in self.POLICIES:
+            logger.warning(f"未知的队列溢出策略 {policy}，使用 drop_text")
+            policy = "drop_text"
+        self.websocket = websocket
+        self.max_frames = max_frames
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self._queue: deque = deque()
+        self._not_empty = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._writer: Optional[asyncio.Task] = None
+        self._sending = False
+        self._closed = False
+
+        self.high_water = 0
+        self.dropped = 0
+        self._depth_gauge = metrics.gauge("ws_send_queue_depth", "所有连接发送队列中的帧数")
+        self._slow_gauge = metrics.gauge("ws_send_queue_max_depth", "单个连接发送队列的最大深度")
+        self._send_seconds = metrics.histogram("ws_send_seconds", "单帧WebSocket发送耗时")
+        self._compacted = metrics.counter("ws_send_compacted_frames_total", "队列满时合并的文本增量帧数")
+        self._dropped = metrics.counter("ws_send_dropped_frames_total", "队列满时丢弃的语音转录增量帧数")
+        self._dropped_closed = metrics.counter("ws_send_dropped_after_close_total", "连接关闭后丢弃的帧数")
+        self._slow_closed = metrics.counter("ws_slow_consumers_closed_total", "因发送队列持续积压而关闭的连接数")
+
+    def start(self) -> None:
+        """启动写协程"""
+        self._writer = asyncio.get_running_loop().create_task(self._run())
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        """帧入队；队列满时按策略处理，连接已关闭时直接丢弃"""
+        if self._closed:
+            self._dropped_closed.inc()
+            return
+        if len(self._queue) >= self.max_frames and not await self._make_room(data):
+            return
+        self._queue.append(data)
+        self._depth_gauge.inc()
+        if len(self._queue) > self.high_water:
+            self.high_water = len(self._queue)
+            if self.high_water > self._slow_gauge.value:
+                self._slow_gauge.set(self.high_water)
+        self._not_empty.set()
+
+    async def _make_room(self, data: Dict[str, Any]) -> bool:
+        """为新帧腾出位置；返回False表示新帧没有单独入队（已并入队列或被丢弃）"""
+        if self._merge_into_queue(data):
+            return False
+        self._compact()
+        if len(self._queue) < self.max_frames:
+            return True
+
+        if self.policy == "close":
+            await self._close_slow_consumer()
+            return False
+
+        if self.policy == "drop_text":
+            if self._drop_oldest_text():
+                return True
+            if data.get("type") in DROPPABLE_TYPES:
+                self._count_dropped()
+                return False
+
+        try:
+            await asyncio.wait_for(self._wait_for_space(), self.block_timeout)
+        except asyncio.TimeoutError:
+            await self._close_slow_consumer()
+            return False
+        return not self._closed
+
+    async def _wait_for_space(self) -> None:
+        while len(self._queue) >= self.max_frames and not self._closed:
+            self._space.clear()
+            await self._space.wait()
+
+    def _merge_into_queue(self, data: Dict[str, Any]) -> bool:
+        """新的文本增量直接并入队列中尚未发送的同类型增量，不占用新位置"""
+        field = COALESCE_FIELDS.get(data.get("type"))
+        if field is None:
+            return False
+        for index in range(len(self._queue) - 1, -1, -1):
+            frame = self._queue[index]
+            if frame.get("type") == data["type"]:
+                self._queue[index] = _merge_text(frame, data, field)
+                self._compacted.inc()
+                return True
+            if not _can_skip(frame):
+                return False
+        return False
+
+    def _compact(self) -> None:
+        """合并队列中同类型的连续文本增量；不带序号的音频帧不打断合并，其他帧之后重新开始"""
+        compacted: list = []
+        open_text: Dict[str, int] = {}
+        merged = 0
+        for frame in self._queue:
+            frame_type = frame.get("type")
+            field = COALESCE_FIELDS.get(frame_type)
+            if field is None:
+                if not _can_skip(frame):
+                    open_text.clear()
+                compacted.append(frame)
+            elif frame_type in open_text:
+                index = open_text[frame_type]
+                compacted[index] = _merge_text(compacted[index], frame, field)
+                merged += 1
+            else:
+                open_text[frame_type] = len(compacted)
+                compacted.append(frame)
+        if merged:
+            self._queue = deque(compacted)
+            self._depth_gauge.dec(merged)
+            self._compacted.inc(merged)
+
+    def _drop_oldest_text(self) -> bool:
+        for index, frame in enumerate(self._queue):
+            if frame.get("type") in DROPPABLE_TYPES:
+                del self._queue[index]
+                self._depth_gauge.dec()
+                self._count_dropped()
+                return True
+        return False
+
+    def _count_dropped(self) -> None:
+        self.dropped += 1
+        self._dropped.inc()
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                while not self._queue:
+                    self._not_empty.clear()
+                    await self._not_empty.wait()
+                frame = self._queue.popleft()
+                self._depth_gauge.dec()
+                self._space.set()
+                started = time.perf_counter()
+                self._sending = True
+                await self.websocket.send_text(dumps(frame))
+                self._sending = False
+                self._send_seconds.observe(time.perf_counter() - started)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"WebSocket发送失败，停止写协程: {e}")
+            self._mark_closed()
+
+    def _mark_closed(self) -> None:
+        self._closed = True
+        if self._queue:
+            self._depth_gauge.dec(len(self._queue))
+            self._queue.clear()
+        self._space.set()
+
+    async def _close_slow_consumer(self) -> None:
+        if self._closed:
+            return
+        logger.warning(f"WebSocket客户端消费过慢，队列积压{len(self._queue)}帧，关闭连接")
+        self._slow_closed.inc()
+        self._mark_closed()
+        if self._writer is not None:
+            self._writer.cancel()
+        try:
+            await self.websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def close(self, drain_timeout: float = 1.0) -> None:
+        """尽量发完剩余帧后停止写协程"""
+        deadline = time.monotonic() + drain_timeout
+        while (self._queue or self._sending) and not self._closed and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._mark_closed()
+        if self.high_water >= self.max_frames // 2 or self.dropped:
+            logger.info(f"发送队列统计: 最大深度 {self.high_water}/{self.max_frames}，丢弃文本增量 {self.dropped} 帧")
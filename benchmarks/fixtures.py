@@ -0,0 +1,188 @@
+"""
+压测与基准测试共用的测试数据
+
+简历文本、最小PDF/DOCX文件和类语音PCM均在内存中生成，不依赖仓库外的样本文件。
+"""
+import io
+import math
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+SKILLS = [
+    "Python", "Go", "Java", "C++", "FastAPI", "Django", "Spring", "React", "Vue", "TypeScript",
+    "MySQL", "PostgreSQL", "Redis", "Kafka", "Docker", "Kubernetes", "PyTorch", "Pandas", "Spark", "Linux"
+]
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def resume_lines(index: int, projects: int = 3) -> list:
+    """生成一份简历的文本行；index不同，技能组合和项目内容不同"""
+    rng = random.Random(index)
+    skills = rng.sample(SKILLS, 6)
+    lines = [f"候选人{index}", "专业技能", "、".join(skills), "工作经历"]
+    for year in range(2018, 2018 + projects):
+        lines.append(f"{year}-{year + 1} 某科技公司 后端工程师，负责{rng.choice(skills)}服务的设计与性能优化")
+    lines.append("项目经历")
+    for p in range(projects):
+        lines.append(f"项目{p + 1}：基于{rng.choice(skills)}和{rng.choice(skills)}的高并发系统，QPS提升{rng.randint(20, 300)}%")
+    lines.extend(["教育背景", f"某大学 计算机科学与技术 {2014 + index % 5}届"])
+    return lines
+
+
+def resume_text(index: int, projects: int = 3) -> str:
+    return "\n".join(resume_lines(index, projects))
+
+
+def _docx_paragraph(text: str) -> str:
+    return f"<w:p><w:r><w:t>{escape(text)}</w:t></w:r></w:p>"
+
+
+def build_docx(blocks: list) -> bytes:
+    """
+    只包含 word/document.xml 的最小DOCX
+
+    Args:
+        blocks: 字符串为一个段落；字符串列表的列表为一个表格（每个内层列表是一行）
+    """
+    parts = []
+    for block in blocks:
+        if isinstance(block, str):
+            parts.append(_docx_paragraph(block))
+        else:
+            rows = "".join(
+                "<w:tr>" + "".join(f"<w:tc>{_docx_paragraph(cell)}</w:tc>" for cell in row) + "</w:tr>"
+                for row in block
+            )
+            parts.append(f"<w:tbl>{rows}</w:tbl>")
+    body = "".join(parts)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{body}</w:body></w:document>'
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _RELS)
+        archive.writestr("word/document.xml", document)
+    return out.getvalue()
+
+
+def build_resume_docx(index: int, projects: int = 3) -> bytes:
+    return build_docx(resume_lines(index, projects))
+
+
+def _pdf_literal(text: str) -> bytes:
+    return b"(" + text.encode("latin-1").replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _to_unicode_cmap(chars: list) -> bytes:
+    """CID（即Unicode码位）到Unicode的ToUnicode映射，文本提取依赖它还原中文"""
+    lines = [
+        "/CIDInit /ProcSet findresource begin 12 dict begin begincmap",
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+        "/CMapName /Adobe-Identity-UCS def /CMapType 2 def",
+        "1 begincodespacerange <0000> <FFFF> endcodespacerange",
+    ]
+    for i in range(0, len(chars), 100):
+        chunk = chars[i:i + 100]
+        lines.append(f"{len(chunk)} beginbfchar")
+        lines.extend(f"<{ord(c):04X}> <{ord(c):04X}>" for c in chunk)
+        lines.append("endbfchar")
+    lines.append("endcmap CMapName currentdict /CMap defineresource pop end end")
+    return "\n".join(lines).encode("ascii")
+
+
+def build_pdf(pages: list) -> bytes:
+    """
+    生成文本PDF，不依赖额外库
+
+    纯ASCII内容使用Helvetica；包含中文时使用Identity-H编码的Type0字体（CID等于Unicode码位），
+    并附带ToUnicode映射，解析器可以正确还原中文。
+
+    Args:
+        pages: 每页的文本行列表
+    """
+    chars = sorted({c for lines in pages for line in lines for c in line})
+    cjk = any(ord(c) > 126 for c in chars)
+    if cjk and any(ord(c) > 0xFFFF for c in chars):
+        raise ValueError("仅支持基本多文种平面内的字符")
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None]  # 页树在页对象编号确定后填充
+    if cjk:
+        cmap = _to_unicode_cmap(chars)
+        objects.append(b"<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /Identity-H "
+                       b"/DescendantFonts [4 0 R] /ToUnicode 5 0 R >>")
+        objects.append(b"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light "
+                       b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> /DW 1000 >>")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(cmap) + cmap + b"\nendstream")
+    else:
+        objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for lines in pages:
+        if cjk:
+            shown = b" ".join(b"<" + "".join(f"{ord(c):04X}" for c in line).encode("ascii") + b"> '" for line in lines)
+        else:
+            shown = b" ".join(_pdf_literal(line) + b" '" for line in lines)
+        data = b"BT /F1 10 Tf 12 TL 40 800 Td " + shown + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(pages)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def speech_pcm(seconds: float, sample_rate: int = 24000, seed: int = 0) -> bytes:
+    """
+    类语音的PCM16单声道音频：基频随时间变化的谐波叠加音节包络和少量噪声，
+    能通过前端VAD和后端的时长检查
+    """
+    rng = random.Random(seed)
+    samples = bytearray()
+    total = int(seconds * sample_rate)
+    syllable = int(0.25 * sample_rate)
+    for n in range(total):
+        t = n / sample_rate
+        pitch = 140 + 30 * math.sin(2 * math.pi * 0.8 * t)
+        envelope = math.sin(math.pi * (n % syllable) / syllable) ** 2
+        value = sum(math.sin(2 * math.pi * pitch * k * t) / k for k in (1, 2, 3))
+        value = 0.3 * envelope * value + 0.01 * rng.uniform(-1, 1)
+        samples += int(max(-1.0, min(1.0, value)) * 32767).to_bytes(2, "little", signed=True)
+    return bytes(samples)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+简历入库基准测试与回归检查
+
+生成不同页数、篇幅、表格密度和中英文比例的PDF/DOCX样本，按上传链路的各阶段分别计时并统计峰值内存：
+
+- validate: 文件名、扩展名和大小校验（validate_file）
+- spool:    分块读取上传文件、校验大小并计算SHA-256（spool_upload）
+- extract:  PdfExtractor / 流式DOCX解析
+- hash:     简历内容哈希（generate_resume_hash）
+- profile:  结构化简历（build_resume_profile）
+- save:     简历文本写入文件（save_resume_to_file）
+
+--save-baseline 记录当前结果；--baseline 与记录的结果比较，任一阶段耗时或峰值内存超出容差即以非零状态退出。
+基线与机器相关，应在同一台（或同规格的）CI机器上生成和比较。
+
+用法:
+    python benchmarks/ingestion.py --save-baseline benchmarks/baselines/ingestion.json
+    python benchmarks/ingestion.py --baseline benchmarks/baselines/ingestion.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.fixtures import build_docx, build_pdf, resume_lines  # noqa: E402
+from backend.docx_extract import extract_docx_text  # noqa: E402
+from backend.pdf_extract import PdfExtractor  # noqa: E402
+from backend.resume_profile import build_resume_profile  # noqa: E402
+from backend.upload import generate_resume_hash, save_resume_to_file, spool_upload, validate_file  # noqa: E402
+from config import UploadConfig  # noqa: E402
+
+STAGES = ("validate", "spool", "extract", "hash", "profile", "save")
+LINES_PER_PAGE = 45
+
+MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def _english_line(i: int) -> str:
+    return f"Line {i}: Designed Python FastAPI services with PostgreSQL, Redis and Kafka; p99 latency -{i % 40}%"
+
+
+def _mixed_line(i: int) -> str:
+    return f"第{i}行：负责基于Kafka和Redis的订单系统重构，QPS从{i % 90 + 10}k提升到{i % 90 + 30}k（Python/Go）"
+
+
+def _paginate(lines: list) -> list:
+    return [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+
+def _skill_table(index: int, rows: int = 6, cols: int = 4) -> list:
+    return [[f"技能{index}-{r}-{c}" if r else f"类别{c}" for c in range(cols)] for r in range(rows)]
+
+
+def build_corpus() -> dict:
+    """样本名称 → (扩展名, 文件内容)"""
+    resume = resume_lines(1)
+    long_resume = resume_lines(2, projects=120)
+    corpus = {
+        "pdf_resume_1p_cjk": (".pdf", build_pdf([resume])),
+        "pdf_resume_3p_cjk": (".pdf", build_pdf(_paginate(long_resume))),
+        "pdf_20p_en": (".pdf", build_pdf(_paginate([_english_line(i) for i in range(20 * LINES_PER_PAGE)]))),
+        "pdf_100p_mixed": (".pdf", build_pdf(_paginate([
+            _mixed_line(i) if i % 2 else _english_line(i) for i in range(100 * LINES_PER_PAGE)
+        ]))),
+        "docx_resume_cjk": (".docx", build_docx(resume)),
+        "docx_tables_dense": (".docx", build_docx(
+            [block for i in range(40) for block in (f"项目{i}：技能矩阵", _skill_table(i))]
+        )),
+        "docx_large_mixed": (".docx", build_docx(
+            [_skill_table(i // 50) if i % 50 == 49 else _mixed_line(i) for i in range(3000)]
+        )),
+    }
+    return corpus
+
+
+def make_upload(name: str, data: bytes) -> UploadFile:
+    """与Starlette解析multipart后的状态一致：内容已写入SpooledTemporaryFile"""
+    stream = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    stream.write(data)
+    stream.seek(0)
+    extension = Path(name).suffix
+    return UploadFile(file=stream, size=len(data), filename=name,
+                      headers=Headers({"content-type": MIME_TYPES[extension]}))
+
+
+def run_pipeline(name: str, extension: str, data: bytes, extractor: PdfExtractor, out_dir: str,
+                 track_memory: bool = False) -> dict:
+    """
+    依次执行各阶段
+
+    Returns:
+        阶段 → 耗时（秒）；track_memory 为真时为阶段 → 峰值内存（字节）
+    """
+    results = {}
+    state = {"upload": make_upload(name + extension, data)}
+
+    def validate():
+        validate_file(state["upload"], UploadConfig.MAX_SIZE_BYTES)
+
+    def spool():
+        state["spooled"] = asyncio.run(spool_upload(state["upload"], UploadConfig.MAX_SIZE_BYTES,
+                                                    UploadConfig.CHUNK_SIZE_BYTES))
+
+    def extract():
+        stream = state["spooled"].stream
+        if extension == ".pdf":
+            state["text"] = extractor.extract(stream).text
+        else:
+            state["text"] = extract_docx_text(stream).strip()
+
+    def resume_hash():
+        state["hash"] = generate_resume_hash(state["text"])
+
+    def profile():
+        state["profile"] = build_resume_profile(state["text"]).to_context()
+
+    def save():
+        if not save_resume_to_file(state["text"], state["hash"], Path(out_dir)):
+            raise RuntimeError(f"保存简历文件失败: {out_dir}")
+
+    try:
+        for stage, func in zip(STAGES, (validate, spool, extract, resume_hash, profile, save)):
+            if track_memory:
+                tracemalloc.start()
+                func()
+                results[stage] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            else:
+                started = time.perf_counter()
+                func()
+                results[stage] = time.perf_counter() - started
+    finally:
+        state["upload"].file.close()
+    results["text_length"] = len(state.get("text", ""))
+    return results
+
+
+def measure(corpus: dict, repeat: int, extractor: PdfExtractor) -> dict:
+    """各样本各阶段的耗时中位数（毫秒）和峰值内存（KB）"""
+    report = {}
+    with tempfile.TemporaryDirectory() as out_dir:
+        for name, (extension, data) in corpus.items():
+            run_pipeline(name, extension, data, extractor, out_dir)  # 预热
+            runs = [run_pipeline(name, extension, data, extractor, out_dir) for _ in range(repeat)]
+            memory = run_pipeline(name, extension, data, extractor, out_dir, track_memory=True)
+            report[name] = {
+                "size_kb": round(len(data) / 1024, 1),
+                "text_length": runs[0]["text_length"],
+                "stages": {
+                    stage: {
+                        "ms": round(statistics.median(r[stage] for r in runs) * 1000, 3),
+                        "peak_kb": round(memory[stage] / 1024, 1)
+                    }
+                    for stage in STAGES
+                }
+            }
+    return report
+
+
+def machine_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float, memory_tolerance: float,
+            noise_ms: float, noise_kb: float) -> list:
+    """返回超出容差的阶段；差值低于噪声下限的不计入，避免亚毫秒阶段因抖动误报"""
+    regressions = []
+    for name, case in report.items():
+        base_case = baseline.get("cases", {}).get(name)
+        if not base_case:
+            continue
+        for stage, current in case["stages"].items():
+            base = base_case["stages"].get(stage)
+            if not base:
+                continue
+            if current["ms"] > base["ms"] * (1 + tolerance) and current["ms"] - base["ms"] > noise_ms:
+                regressions.append(f"{name}/{stage} 耗时 {base['ms']}ms → {current['ms']}ms "
+                                   f"(+{(current['ms'] / base['ms'] - 1) if base['ms'] else 1:.0%})")
+            if (current["peak_kb"] > base["peak_kb"] * (1 + memory_tolerance)
+                    and current["peak_kb"] - base["peak_kb"] > noise_kb):
+                regressions.append(f"{name}/{stage} 峰值内存 {base['peak_kb']}KB → {current['peak_kb']}KB")
+    return regressions
+
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    base_cases = (baseline or {}).get("cases", {})
+    print(f"\n{'sample':<20} {'size_kb':>8} {'chars':>8} " + " ".join(f"{s + '_ms':>11}" for s in STAGES)
+          + f" {'peak_kb':>9}" + ("  vs baseline(total)" if base_cases else ""))
+    for name, case in report.items():
+        stages = case["stages"]
+        total = sum(s["ms"] for s in stages.values())
+        line = (f"{name:<20} {case['size_kb']:>8} {case['text_length']:>8} "
+                + " ".join(f"{stages[s]['ms']:>11.3f}" for s in STAGES)
+                + f" {max(s['peak_kb'] for s in stages.values()):>9}")
+        base = base_cases.get(name)
+        if base:
+            base_total = sum(s["ms"] for s in base["stages"].values())
+            line += f"  {(total / base_total - 1) if base_total else 0:+.1%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="简历入库基准测试与回归检查")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--samples", nargs="*", help="只运行指定样本")
+    parser.add_argument("--pdf-workers", type=int, default=1, help="PdfExtractor进程数，1为始终串行（结果更稳定）")
+    parser.add_argument("--baseline", default="", help="与该基线文件比较")
+    parser.add_argument("--save-baseline", default="", help="把本次结果写为基线文件")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="耗时容差（相对基线的比例）")
+    parser.add_argument("--memory-tolerance", type=float, default=0.2, help="峰值内存容差")
+    parser.add_argument("--noise-ms", type=float, default=1.0, help="耗时差值低于该值时不视为回归")
+    parser.add_argument("--noise-kb", type=float, default=256.0, help="内存差值低于该值时不视为回归")
+    args = parser.parse_args()
+
+    corpus = build_corpus()
+    if args.samples:
+        corpus = {name: corpus[name] for name in args.samples}
+
+    extractor = PdfExtractor(workers=args.pdf_workers)
+    try:
+        report = measure(corpus, args.repeat, extractor)
+    finally:
+        extractor.shutdown()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != machine_info():
+            print(f"提示: 基线生成环境与当前不同 {baseline.get('machine')}，结果仅供参考")
+
+    print_report(report, baseline)
+
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine_info(), "repeat": args.repeat, "cases": report}, f,
+                      ensure_ascii=False, indent=2)
+        print(f"\n基线已写入 {args.save_baseline}")
+
+    if baseline:
+        regressions = compare(report, baseline, args.tolerance, args.memory_tolerance, args.noise_ms, args.noise_kb)
+        if regressions:
+            print("\n性能回归:")
+            for item in regressions:
+                print(f"  {item}")
+            sys.exit(1)
+        print(f"\n未发现超过 {args.tolerance:.0%} 的回归")
+
+
+if __name__ == "__main__":
+    main()
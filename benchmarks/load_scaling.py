@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+多worker扩展性压测
+
+依次以 1/2/4... 个worker启动生产模式服务（start.py --mode prod），用多进程客户端并发请求
+简历读取和语音prompt接口，输出吞吐、延迟分位数以及相对单worker的加速比。
+
+所有会话预先写入一个共享的SQLite会话库，请求随机落到任意worker上，
+任何404都说明会话状态没有在worker之间共享。
+
+用法:
+    python benchmarks/load_scaling.py --workers 1 2 4 --duration 15 --concurrency 64
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.session_store import SessionStore  # noqa: E402
+
+
+def seed_sessions(db_path: str, count: int) -> list:
+    """向共享会话库写入测试简历，返回session_id列表"""
+    store = SessionStore(db_path)
+    session_ids = []
+    for i in range(count):
+        session_id = f"bench{i:011d}"
+        resume = f"候选人{i}\n技能: Python, FastAPI, Kafka, Redis\n" + "项目经历: 负责高并发服务的设计与优化。\n" * 40
+        store.save_resume(session_id, resume)
+        session_ids.append(session_id)
+    store.close()
+    return session_ids
+
+
+def start_server(workers: int, port: int, db_path: str) -> subprocess.Popen:
+    """以生产模式启动服务；关闭准入控制，所有客户端都来自127.0.0.1，按IP限流会把吞吐压在限流阈值上"""
+    env = dict(os.environ, SESSION_DB_PATH=db_path, ADMISSION_ENABLED="0")
+    return subprocess.Popen(
+        [sys.executable, "start.py", "--mode", "prod", "--workers", str(workers),
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    """终止服务及其所有worker"""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("服务启动超时")
+
+
+async def _client_loop(base_url: str, session_ids: list, duration: float, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    pids = set()
+    deadline = time.monotonic() + duration
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=10.0,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                session_id = random.choice(session_ids)
+                started = time.perf_counter()
+                try:
+                    if random.random() < 0.5:
+                        response = await client.get(f"/api/resume/{session_id}")
+                    else:
+                        response = await client.post("/api/prompts/voice-call",
+                                                     json={"session_id": session_id})
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        # 采样几次以确认请求分布到了多个worker
+        for _ in range(20):
+            try:
+                pids.add((await client.get("/api/metrics")).json()["pid"])
+            except (httpx.HTTPError, KeyError, ValueError):
+                pass
+
+    return {"latencies": latencies, "errors": errors, "pids": list(pids)}
+
+
+def _client_process(args) -> dict:
+    return asyncio.run(_client_loop(*args))
+
+
+def run_load(base_url: str, session_ids: list, duration: float, concurrency: int, client_procs: int) -> dict:
+    """多进程客户端并发压测，避免客户端自身成为瓶颈"""
+    per_proc = max(1, concurrency // client_procs)
+    with multiprocessing.Pool(client_procs) as pool:
+        results = pool.map(_client_process, [(base_url, session_ids, duration, per_proc)] * client_procs)
+
+    latencies = sorted(l for r in results for l in r["latencies"])
+    pids = {p for r in results for p in r["pids"]}
+    return {
+        "requests": len(latencies),
+        "errors": sum(r["errors"] for r in results),
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+        "worker_pids": len(pids)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多worker扩展性压测")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=15.0, help="每轮压测时长（秒）")
+    parser.add_argument("--concurrency", type=int, default=64, help="总并发连接数")
+    parser.add_argument("--client-procs", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--sessions", type=int, default=500, help="预置的会话数量")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sessions.db")
+        session_ids = seed_sessions(db_path, args.sessions)
+
+        rows = []
+        for workers in args.workers:
+            server = start_server(workers, args.port, db_path)
+            try:
+                wait_until_ready(base_url)
+                # 预热
+                run_load(base_url, session_ids, 2.0, args.concurrency, args.client_procs)
+                rows.append((workers, run_load(base_url, session_ids, args.duration,
+                                               args.concurrency, args.client_procs)))
+            finally:
+                stop_server(server)
+
+    baseline = rows[0][1]["rps"] / rows[0][0] if rows and rows[0][1]["rps"] else 0.0
+    print(f"\n{'workers':>8} {'req/s':>10} {'speedup':>8} {'effic.':>7} {'p50ms':>8} {'p99ms':>8} {'errors':>7} {'pids':>5}")
+    for workers, r in rows:
+        speedup = r["rps"] / baseline if baseline else 0.0
+        print(f"{workers:>8} {r['rps']:>10.1f} {speedup:>8.2f} {speedup / workers:>7.0%} "
+              f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>7} {r['worker_pids']:>5}")
+
+
+if __name__ == "__main__":
+    main()
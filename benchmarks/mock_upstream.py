@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+本地模拟上游服务
+
+在一个端口上同时模拟 Azure OpenAI Realtime 与 DeepSeek（OpenAI兼容）接口，用于离线压测
+AzureVoiceService 和 InterviewEvaluationService，不消耗真实配额、不依赖外网：
+
+- WS   /openai/realtime            Realtime事件协议（session.update、conversation.item.create、
+                                   input_audio_buffer.*、response.create/cancel → response.*.delta/done）
+- POST /openai/realtimeapi/sessions 临时会话令牌（RealtimeTokenBroker）
+- OPTIONS/POST /v1/realtimertc     WebRTC区域探测（RegionHealthService）
+- POST /chat/completions           Chat Completions（也接受 /v1、/api 前缀）
+- GET  /mock/stats                 模拟服务自身的请求计数
+
+首包延迟、token速率、音频分片时长和错误注入概率均可通过命令行参数配置；相同的静态前缀
+会按prompt缓存命中计入usage，便于观察 cached_tokens 指标。
+
+后端指向模拟服务:
+    AZURE_OPENAI_API_KEY=mock
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:9100
+    AZURE_OPENAI_WEBSOCKET_BASE_URL=ws://127.0.0.1:9100/openai
+    AZURE_REALTIME_WEBRTC_URLS=http://127.0.0.1:9100/v1/realtimertc
+    DEEPSEEK_API_URL=http://127.0.0.1:9100
+
+用法:
+    python benchmarks/mock_upstream.py --port 9100 --first-token-ms 300 --tokens-per-sec 40 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, asdict
+
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
+
+# 与后端一致的PCM16单声道采样率
+SAMPLE_RATE = 24000
+
+REPLY_TEXT = (
+    "好的，谢谢你的介绍。我注意到你在项目中负责了高并发服务的设计，"
+    "能具体讲讲你是如何定位性能瓶颈、又是如何验证优化效果的吗？"
+)
+
+EVALUATION_TEXT = """## 总体评分：82
+
+## 各维度评分
+- 技术能力：85分
+- 沟通表达：80分
+- 问题解决：82分
+- 项目经验：81分
+
+## 总结
+候选人技术基础扎实，能够结合项目经历说明设计取舍，表达清晰。
+
+## 优势
+- 熟悉高并发场景下的常见优化手段
+- 回答有条理
+
+## 改进建议
+- 可以多给出量化的效果数据
+"""
+
+
+@dataclass
+class MockSettings:
+    """模拟服务行为参数"""
+
+    first_token_ms: float = 300.0
+    tokens_per_sec: float = 40.0
+    audio_chunk_ms: int = 100
+    # 每次请求返回上游错误的概率
+    error_rate: float = 0.0
+    # Realtime响应中途断开连接的概率
+    disconnect_rate: float = 0.0
+    # 同一静态前缀再次出现时按缓存命中计算的最小前缀token数（与OpenAI一致，按128递增）
+    cache_min_tokens: int = 1024
+    seed: int = 0
+
+
+class MockUpstream:
+    """模拟上游的共享状态：参数、随机数、prompt前缀缓存与请求计数"""
+
+    def __init__(self, settings: MockSettings):
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+        self.stats: Counter = Counter()
+        self._prefixes: set = set()
+
+    def should_fail(self) -> bool:
+        return self.random.random() < self.settings.error_rate
+
+    def should_disconnect(self) -> bool:
+        return self.random.random() < self.settings.disconnect_rate
+
+    @staticmethod
+    def count_tokens(text: str) -> int:
+        """粗略估算token数：中文约每字1个，英文约每4个字符1个"""
+        ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+        return (len(text) - ascii_chars) + ascii_chars // 4
+
+    def cached_tokens(self, prefix: str) -> int:
+        """静态前缀此前出现过时返回命中缓存的token数"""
+        tokens = self.count_tokens(prefix)
+        if tokens < self.settings.cache_min_tokens:
+            return 0
+        key = hashlib.sha256(prefix.encode("utf-8")).digest()
+        if key in self._prefixes:
+            return tokens // 128 * 128
+        self._prefixes.add(key)
+        return 0
+
+    def usage(self, prefix: str, dynamic: str, completion_tokens: int) -> dict:
+        prompt_tokens = self.count_tokens(prefix) + self.count_tokens(dynamic)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": self.cached_tokens(prefix),
+            "completion_tokens": completion_tokens
+        }
+
+    async def first_token_delay(self) -> None:
+        await asyncio.sleep(self.settings.first_token_ms / 1000)
+
+    def token_interval(self) -> float:
+        return 1.0 / self.settings.tokens_per_sec if self.settings.tokens_per_sec > 0 else 0.0
+
+
+def _split_tokens(text: str, size: int = 2) -> list:
+    """按固定字符数切分为增量片段"""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class RealtimeSession:
+    """一条Realtime WebSocket连接的会话状态"""
+
+    def __init__(self, websocket: WebSocket, upstream: MockUpstream):
+        self.websocket = websocket
+        self.upstream = upstream
+        self.session = {
+            "id": f"sess_{uuid.uuid4().hex[:16]}",
+            "object": "realtime.session",
+            "modalities": ["text", "audio"],
+            "instructions": "",
+            "voice": "verse",
+            "input_audio_format": "pcm16",
+            "output_audio_format": "pcm16"
+        }
+        self.items: list = []
+        self.audio_bytes = 0
+        self.response_task: asyncio.Task = None
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, event: dict) -> None:
+        event.setdefault("event_id", f"event_{uuid.uuid4().hex[:16]}")
+        async with self._send_lock:
+            await self.websocket.send_text(json.dumps(event, ensure_ascii=False))
+        self.upstream.stats[f"realtime_sent:{event['type']}"] += 1
+
+    async def send_error(self, message: str, code: str = "server_error") -> None:
+        await self.send({"type": "error", "error": {"type": "server_error", "code": code, "message": message}})
+
+    async def run(self) -> None:
+        await self.send({"type": "session.created", "session": self.session})
+        try:
+            while True:
+                event = json.loads(await self.websocket.receive_text())
+                self.upstream.stats[f"realtime_received:{event.get('type')}"] += 1
+                await self.handle(event)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            if self.response_task:
+                self.response_task.cancel()
+
+    async def handle(self, event: dict) -> None:
+        event_type = event.get("type")
+
+        if event_type == "session.update":
+            self.session.update(event.get("session") or {})
+            await self.send({"type": "session.updated", "session": self.session})
+
+        elif event_type == "conversation.item.create":
+            item = dict(event.get("item") or {})
+            item.setdefault("id", f"item_{uuid.uuid4().hex[:16]}")
+            self.items.append(item)
+            await self.send({"type": "conversation.item.created", "previous_item_id": None, "item": item})
+
+        elif event_type == "input_audio_buffer.append":
+            self.audio_bytes += len(base64.b64decode(event.get("audio") or ""))
+
+        elif event_type == "input_audio_buffer.commit":
+            item_id = f"item_{uuid.uuid4().hex[:16]}"
+            duration_ms = self.audio_bytes / 2 / SAMPLE_RATE * 1000
+            self.items.append({"id": item_id, "type": "message", "role": "user", "content": [
+                {"type": "input_audio", "transcript": f"（{duration_ms:.0f}ms语音）"}
+            ]})
+            self.audio_bytes = 0
+            await self.send({"type": "input_audio_buffer.committed", "previous_item_id": None, "item_id": item_id})
+            await self.send({
+                "type": "conversation.item.input_audio_transcription.completed",
+                "item_id": item_id,
+                "content_index": 0,
+                "transcript": f"（{duration_ms:.0f}ms语音）"
+            })
+
+        elif event_type == "input_audio_buffer.clear":
+            self.audio_bytes = 0
+            await self.send({"type": "input_audio_buffer.cleared"})
+
+        elif event_type == "response.create":
+            if self.response_task and not self.response_task.done():
+                await self.send_error("Conversation already has an active response", "conversation_already_has_active_response")
+                return
+            self.response_task = asyncio.create_task(self.respond())
+
+        elif event_type == "response.cancel":
+            if self.response_task and not self.response_task.done():
+                self.response_task.cancel()
+
+        else:
+            await self.send_error(f"Unsupported event type: {event_type}", "invalid_event")
+
+    def _dynamic_text(self) -> str:
+        parts = []
+        for item in self.items:
+            for content in item.get("content") or []:
+                parts.append(content.get("text") or content.get("transcript") or "")
+        return "".join(parts)
+
+    async def respond(self) -> None:
+        """按配置的延迟和速率流式输出一轮回复"""
+        upstream = self.upstream
+        response_id = f"resp_{uuid.uuid4().hex[:16]}"
+        item_id = f"item_{uuid.uuid4().hex[:16]}"
+        audio = "audio" in (self.session.get("modalities") or [])
+        delta_type = "response.audio_transcript" if audio else "response.text"
+        response = {"id": response_id, "object": "realtime.response", "status": "in_progress", "output": []}
+        await self.send({"type": "response.created", "response": response})
+
+        if upstream.should_fail():
+            upstream.stats["realtime_injected_errors"] += 1
+            await self.send_error("Injected upstream error")
+            await self.send({"type": "response.done", "response": dict(response, status="failed")})
+            return
+
+        tokens = _split_tokens(REPLY_TEXT)
+        # 音频按回复时长均匀切片：每个文本片段对应一段静音PCM
+        chunk = base64.b64encode(bytes(int(SAMPLE_RATE * upstream.settings.audio_chunk_ms / 1000) * 2)).decode("ascii")
+        location = {"response_id": response_id, "item_id": item_id, "output_index": 0, "content_index": 0}
+        status = "completed"
+        try:
+            await upstream.first_token_delay()
+            for index, token in enumerate(tokens):
+                if index == len(tokens) // 2 and upstream.should_disconnect():
+                    upstream.stats["realtime_injected_disconnects"] += 1
+                    await self.websocket.close(code=1011)
+                    return
+                await self.send(dict(location, type=f"{delta_type}.delta", delta=token))
+                if audio:
+                    await self.send(dict(location, type="response.audio.delta", delta=chunk))
+                await asyncio.sleep(upstream.token_interval())
+        except asyncio.CancelledError:
+            status = "cancelled"
+
+        if status == "completed":
+            if audio:
+                await self.send(dict(location, type="response.audio.done"))
+                await self.send(dict(location, type="response.audio_transcript.done", transcript=REPLY_TEXT))
+            else:
+                await self.send(dict(location, type="response.text.done", text=REPLY_TEXT))
+
+        usage = upstream.usage(self.session.get("instructions") or "", self._dynamic_text(), upstream.count_tokens(REPLY_TEXT))
+        await self.send({"type": "response.done", "response": dict(response, status=status, usage={
+            "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"],
+            "input_tokens": usage["prompt_tokens"],
+            "output_tokens": usage["completion_tokens"],
+            "input_token_details": {"cached_tokens": usage["cached_tokens"]}
+        })})
+        upstream.stats["realtime_responses"] += 1
+
+
+def create_app(settings: MockSettings) -> FastAPI:
+    """创建模拟上游应用"""
+    app = FastAPI(title="Mock Upstream")
+    upstream = MockUpstream(settings)
+    app.state.upstream = upstream
+
+    @app.websocket("/openai/realtime")
+    @app.websocket("/v1/realtime")
+    async def realtime(websocket: WebSocket):
+        await websocket.accept()
+        upstream.stats["realtime_connections"] += 1
+        await RealtimeSession(websocket, upstream).run()
+
+    @app.post("/openai/realtimeapi/sessions")
+    async def create_realtime_session(request: Request):
+        upstream.stats["sessions_created"] += 1
+        if upstream.should_fail():
+            return JSONResponse(status_code=503, content={"error": {"message": "Injected upstream error"}})
+        payload = await request.json()
+        return JSONResponse(content={
+            "id": f"sess_{uuid.uuid4().hex[:16]}",
+            "object": "realtime.session",
+            "model": payload.get("model"),
+            "voice": payload.get("voice"),
+            "client_secret": {"value": f"ek_{uuid.uuid4().hex}", "expires_at": int(time.time()) + 60}
+        })
+
+    @app.api_route("/v1/realtimertc", methods=["OPTIONS", "POST"])
+    async def realtime_rtc():
+        upstream.stats["webrtc_probes"] += 1
+        return Response(status_code=200)
+
+    @app.post("/chat/completions")
+    @app.post("/v1/chat/completions")
+    @app.post("/api/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        upstream.stats["chat_completions"] += 1
+        if upstream.should_fail():
+            upstream.stats["chat_injected_errors"] += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "Injected upstream error", "type": "server_error"}})
+
+        messages = payload.get("messages") or []
+        system = "".join(m.get("content") or "" for m in messages if m.get("role") == "system")
+        dynamic = "".join(m.get("content") or "" for m in messages if m.get("role") != "system")
+        completion_tokens = upstream.count_tokens(EVALUATION_TEXT)
+
+        # 非流式接口：首包延迟 + 按token速率生成全部内容的耗时
+        await upstream.first_token_delay()
+        await asyncio.sleep(completion_tokens * upstream.token_interval())
+
+        usage = upstream.usage(system, dynamic, completion_tokens)
+        return JSONResponse(content={
+            "id": f"chatcmpl-{uuid.uuid4().hex[:16]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": EVALUATION_TEXT},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": usage["prompt_tokens"],
+                "completion_tokens": completion_tokens,
+                "total_tokens": usage["prompt_tokens"] + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": usage["cached_tokens"]},
+                "prompt_cache_hit_tokens": usage["cached_tokens"],
+                "prompt_cache_miss_tokens": usage["prompt_tokens"] - usage["cached_tokens"]
+            }
+        })
+
+    @app.get("/mock/stats")
+    async def mock_stats():
+        return JSONResponse(content={"settings": asdict(settings), "stats": dict(upstream.stats)})
+
+    @app.get("/health")
+    async def health():
+        return JSONResponse(content={"status": "healthy"})
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地模拟 Azure Realtime / DeepSeek 上游")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--first-token-ms", type=float, default=300.0, help="首个增量前的延迟（毫秒）")
+    parser.add_argument("--tokens-per-sec", type=float, default=40.0, help="生成速率，0表示不限速")
+    parser.add_argument("--audio-chunk-ms", type=int, default=100, help="每个音频增量的时长（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回上游错误的概率")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="Realtime响应中途断开的概率")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    settings = MockSettings(
+        first_token_ms=args.first_token_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        audio_chunk_ms=args.audio_chunk_ms,
+        error_rate=args.error_rate,
+        disconnect_rate=args.disconnect_rate,
+        seed=args.seed
+    )
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
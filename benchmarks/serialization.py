@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+JSON序列化基准测试
+
+对比Starlette默认的标准库json（send_json / receive_json / JSONResponse 的实际调用方式）与
+backend.serialization（orjson）在典型载荷上的单次耗时：
+
+- 下行 audio_delta（100ms PCM16 base64）、transcript_delta 帧的序列化
+- 上行 voice_input 帧（1.5s 语音）的反序列化
+- 面试评估结果、简历上传结果响应体的渲染
+
+用法:
+    python benchmarks/serialization.py --number 20000
+"""
+import argparse
+import base64
+import json
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.fixtures import resume_text, speech_pcm  # noqa: E402
+from backend import serialization  # noqa: E402
+
+SAMPLE_RATE = 24000
+
+
+def stdlib_dumps(obj) -> str:
+    """Starlette WebSocket.send_json 的序列化方式"""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def stdlib_render(obj) -> bytes:
+    """Starlette JSONResponse.render"""
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def build_payloads() -> dict:
+    audio_chunk = base64.b64encode(speech_pcm(0.1, SAMPLE_RATE)).decode("ascii")
+    voice_input = json.dumps({
+        "type": "voice_input",
+        "audio_data": base64.b64encode(speech_pcm(1.5, SAMPLE_RATE)).decode("ascii"),
+        "audio_format": "pcm_s16le",
+        "sample_rate": SAMPLE_RATE,
+        "channels": 1,
+        "vad_confidence": 0.73,
+        "session_id": "0123456789abcdef"
+    })
+    evaluation = {
+        "success": True,
+        "evaluation": {
+            "success": True,
+            "full_evaluation": "## 总体评分：82\n" + "候选人能够结合项目经历说明设计取舍，表达清晰。\n" * 60,
+            "total_score": 82,
+            "dimension_scores": {"技术能力": 85, "沟通表达": 80, "问题解决": 82, "项目经验": 81},
+            "summary": "技术基础扎实，回答有条理。",
+            "strengths": ["熟悉高并发场景下的常见优化手段", "回答有条理"],
+            "improvements": ["可以多给出量化的效果数据"],
+            "conversation_stats": {"total_exchanges": 24, "user_word_count": 1800, "ai_word_count": 900},
+            "usage": {"prompt_tokens": 3200, "cached_tokens": 2048, "completion_tokens": 600, "cache_hit_ratio": 0.64}
+        },
+        "message": "面试评估完成"
+    }
+    text = resume_text(7, projects=20)
+    upload = {
+        "success": True,
+        "message": "简历上传并解析成功",
+        "session_id": "0123456789abcdef",
+        "filename": "resume.pdf",
+        "file_size": 183422,
+        "file_sha256": "ab" * 32,
+        "content_length": len(text),
+        "profile_length": 1800,
+        "position": "backend",
+        "position_scores": {"frontend": 0.12, "backend": 0.41, "fullstack": 0.33, "ai_ml": 0.05, "data_science": 0.08},
+        "duplicate_of": None,
+        "similarity": 0.0,
+        "preview": text[:200] + "..."
+    }
+    return {
+        "audio_delta": ("dumps", {"type": "audio_delta", "audio_data": audio_chunk, "content_type": "audio/pcm"}),
+        "transcript_delta": ("dumps", {"type": "transcript_delta", "content": "我们"}),
+        "voice_input": ("loads", voice_input),
+        "evaluation_response": ("render", evaluation),
+        "upload_response": ("render", upload),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON序列化基准测试")
+    parser.add_argument("--number", type=int, default=5000, help="每项的执行次数")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if serialization.BACKEND != "orjson":
+        print("提示: 未安装orjson，backend.serialization 回退到标准库json，两列结果应基本一致")
+
+    baseline_funcs = {"dumps": stdlib_dumps, "loads": json.loads, "render": stdlib_render}
+    fast_funcs = {"dumps": serialization.dumps, "loads": serialization.loads, "render": serialization.dumps_bytes}
+
+    print(f"\n{'payload':<20} {'bytes':>8} {'json_us':>9} {serialization.BACKEND + '_us':>10} {'saved':>7}")
+    for name, (kind, payload) in build_payloads().items():
+        # 确认两种实现的结果等价
+        if kind == "loads":
+            assert baseline_funcs[kind](payload) == fast_funcs[kind](payload)
+            size = len(payload)
+        else:
+            assert json.loads(baseline_funcs[kind](payload)) == json.loads(fast_funcs[kind](payload))
+            size = len(baseline_funcs[kind](payload))
+
+        timings = []
+        for func in (baseline_funcs[kind], fast_funcs[kind]):
+            best = min(timeit.repeat(lambda: func(payload), number=args.number, repeat=args.repeat))
+            timings.append(best / args.number * 1e6)
+        saved = 1 - timings[1] / timings[0] if timings[0] else 0.0
+        print(f"{name:<20} {size:>8} {timings[0]:>9.2f} {timings[1]:>10.2f} {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
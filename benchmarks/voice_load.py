@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+语音会话压测
+
+模拟N个并发 /ws/voice 客户端：交替发送类语音PCM的 voice_input 和文本 chat，按一定比例在回复
+开始后发送 interrupt_request；同时按固定速率并发上传简历和请求面试评估。
+默认在本地启动模拟上游（mock_upstream.py）和生产模式服务，不消耗真实配额。
+
+输出首包音频延迟（time-to-first-audio）p50/p95/p99、轮次吞吐、打断确认延迟、上传和评估延迟、
+socket失败数以及服务进程树的RSS。指定阈值时超出即以非零状态退出，可直接用于CI回归检查。
+
+用法:
+    python benchmarks/voice_load.py --clients 50 --duration 30
+    python benchmarks/voice_load.py --clients 20 --duration 15 --max-p95-ms 1500 --output voice_load.json
+    # 压测已运行的服务（需自行将其上游指向模拟服务）
+    python benchmarks/voice_load.py --base-url http://127.0.0.1:8000 --no-mock
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+import websockets
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.fixtures import build_resume_docx, resume_text, speech_pcm  # noqa: E402
+
+SAMPLE_RATE = 24000
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+CHAT_MESSAGES = [
+    "你好，我准备好了，可以开始面试。",
+    "我上一份工作主要负责订单系统的重构。",
+    "这个问题我会先看监控定位瓶颈，再做压测验证。",
+    "我们用Kafka做削峰，消费者按分区水平扩展。",
+]
+
+
+class LoadStats:
+    """压测过程中的原始观测值"""
+
+    def __init__(self):
+        self.ttfa: list = []
+        self.turn_latency: list = []
+        self.interrupt_latency: list = []
+        self.upload_latency: list = []
+        self.evaluation_latency: list = []
+        self.turns = 0
+        self.counters: Counter = Counter()
+        self.rss_samples: list = []
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def summarize(values: list) -> dict:
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1) if values else 0.0
+    }
+
+
+# ---------------------------------------------------------------------------
+# 进程管理
+# ---------------------------------------------------------------------------
+
+def start_process(args: list, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable] + args,
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"服务启动超时: {url}")
+
+
+def process_group_rss(pgid: int) -> int:
+    """进程组内所有进程的RSS之和（字节），仅Linux"""
+    total = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                fields = f.read().rsplit(b")", 1)[1].split()
+            # stat第5列为pgrp，第24列为rss（页）；去掉 "pid (comm)" 后下标各减2
+            if int(fields[2]) == pgid:
+                total += int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+def server_env(args, mock_url: str, tmp: str) -> dict:
+    """服务端环境变量：上游指向模拟服务，准入阈值放宽到压测规模，数据写入临时目录"""
+    ws_url = mock_url.replace("http://", "ws://", 1)
+    return dict(
+        os.environ,
+        AZURE_OPENAI_API_KEY="mock",
+        AZURE_OPENAI_ENDPOINT=mock_url,
+        AZURE_OPENAI_WEBSOCKET_BASE_URL=f"{ws_url}/openai",
+        AZURE_REALTIME_WEBRTC_URLS=f"{mock_url}/v1/realtimertc",
+        DEEPSEEK_API_URL=mock_url,
+        DEEPSEEK_API_KEY="mock",
+        SESSION_DB_PATH=os.path.join(tmp, "sessions.db"),
+        SEARCH_INDEX_DIR=os.path.join(tmp, "search_index"),
+        MAX_VOICE_SESSIONS=str(args.clients * 2),
+        MAX_VOICE_SESSIONS_PER_IP=str(args.clients * 2),
+        VOICE_MESSAGES_PER_SEC="100",
+        VOICE_MESSAGE_BURST="200",
+        VOICE_AUDIO_SECONDS_PER_SEC="100",
+        VOICE_AUDIO_BURST_SECONDS="600",
+        HTTP_REQUESTS_PER_SEC="10000",
+        HTTP_BURST="10000"
+    )
+
+
+# ---------------------------------------------------------------------------
+# 客户端
+# ---------------------------------------------------------------------------
+
+async def upload_resume(client: httpx.AsyncClient, index: int, stats: LoadStats):
+    """上传一份生成的DOCX简历，返回session_id"""
+    started = time.perf_counter()
+    try:
+        response = await client.post(
+            "/api/upload-resume",
+            files={"file": (f"resume_{index}.docx", build_resume_docx(index), DOCX_MIME)}
+        )
+    except httpx.HTTPError:
+        stats.counters["upload_errors"] += 1
+        return None
+    if response.status_code != 200:
+        stats.counters[f"upload_status_{response.status_code}"] += 1
+        return None
+    stats.upload_latency.append(time.perf_counter() - started)
+    return response.json().get("session_id")
+
+
+async def evaluate(client: httpx.AsyncClient, session_id: str, index: int, stats: LoadStats) -> None:
+    messages = []
+    for i, text in enumerate(CHAT_MESSAGES):
+        messages.append({"type": "assistant", "content": f"第{i + 1}个问题：请介绍一下相关经历。"})
+        messages.append({"type": "user", "content": text})
+    started = time.perf_counter()
+    try:
+        response = await client.post("/api/interview/evaluate", json={
+            "interview_id": f"load-{index}",
+            "messages": messages,
+            "resume_context": resume_text(index),
+            "duration": 600,
+            "session_id": session_id or ""
+        }, timeout=60.0)
+    except httpx.HTTPError:
+        stats.counters["evaluation_errors"] += 1
+        return
+    if response.status_code != 200:
+        stats.counters[f"evaluation_status_{response.status_code}"] += 1
+        return
+    stats.evaluation_latency.append(time.perf_counter() - started)
+
+
+async def run_turn(ws, payload: dict, interrupt: bool, turn_timeout: float, stats: LoadStats) -> None:
+    """发送一轮输入并读取回复，直到response_done（打断时还需等到打断确认）"""
+    started = time.perf_counter()
+    await ws.send(json.dumps(payload))
+    first_audio = None
+    interrupt_sent = None
+    done = False
+    deadline = started + turn_timeout
+
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise asyncio.TimeoutError
+        frame = json.loads(await asyncio.wait_for(ws.recv(), remaining))
+        frame_type = frame.get("type")
+        stats.counters[f"frames:{frame_type}"] += 1
+
+        if frame_type == "audio_delta" and first_audio is None:
+            first_audio = time.perf_counter()
+            stats.ttfa.append(first_audio - started)
+            if interrupt:
+                interrupt_sent = time.perf_counter()
+                await ws.send(json.dumps({
+                    "type": "interrupt_request",
+                    "session_id": payload.get("session_id", ""),
+                    "reason": "user_speech",
+                    "timestamp": int(time.time() * 1000)
+                }))
+        elif frame_type == "interrupt_acknowledged" and interrupt_sent is not None:
+            stats.interrupt_latency.append(time.perf_counter() - interrupt_sent)
+            interrupt_sent = None
+        elif frame_type == "response_done":
+            done = True
+            stats.turns += 1
+            stats.turn_latency.append(time.perf_counter() - started)
+            if first_audio is None:
+                stats.counters["turns_without_audio"] += 1
+        elif frame_type == "error":
+            # 上游错误或准入拒绝，本轮不会再有response_done
+            stats.counters["error_frames"] += 1
+            return
+
+        if done and interrupt_sent is None:
+            return
+
+
+async def voice_client(index: int, base_url: str, session_ids: list, args, deadline: float,
+                       audio_b64: str, stats: LoadStats) -> None:
+    """单个语音会话：断开后自动重连，直到压测结束"""
+    rng = random.Random(index)
+    ws_base = base_url.replace("http", "ws", 1)
+    # 错开连接建立时间，避免所有客户端同时握手
+    await asyncio.sleep(rng.uniform(0, args.ramp_up))
+
+    while time.monotonic() < deadline:
+        session_id = rng.choice(session_ids) if session_ids else ""
+        try:
+            # 携带interview_id和client_id，对话同时写入服务端对话记录
+            async with websockets.connect(f"{ws_base}/ws/voice?session_id={session_id}&interview_id=load-{index}"
+                                          f"&client_id=voice-load-{index:04d}",
+                                          max_size=None, open_timeout=10) as ws:
+                stats.counters["connections"] += 1
+                while time.monotonic() < deadline:
+                    if rng.random() < args.chat_ratio:
+                        payload = {"type": "chat", "message": rng.choice(CHAT_MESSAGES), "session_id": session_id}
+                    else:
+                        payload = {
+                            "type": "voice_input",
+                            "audio_data": audio_b64,
+                            "audio_format": "pcm_s16le",
+                            "sample_rate": SAMPLE_RATE,
+                            "channels": 1,
+                            "vad_confidence": round(rng.uniform(0.3, 0.9), 3),
+                            "session_id": session_id
+                        }
+                    await run_turn(ws, payload, rng.random() < args.interrupt_rate, args.turn_timeout, stats)
+                    await asyncio.sleep(rng.uniform(0, 2 * args.think_time))
+        except asyncio.TimeoutError:
+            # 本轮超时后连接上可能还有未读完的帧，重新连接再继续
+            stats.counters["turn_timeouts"] += 1
+        except (OSError, websockets.exceptions.WebSocketException) as e:
+            stats.counters["socket_failures"] += 1
+            stats.counters[f"socket_failure:{type(e).__name__}"] += 1
+            await asyncio.sleep(0.5)
+
+
+async def periodic(rate: float, deadline: float, action) -> None:
+    """按固定速率并发执行action（不等待上一次完成）"""
+    if rate <= 0:
+        return
+    tasks = []
+    index = 0
+    while time.monotonic() < deadline:
+        tasks.append(asyncio.create_task(action(index)))
+        index += 1
+        await asyncio.sleep(1.0 / rate)
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def sample_rss(pgid: int, deadline: float, stats: LoadStats) -> None:
+    while time.monotonic() < deadline:
+        stats.rss_samples.append(process_group_rss(pgid))
+        await asyncio.sleep(1.0)
+
+
+def rng_choice(items: list, index: int):
+    return items[index % len(items)] if items else ""
+
+
+async def run_load(base_url: str, args, server_pgid: int = None) -> LoadStats:
+    stats = LoadStats()
+    audio_b64 = base64.b64encode(speech_pcm(args.utterance_seconds, SAMPLE_RATE)).decode("ascii")
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+        # 预置一批简历，语音会话随机选用
+        session_ids = [s for s in await asyncio.gather(
+            *(upload_resume(client, i, stats) for i in range(args.resumes))
+        ) if s]
+        stats.upload_latency.clear()
+        if server_pgid:
+            stats.rss_samples.append(process_group_rss(server_pgid))
+
+        deadline = time.monotonic() + args.duration
+        started = time.monotonic()
+        jobs = [voice_client(i, base_url, session_ids, args, deadline, audio_b64, stats) for i in range(args.clients)]
+        jobs.append(periodic(args.uploads_per_sec, deadline,
+                             lambda i: upload_resume(client, args.resumes + i, stats)))
+        jobs.append(periodic(args.evaluations_per_sec, deadline,
+                             lambda i: evaluate(client, rng_choice(session_ids, i), i, stats)))
+        if server_pgid:
+            jobs.append(sample_rss(server_pgid, deadline, stats))
+        await asyncio.gather(*jobs)
+        stats.counters["elapsed_ms"] = int((time.monotonic() - started) * 1000)
+
+    return stats
+
+
+def build_report(stats: LoadStats, args) -> dict:
+    elapsed = stats.counters.pop("elapsed_ms", 0) / 1000 or args.duration
+    rss = [r for r in stats.rss_samples if r]
+    return {
+        "clients": args.clients,
+        "duration_s": round(elapsed, 1),
+        "turns": stats.turns,
+        "turns_per_sec": round(stats.turns / elapsed, 2),
+        "time_to_first_audio": summarize(stats.ttfa),
+        "turn_latency": summarize(stats.turn_latency),
+        "interrupt_ack": summarize(stats.interrupt_latency),
+        "upload": summarize(stats.upload_latency),
+        "evaluation": summarize(stats.evaluation_latency),
+        "connections": stats.counters["connections"],
+        "socket_failures": stats.counters["socket_failures"],
+        "rss_mb": {
+            "start": round(rss[0] / 2 ** 20, 1) if rss else None,
+            "peak": round(max(rss) / 2 ** 20, 1) if rss else None,
+            "end": round(rss[-1] / 2 ** 20, 1) if rss else None
+        },
+        "counters": dict(sorted(stats.counters.items()))
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n并发客户端 {report['clients']}，时长 {report['duration_s']}s，"
+          f"完成轮次 {report['turns']}（{report['turns_per_sec']}/s），"
+          f"连接 {report['connections']}，socket失败 {report['socket_failures']}")
+    print(f"{'':>20} {'count':>7} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'maxms':>9}")
+    for name in ("time_to_first_audio", "turn_latency", "interrupt_ack", "upload", "evaluation"):
+        row = report[name]
+        print(f"{name:>20} {row['count']:>7} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+              f"{row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+    rss = report["rss_mb"]
+    if rss["peak"] is not None:
+        print(f"服务RSS(MB): 开始 {rss['start']}，峰值 {rss['peak']}，结束 {rss['end']}")
+    failures = {k: v for k, v in report["counters"].items() if not k.startswith("frames:") and v}
+    print(f"计数: {failures}")
+
+
+def check_thresholds(report: dict, args) -> list:
+    """返回未通过的阈值检查"""
+    failed = []
+    ttfa = report["time_to_first_audio"]
+    if args.max_p95_ms and ttfa["p95_ms"] > args.max_p95_ms:
+        failed.append(f"首包音频p95 {ttfa['p95_ms']}ms > {args.max_p95_ms}ms")
+    if args.max_p99_ms and ttfa["p99_ms"] > args.max_p99_ms:
+        failed.append(f"首包音频p99 {ttfa['p99_ms']}ms > {args.max_p99_ms}ms")
+    attempts = report["connections"] + report["socket_failures"]
+    if attempts and report["socket_failures"] / attempts > args.max_socket_failure_rate:
+        failed.append(f"socket失败率 {report['socket_failures'] / attempts:.1%} > {args.max_socket_failure_rate:.1%}")
+    if args.max_rss_mb and report["rss_mb"]["peak"] and report["rss_mb"]["peak"] > args.max_rss_mb:
+        failed.append(f"RSS峰值 {report['rss_mb']['peak']}MB > {args.max_rss_mb}MB")
+    if not ttfa["count"]:
+        failed.append("没有任何一轮收到音频")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="语音会话压测")
+    parser.add_argument("--clients", type=int, default=20, help="并发语音会话数")
+    parser.add_argument("--duration", type=float, default=30.0, help="压测时长（秒）")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="客户端陆续建立连接的时间窗口（秒）")
+    parser.add_argument("--chat-ratio", type=float, default=0.3, help="文本chat轮次占比，其余为voice_input")
+    parser.add_argument("--interrupt-rate", type=float, default=0.1, help="回复开始后发送打断请求的轮次占比")
+    parser.add_argument("--think-time", type=float, default=0.5, help="两轮之间的平均停顿（秒）")
+    parser.add_argument("--utterance-seconds", type=float, default=1.5, help="每段语音输入的时长")
+    parser.add_argument("--turn-timeout", type=float, default=30.0)
+    parser.add_argument("--resumes", type=int, default=20, help="预先上传的简历数")
+    parser.add_argument("--uploads-per-sec", type=float, default=1.0)
+    parser.add_argument("--evaluations-per-sec", type=float, default=0.5)
+    parser.add_argument("--base-url", default="", help="压测已运行的服务，不指定时在本地启动")
+    parser.add_argument("--workers", type=int, default=1, help="本地启动服务的worker数")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--no-mock", action="store_true", help="不启动模拟上游")
+    parser.add_argument("--mock-port", type=int, default=9101)
+    parser.add_argument("--first-token-ms", type=float, default=300.0, help="模拟上游首包延迟")
+    parser.add_argument("--tokens-per-sec", type=float, default=40.0, help="模拟上游生成速率")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="模拟上游错误注入概率")
+    parser.add_argument("--output", default="", help="把结果写入JSON文件")
+    parser.add_argument("--max-p95-ms", type=float, default=0.0, help="首包音频p95阈值，0为不检查")
+    parser.add_argument("--max-p99-ms", type=float, default=0.0, help="首包音频p99阈值，0为不检查")
+    parser.add_argument("--max-socket-failure-rate", type=float, default=0.01)
+    parser.add_argument("--max-rss-mb", type=float, default=0.0, help="服务RSS峰值阈值，0为不检查")
+    args = parser.parse_args()
+
+    processes = []
+    server_pgid = None
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            mock_url = f"http://127.0.0.1:{args.mock_port}"
+            if not args.no_mock:
+                processes.append(start_process([
+                    "benchmarks/mock_upstream.py", "--port", str(args.mock_port),
+                    "--first-token-ms", str(args.first_token_ms), "--tokens-per-sec", str(args.tokens_per_sec),
+                    "--error-rate", str(args.error_rate)
+                ], dict(os.environ)))
+                wait_until_ready(f"{mock_url}/health")
+
+            base_url = args.base_url.rstrip("/")
+            if not base_url:
+                base_url = f"http://127.0.0.1:{args.port}"
+                server = start_process([
+                    "start.py", "--mode", "prod", "--workers", str(args.workers),
+                    "--host", "127.0.0.1", "--port", str(args.port), "--log-level", "warning"
+                ], server_env(args, mock_url, tmp))
+                processes.append(server)
+                server_pgid = server.pid if sys.platform.startswith("linux") else None
+            wait_until_ready(f"{base_url}/health")
+
+            stats = asyncio.run(run_load(base_url, args, server_pgid))
+        finally:
+            for process in reversed(processes):
+                stop_process(process)
+
+    report = build_report(stats, args)
+    print_report(report)
+    failed = check_thresholds(report, args)
+    report["failed_checks"] = failed
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if failed:
+        print("\n未通过: " + "; ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
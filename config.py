@@ -21,6 +21,34 @@ def load_env() -> None:
         print("pip install python-dotenv")
 
 
+# 在模块导入时加载环境变量（需早于下方读取环境变量的配置类）
+load_env()
+
+
+def _env_int(name: str, default: int) -> int:
+    """读取整数类型的环境变量"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """读取浮点类型的环境变量"""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """读取布尔类型的环境变量"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 def get_api_key() -> Optional[str]:
     """
     获取API密钥
@@ -77,13 +105,23 @@ def get_gemini_model() -> str:
 class AzureRealtimeConfig:
     """Azure OpenAI Realtime API WebRTC配置"""
     
-    # Azure OpenAI 配置
-    SESSIONS_URL = "https://gpt-realtime-4o-mini.openai.azure.com/openai/realtimeapi/sessions?api-version=2025-04-01-preview"
-    DEPLOYMENT = "gpt-4o-mini-realtime-preview"
-    VOICE = "verse"
+    # Azure OpenAI 配置（均可通过环境变量指向本地模拟服务，见 benchmarks/mock_upstream.py）
+    ENDPOINT = os.environ.get("AZURE_OPENAI_ENDPOINT", "https://gpt-realtime-4o-mini.openai.azure.com").rstrip("/")
+    API_VERSION = os.environ.get("AZURE_API_VERSION", "2025-04-01-preview")
+    # Realtime WebSocket基础地址，为空时由SDK根据ENDPOINT推导（强制wss）；本地模拟服务使用 ws://host:port/openai
+    WEBSOCKET_BASE_URL = os.environ.get("AZURE_OPENAI_WEBSOCKET_BASE_URL", "")
+    SESSIONS_URL = os.environ.get(
+        "AZURE_REALTIME_SESSIONS_URL",
+        f"{ENDPOINT}/openai/realtimeapi/sessions?api-version={API_VERSION}"
+    )
+    DEPLOYMENT = os.environ.get("AZURE_REALTIME_DEPLOYMENT", "gpt-4o-mini-realtime-preview")
+    VOICE = os.environ.get("AZURE_REALTIME_VOICE", "verse")
     
-    # WebRTC端点配置（支持多区域回退）
+    # WebRTC端点配置（支持多区域回退）；AZURE_REALTIME_WEBRTC_URLS 以逗号分隔，按优先级排列
     WEBRTC_CONFIGS = [
+        {"url": url.strip(), "useQuery": True}
+        for url in os.environ.get("AZURE_REALTIME_WEBRTC_URLS", "").split(",") if url.strip()
+    ] or [
         # East US 2 (主要区域)
         {"url": "https://eastus2.realtimeapi-preview.ai.azure.com/v1/realtimertc", "useQuery": True},
         # Sweden Central (备用区域)
@@ -115,5 +153,261 @@ class AzureRealtimeConfig:
             "voice": cls.VOICE
         }
 
-# 在模块导入时加载环境变量
-load_env() 
\ No newline at end of file
+
+# DeepSeek 评估模型配置
+class DeepSeekConfig:
+    """面试评估使用的OpenAI兼容Chat Completions接口"""
+    
+    API_URL = os.environ.get("DEEPSEEK_API_URL", "https://ds.yovole.com/api").rstrip("/")
+    API_KEY = os.environ.get("DEEPSEEK_API_KEY", "sk-833480880d9d417fbcc7ce125ca7d78b")
+    MODEL = os.environ.get("DEEPSEEK_MODEL", "DeepSeek-V3")
+    TIMEOUT_S = _env_float("DEEPSEEK_TIMEOUT_S", 30.0)
+
+
+# 事件循环看门狗配置
+class LoopWatchdogConfig:
+    """事件循环阻塞检测配置"""
+
+    ENABLED = _env_bool("LOOP_WATCHDOG_ENABLED", True)
+    # 心跳延迟超过该阈值即判定为阻塞
+    STALL_THRESHOLD_MS = _env_float("LOOP_STALL_THRESHOLD_MS", 100.0)
+    HEARTBEAT_INTERVAL_MS = _env_float("LOOP_HEARTBEAT_INTERVAL_MS", 50.0)
+    # 调试端点保留的最近阻塞调用栈数量
+    MAX_CAPTURED_STACKS = _env_int("LOOP_MAX_CAPTURED_STACKS", 20)
+
+
+# 管理接口配置
+class AdminConfig:
+    """管理/调试接口鉴权配置"""
+
+    # 通过请求头 X-Admin-Token 传递；未设置时所有管理接口返回403
+    TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+
+# 采样分析器配置
+class ProfilerConfig:
+    """生产环境采样分析配置（默认关闭，需显式开启）"""
+
+    ENABLED = _env_bool("PROFILER_ENABLED", False)
+    DEFAULT_DURATION_S = _env_float("PROFILER_DEFAULT_DURATION_S", 10.0)
+    # 单次分析的最长时长，防止误操作长时间占用进程
+    MAX_DURATION_S = _env_float("PROFILER_MAX_DURATION_S", 60.0)
+    DEFAULT_INTERVAL_MS = _env_float("PROFILER_DEFAULT_INTERVAL_MS", 10.0)
+    MIN_INTERVAL_MS = _env_float("PROFILER_MIN_INTERVAL_MS", 1.0)
+
+
+# 共享会话存储配置
+class SessionStoreConfig:
+    """跨worker共享的会话/简历存储配置"""
+
+    DB_PATH = os.environ.get("SESSION_DB_PATH", "resume_storage/sessions.db")
+    BUSY_TIMEOUT_MS = _env_int("SESSION_DB_BUSY_TIMEOUT_MS", 5000)
+
+
+# 服务启动配置
+class ServerConfig:
+    """start.py 启动参数的默认值"""
+
+    HOST = os.environ.get("HOST", "localhost")
+    PORT = _env_int("PORT", 8000)
+    # 生产模式的worker进程数，默认取CPU核数
+    WORKERS = _env_int("WORKERS", os.cpu_count() or 1)
+    # 监听socket的连接积压队列长度
+    BACKLOG = _env_int("BACKLOG", 2048)
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "info").lower()
+
+
+# 会话亲和路由配置
+class AffinityConfig:
+    """按session_id一致性哈希的粘性路由配置（start.py --mode sticky）"""
+
+    # 逗号分隔的上游地址，如 http://127.0.0.1:8001,http://10.0.0.2:8000
+    UPSTREAMS = os.environ.get("AFFINITY_UPSTREAMS", "")
+    VIRTUAL_NODES = _env_int("AFFINITY_VIRTUAL_NODES", 160)
+    HEADER_NAME = os.environ.get("AFFINITY_HEADER", "X-Session-Id")
+    COOKIE_NAME = os.environ.get("AFFINITY_COOKIE", "interview_session")
+    # 上游连接失败后暂停向其路由的时长
+    FAILURE_COOLDOWN_S = _env_float("AFFINITY_FAILURE_COOLDOWN_S", 10.0)
+    UPSTREAM_TIMEOUT_S = _env_float("AFFINITY_UPSTREAM_TIMEOUT_S", 60.0)
+    # 不超过该大小的请求体读入内存以便上游失败时重试，更大的请求体（简历上传）流式转发
+    RETRY_BUFFER_BYTES = _env_int("AFFINITY_RETRY_BUFFER_KB", 1024) * 1024
+
+
+# 准入控制与限流配置
+class AdmissionConfig:
+    """语音会话并发、消息速率、HTTP限流和评估排队配置（单进程计数）"""
+
+    ENABLED = _env_bool("ADMISSION_ENABLED", True)
+    MAX_VOICE_SESSIONS = _env_int("MAX_VOICE_SESSIONS", 200)
+    MAX_VOICE_SESSIONS_PER_IP = _env_int("MAX_VOICE_SESSIONS_PER_IP", 3)
+    # 单个语音会话：每秒消息数与突发容量
+    VOICE_MESSAGES_PER_SEC = _env_float("VOICE_MESSAGES_PER_SEC", 5.0)
+    VOICE_MESSAGE_BURST = _env_float("VOICE_MESSAGE_BURST", 20.0)
+    # 单个语音会话：每秒允许上传的音频秒数与突发容量
+    VOICE_AUDIO_SECONDS_PER_SEC = _env_float("VOICE_AUDIO_SECONDS_PER_SEC", 1.5)
+    VOICE_AUDIO_BURST_SECONDS = _env_float("VOICE_AUDIO_BURST_SECONDS", 30.0)
+    # /api/ 接口按客户端IP限流
+    HTTP_REQUESTS_PER_SEC = _env_float("HTTP_REQUESTS_PER_SEC", 10.0)
+    HTTP_BURST = _env_float("HTTP_BURST", 40.0)
+    # 面试评估：并发执行数、排队上限、排队超时
+    EVALUATION_CONCURRENCY = _env_int("EVALUATION_CONCURRENCY", 4)
+    EVALUATION_QUEUE_SIZE = _env_int("EVALUATION_QUEUE_SIZE", 32)
+    EVALUATION_QUEUE_TIMEOUT_S = _env_float("EVALUATION_QUEUE_TIMEOUT_S", 30.0)
+    # 位于可信反向代理（如会话亲和代理）之后时，按X-Forwarded-For识别客户端
+    TRUST_FORWARDED_FOR = _env_bool("TRUST_FORWARDED_FOR", False)
+
+
+# Realtime临时令牌池配置
+class TokenBrokerConfig:
+    """服务端预申请Realtime会话临时令牌的配置"""
+
+    ENABLED = _env_bool("TOKEN_BROKER_ENABLED", True)
+    POOL_SIZE = _env_int("TOKEN_BROKER_POOL_SIZE", 3)
+    # 距过期不足该秒数的令牌直接丢弃，留给浏览器完成WebRTC协商的时间
+    SAFETY_MARGIN_S = _env_float("TOKEN_BROKER_SAFETY_MARGIN_S", 15.0)
+
+
+# Realtime区域健康检查配置
+class RegionHealthConfig:
+    """WebRTC区域端点探测、EWMA打分与熔断配置"""
+
+    ENABLED = _env_bool("REGION_HEALTH_ENABLED", True)
+    PROBE_INTERVAL_S = _env_float("REGION_PROBE_INTERVAL_S", 30.0)
+    PROBE_TIMEOUT_S = _env_float("REGION_PROBE_TIMEOUT_S", 3.0)
+    # EWMA平滑系数，越大越偏向最近的探测结果
+    EWMA_ALPHA = _env_float("REGION_EWMA_ALPHA", 0.3)
+    # 连续失败次数达到阈值后熔断，冷却期后放行试探，试探失败则冷却时间翻倍
+    FAILURE_THRESHOLD = _env_int("REGION_FAILURE_THRESHOLD", 3)
+    OPEN_COOLDOWN_S = _env_float("REGION_OPEN_COOLDOWN_S", 30.0)
+    MAX_COOLDOWN_S = _env_float("REGION_MAX_COOLDOWN_S", 300.0)
+    # 客户端上报的失败率对区域得分的最大放大权重（不参与熔断）
+    CLIENT_REPORT_WEIGHT = _env_float("REGION_CLIENT_REPORT_WEIGHT", 0.5)
+    # 签发Realtime令牌后允许上报连接结果的时间
+    CLIENT_REPORT_TTL_S = _env_float("REGION_CLIENT_REPORT_TTL_S", 300.0)
+
+
+# 简历上传配置
+class UploadConfig:
+    """简历上传大小限制与流式读取配置"""
+
+    MAX_SIZE_BYTES = _env_int("UPLOAD_MAX_SIZE_MB", 10) * 1024 * 1024
+    CHUNK_SIZE_BYTES = _env_int("UPLOAD_CHUNK_SIZE_KB", 64) * 1024
+    # multipart边界和表单字段的额外开销，请求体上限 = 文件上限 + 该值
+    MULTIPART_OVERHEAD_BYTES = _env_int("UPLOAD_MULTIPART_OVERHEAD_KB", 64) * 1024
+
+
+# PDF解析配置
+class PdfExtractConfig:
+    """PDF文本提取的页数上限、单页超时与并行解析配置"""
+
+    MAX_PAGES = _env_int("PDF_MAX_PAGES", 200)
+    PAGE_TIMEOUT_S = _env_float("PDF_PAGE_TIMEOUT_S", 2.0)
+    # 页数达到该值时切分到进程池并行解析，简历通常只有1-3页，走当前线程更快
+    PARALLEL_MIN_PAGES = _env_int("PDF_PARALLEL_MIN_PAGES", 16)
+    # 进程池大小，0表示使用CPU核数，1表示不启用进程池
+    WORKERS = _env_int("PDF_WORKERS", 0)
+    PAGES_PER_TASK = _env_int("PDF_PAGES_PER_TASK", 8)
+
+
+# 全文检索配置
+class SearchIndexConfig:
+    """简历全文倒排索引配置"""
+
+    ENABLED = _env_bool("SEARCH_INDEX_ENABLED", True)
+    DIR = os.getenv("SEARCH_INDEX_DIR", "resume_storage/search_index")
+    # 启动时日志记录数超过该值则合并为快照
+    COMPACT_THRESHOLD = _env_int("SEARCH_INDEX_COMPACT_THRESHOLD", 1000)
+    MAX_RESULTS = _env_int("SEARCH_MAX_RESULTS", 50)
+
+
+# 岗位匹配配置
+class PositionMatchConfig:
+    """简历自动匹配面试方向（TF-IDF）配置"""
+
+    ENABLED = _env_bool("POSITION_MATCH_ENABLED", True)
+    # 最高相似度低于该值时使用通用面试官
+    MIN_SCORE = _env_float("POSITION_MATCH_MIN_SCORE", 0.05)
+    CACHE_SIZE = _env_int("POSITION_MATCH_CACHE_SIZE", 4096)
+    MAX_RANK_RESULTS = _env_int("POSITION_RANK_MAX_RESULTS", 500)
+
+
+# 近似重复简历检测配置
+class NearDuplicateConfig:
+    """MinHash + LSH 近似重复简历检测配置"""
+
+    ENABLED = _env_bool("NEAR_DUPLICATE_ENABLED", True)
+    # 估计的Jaccard相似度达到该值视为同一份简历，共享结构化简历等缓存
+    THRESHOLD = _env_float("NEAR_DUPLICATE_THRESHOLD", 0.9)
+    NUM_PERM = _env_int("NEAR_DUPLICATE_NUM_PERM", 128)
+    BANDS = _env_int("NEAR_DUPLICATE_BANDS", 16)
+
+
+# WebSocket下行发送配置
+class WsSendConfig:
+    """/ws/voice 下行帧的合并与发送队列"""
+
+    # 合并连续的 text_delta / transcript_delta，0表示不合并
+    COALESCE_INTERVAL_MS = _env_float("WS_COALESCE_INTERVAL_MS", 40.0)
+    COALESCE_MAX_CHARS = _env_int("WS_COALESCE_MAX_CHARS", 200)
+    # 每个连接的有界发送队列，由独立写协程发送，慢客户端不再阻塞上游事件处理
+    QUEUE_MAX_FRAMES = _env_int("WS_SEND_QUEUE_MAX_FRAMES", 256)
+    # 队列满时的策略：drop_text 丢弃最旧的语音转录增量（从不丢回复正文和音频）/ block 等待 / close 立即断开
+    OVERFLOW_POLICY = os.environ.get("WS_SEND_OVERFLOW_POLICY", "drop_text")
+    # 等待队列腾出空间的最长时间，超时视为慢消费者并断开
+    BLOCK_TIMEOUT_S = _env_float("WS_SEND_BLOCK_TIMEOUT_S", 5.0)
+
+
+# WebSocket会话恢复配置
+class WsResumeConfig:
+    """/ws/voice 断线重连后的会话恢复"""
+
+    ENABLED = _env_bool("WS_RESUME_ENABLED", True)
+    # 连接断开后保留会话（未确认帧、进行中的回复）的时间
+    RETENTION_S = _env_float("WS_RESUME_RETENTION_S", 30.0)
+    # 每个会话保留的未确认帧数 / 字节数上限（约30秒的音频），超出时淘汰最旧的帧
+    MAX_FRAMES = _env_int("WS_RESUME_MAX_FRAMES", 512)
+    MAX_BYTES = _env_int("WS_RESUME_MAX_BYTES", 2 * 1024 * 1024)
+    # 进程内可恢复会话总数上限
+    MAX_SESSIONS = _env_int("WS_RESUME_MAX_SESSIONS", 10000)
+
+
+# 面试对话记录配置
+class TranscriptLogConfig:
+    """/ws/voice 对话的服务端记录（只追加，写入 SESSION_DB_PATH）"""
+
+    ENABLED = _env_bool("TRANSCRIPT_LOG_ENABLED", True)
+    # 批量写入间隔与单批条数
+    FLUSH_INTERVAL_MS = _env_float("TRANSCRIPT_FLUSH_INTERVAL_MS", 1000.0)
+    MAX_BATCH = _env_int("TRANSCRIPT_MAX_BATCH", 200)
+    # 存储不可用时内存中最多缓冲的条目数
+    MAX_PENDING = _env_int("TRANSCRIPT_MAX_PENDING", 10000)
+
+
+# 面试历史配置
+class HistoryConfig:
+    """/api/interviews 面试历史接口"""
+
+    PAGE_SIZE = _env_int("HISTORY_PAGE_SIZE", 20)
+    MAX_PAGE_SIZE = _env_int("HISTORY_MAX_PAGE_SIZE", 100)
+    # 单次保存面试记录时最多接受的对话条数
+    MAX_MESSAGES = _env_int("HISTORY_MAX_MESSAGES", 2000)
+
+
+# 面试评分分析配置
+class AnalyticsConfig:
+    """/api/analytics 评分统计与原始数据导出"""
+
+    # 未指定起止日期时统计最近多少天
+    DEFAULT_DAYS = _env_int("ANALYTICS_DEFAULT_DAYS", 90)
+    # 单次查询的日期跨度上限
+    MAX_DAYS = _env_int("ANALYTICS_MAX_DAYS", 366)
+    # 导出时每批读取的面试数（CSV每批输出一次，Parquet每批一个行组）
+    EXPORT_BATCH = _env_int("ANALYTICS_EXPORT_BATCH", 1000)
+
+
+# 结构化简历配置
+class ResumeProfileConfig:
+    """注入prompt的精简简历上下文"""
+
+    # 进程内缓存的精简上下文条数（LRU），未命中时从共享会话存储读取
+    CONTEXT_CACHE_SIZE = _env_int("RESUME_CONTEXT_CACHE_SIZE", 1024)
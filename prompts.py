@@ -20,12 +20,15 @@ class InterviewPrompts:
     VOICE_CALL_INTERVIEWER = """你是一位专业的AI面试官，请用自然、友好的语调进行面试对话。根据候选人的简历内容，提出相关的技术和行为问题。保持对话流畅，适时给出反馈和鼓励。"""
     
     # 带简历上下文的提示词模板
-    WITH_RESUME_TEMPLATE = """{base_prompt}
+    # 静态指令在前、候选人简历在后，同一岗位的所有候选人共享相同前缀，便于上游复用提示词缓存
+    RESUME_INSTRUCTION = """请根据简历内容进行针对性的面试提问。
 
-候选人简历信息：
-{resume_context}
+候选人简历信息："""
+
+    WITH_RESUME_TEMPLATE = """{base_prompt}
 
-请根据简历内容进行针对性的面试提问。"""
+""" + RESUME_INSTRUCTION + """
+{resume_context}"""
 
     # 不同岗位的专业提示词
     POSITION_SPECIFIC = {
@@ -200,20 +203,19 @@ class InterviewEvaluationPrompts:
 - 3-4分：较差，需要改进
 - 0-2分：很差，严重不足"""
 
-    # 面试总结模板
-    EVALUATION_TEMPLATE = """基于以下面试对话内容，请进行专业评估：
+    # 评估任务说明（静态，随系统提示词一起发送）
+    EVALUATION_INSTRUCTION = """用户消息中会依次给出面试统计信息、候选人简历背景和面试对话记录，请基于这些内容进行专业评估，按照评估标准进行详细分析和评分。"""
+
+    # 面试总结模板（动态部分，作为用户消息发送；短小的统计信息在前，逐轮增长的对话记录放在最后）
+    EVALUATION_TEMPLATE = """**面试时长：** {duration}
+**问题总数：** {question_count}
+**回答总数：** {answer_count}
 
 **候选人简历背景：**
 {resume_context}
 
 **面试对话记录：**
-{conversation_history}
-
-**面试时长：** {duration}
-**问题总数：** {question_count}
-**回答总数：** {answer_count}
-
-请按照评估标准进行详细分析和评分。"""
+{conversation_history}"""
 
     # 快速评估提示词（用于实时反馈）
     QUICK_EVALUATION_PROMPT = """请对这段面试对话进行快速评估，给出简短的表现总结和建议：
@@ -240,43 +242,54 @@ class DebugPrompts:
         "evaluation_complete": "面试评分完成: 总分={total_score}, 用时={duration}ms"
     }
 
-def get_interviewer_prompt(position=None, resume_context=None):
+def get_interviewer_prompt_parts(position=None, resume_context=None):
     """
-    获取面试官提示词
+    获取拆分为静态前缀和动态后缀的面试官提示词
     
     Args:
         position: 岗位类型 (frontend/backend/fullstack/ai_ml/data_science)
         resume_context: 简历上下文
     
     Returns:
-        str: 完整的面试官提示词
+        tuple: (静态前缀, 动态后缀)；静态前缀只取决于岗位，动态后缀为候选人简历，没有简历时为空字符串
     """
-    # 选择基础提示词
     if position and position in InterviewPrompts.POSITION_SPECIFIC:
         base_prompt = InterviewPrompts.POSITION_SPECIFIC[position]
     else:
         base_prompt = InterviewPrompts.BASE_INTERVIEWER
     
-    # 如果有简历上下文，使用模板
     if resume_context:
-        return InterviewPrompts.WITH_RESUME_TEMPLATE.format(
-            base_prompt=base_prompt,
-            resume_context=resume_context
-        )
+        return f"{base_prompt}\n\n{InterviewPrompts.RESUME_INSTRUCTION}", resume_context
+    return base_prompt, ""
+
+def get_interviewer_prompt(position=None, resume_context=None):
+    """
+    获取面试官提示词
     
-    return base_prompt
+    Args:
+        position: 岗位类型 (frontend/backend/fullstack/ai_ml/data_science)
+        resume_context: 简历上下文
+    
+    Returns:
+        str: 完整的面试官提示词
+    """
+    static_prefix, dynamic_suffix = get_interviewer_prompt_parts(position, resume_context)
+    return f"{static_prefix}\n{dynamic_suffix}" if dynamic_suffix else static_prefix
 
-def get_voice_call_prompt(resume_context=None):
+def get_voice_call_prompt(resume_context=None, position=None):
     """
     获取语音通话专用提示词
     
     Args:
         resume_context: 简历上下文
+        position: 岗位类型 (frontend/backend/fullstack/ai_ml/data_science)，附加对应的考察重点
     
     Returns:
         str: 语音通话提示词
     """
     base_prompt = InterviewPrompts.VOICE_CALL_INTERVIEWER
+    if position and position in InterviewPrompts.POSITION_SPECIFIC:
+        base_prompt = f"{base_prompt}\n\n{InterviewPrompts.POSITION_SPECIFIC[position]}"
     
     if resume_context:
         return InterviewPrompts.WITH_RESUME_TEMPLATE.format(
@@ -320,6 +333,33 @@ def get_notification_message(message_type, category="success"):
     else:
         return "未知消息"
 
+def get_interview_evaluation_messages(resume_context=None, conversation_history=None, duration=None, question_count=0, answer_count=0):
+    """
+    获取面试评分的对话消息：静态的评分标准作为system消息，候选人数据作为user消息
+    
+    Args:
+        resume_context: 简历上下文
+        conversation_history: 对话历史
+        duration: 面试时长
+        question_count: 问题数量
+        answer_count: 回答数量
+    
+    Returns:
+        list: OpenAI兼容的messages列表
+    """
+    system_prompt = f"{InterviewEvaluationPrompts.EVALUATION_SYSTEM_PROMPT}\n\n{InterviewEvaluationPrompts.EVALUATION_INSTRUCTION}"
+    user_content = InterviewEvaluationPrompts.EVALUATION_TEMPLATE.format(
+        resume_context=resume_context or "未提供简历信息",
+        conversation_history=conversation_history or "（无对话记录）",
+        duration=duration or "未知",
+        question_count=question_count,
+        answer_count=answer_count
+    )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content}
+    ]
+
 def get_interview_evaluation_prompt(resume_context=None, conversation_history=None, duration=None, question_count=0, answer_count=0):
     """
     获取面试评分提示词
@@ -334,19 +374,13 @@ def get_interview_evaluation_prompt(resume_context=None, conversation_history=No
     Returns:
         str: 完整的面试评分提示词
     """
-    system_prompt = InterviewEvaluationPrompts.EVALUATION_SYSTEM_PROMPT
-    
     if conversation_history:
-        evaluation_content = InterviewEvaluationPrompts.EVALUATION_TEMPLATE.format(
-            resume_context=resume_context or "未提供简历信息",
-            conversation_history=conversation_history,
-            duration=duration or "未知",
-            question_count=question_count,
-            answer_count=answer_count
+        messages = get_interview_evaluation_messages(
+            resume_context, conversation_history, duration, question_count, answer_count
         )
-        return f"{system_prompt}\n\n{evaluation_content}"
+        return "\n\n".join(message["content"] for message in messages)
     
-    return system_prompt
+    return InterviewEvaluationPrompts.EVALUATION_SYSTEM_PROMPT
 
 def get_quick_evaluation_prompt(conversation_snippet):
     """
@@ -6,10 +6,13 @@ LLM面试官系统启动脚本
 """
 import os
 import sys
+import argparse
 import subprocess
 import time
 from pathlib import Path
 
+from config import ServerConfig
+
 def print_banner():
     """打印启动横幅"""
     banner = """
@@ -21,7 +24,7 @@ def print_banner():
     print(banner)
 
 
-def check_env_config():
+def check_env_config(interactive=True):
     """检查环境变量配置"""
     api_key = os.environ.get("OPENAI_API_KEY") or os.environ.get("ARK_API_KEY")
     if not api_key:
@@ -37,6 +40,10 @@ def check_env_config():
             print("   示例内容：")
             print("   OPENAI_API_KEY=your_api_key_here")
             print("   OPENAI_BASE_URL=your_base_url_here")
+        
+        # 生产模式通常由进程管理器拉起，不等待终端输入
+        if not interactive:
+            return True
             
         choice = input("\n是否继续启动？(y/N): ").lower().strip()
         if choice not in ['y', 'yes']:
@@ -46,38 +53,123 @@ def check_env_config():
     
     return True
 
-def start_server():
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="LLM面试官系统启动脚本")
+    parser.add_argument("--mode", choices=["dev", "prod", "sticky"], default="dev",
+                        help="dev: 单进程热重载；prod: 多worker、无热重载；"
+                             "sticky: 多个独立worker + 按session_id一致性哈希的本地代理")
+    parser.add_argument("--host", default=ServerConfig.HOST, help="监听地址")
+    parser.add_argument("--port", type=int, default=ServerConfig.PORT, help="监听端口")
+    parser.add_argument("--workers", type=int, default=ServerConfig.WORKERS,
+                        help="prod模式的worker进程数（默认CPU核数）")
+    parser.add_argument("--backlog", type=int, default=ServerConfig.BACKLOG,
+                        help="监听socket的连接积压队列长度")
+    parser.add_argument("--log-level", default=ServerConfig.LOG_LEVEL, help="uvicorn日志级别")
+    parser.add_argument("--upstreams", default="",
+                        help="sticky模式：逗号分隔的已有上游地址（可跨主机）；为空时在本机启动workers个上游")
+    return parser.parse_args(argv)
+
+def build_uvicorn_command(args):
+    """根据启动模式构建uvicorn命令行"""
+    command = [
+        sys.executable, "-m", "uvicorn",
+        "backend.app:app",
+        "--host", args.host,
+        "--port", str(args.port),
+        "--backlog", str(args.backlog),
+        "--log-level", args.log_level
+    ]
+    
+    if args.mode == "prod":
+        # 会话状态保存在共享存储中（见SESSION_DB_PATH），任意worker都能处理任意session_id
+        command += ["--workers", str(max(1, args.workers))]
+    else:
+        command.append("--reload")
+    
+    return command
+
+def build_proxy_command(args):
+    """sticky模式下会话亲和代理的uvicorn命令行"""
+    return [
+        sys.executable, "-m", "uvicorn",
+        "backend.affinity:create_proxy_app", "--factory",
+        "--host", args.host,
+        "--port", str(args.port),
+        "--backlog", str(args.backlog),
+        "--log-level", args.log_level
+    ]
+
+def start_sticky_cluster(args):
+    """
+    启动会话亲和集群：每个上游是独立的单进程服务，由代理按session_id固定路由
+
+    Returns:
+        本机启动的上游进程列表
+    """
+    upstream_processes = []
+    upstreams = [u.strip() for u in args.upstreams.split(",") if u.strip()]
+    
+    if not upstreams:
+        for i in range(max(1, args.workers)):
+            port = args.port + 1 + i
+            upstreams.append(f"http://127.0.0.1:{port}")
+            upstream_processes.append(subprocess.Popen([
+                sys.executable, "-m", "uvicorn",
+                "backend.app:app",
+                "--host", "127.0.0.1",
+                "--port", str(port),
+                "--backlog", str(args.backlog),
+                "--log-level", args.log_level
+            ], env=dict(os.environ, TRUST_FORWARDED_FOR="1")))  # 上游只接受本机代理转发
+    
+    os.environ["AFFINITY_UPSTREAMS"] = ",".join(upstreams)
+    print(f"   会话亲和上游：{', '.join(upstreams)}")
+    return upstream_processes
+
+def start_server(args):
     """启动服务器"""
     print("\n🚀 正在启动LLM面试官系统...")
-    print("   服务地址：http://localhost:8000")
+    print(f"   服务地址：http://{args.host}:{args.port}")
+    if args.mode == "prod":
+        print(f"   运行模式：生产模式（{max(1, args.workers)} 个worker，backlog={args.backlog}）")
+    elif args.mode == "sticky":
+        print("   运行模式：会话亲和模式（按session_id固定worker）")
+    else:
+        print("   运行模式：开发模式（热重载）")
     print("   按 Ctrl+C 停止服务\n")
     
+    upstream_processes = []
     try:
         # 启动uvicorn服务器
-        subprocess.run([
-            sys.executable, "-m", "uvicorn", 
-            "backend.app:app", 
-            "--host", "localhost",
-            "--port", "8000",
-            "--reload"
-        ])
+        if args.mode == "sticky":
+            upstream_processes = start_sticky_cluster(args)
+            subprocess.run(build_proxy_command(args))
+        else:
+            subprocess.run(build_uvicorn_command(args))
     except KeyboardInterrupt:
         print("\n\n👋 感谢使用LLM面试官系统！")
     except Exception as e:
         print(f"\n❌ 启动失败：{e}")
         return False
+    finally:
+        for process in upstream_processes:
+            process.terminate()
+        for process in upstream_processes:
+            process.wait()
     
     return True
 
 def main():
     """主函数"""
+    args = parse_args()
     print_banner()
     
-    if not check_env_config():
+    if not check_env_config(interactive=args.mode == "dev"):
         sys.exit(1)
     
     # 启动服务
-    start_server()
+    start_server(args)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
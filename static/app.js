@@ -13,7 +13,8 @@ class LocalStorageManager {
         this.KEYS = {
             INTERVIEWS: 'azure_interviews_history',
             CURRENT_RESUME: 'azure_current_resume',
-            APP_SETTINGS: 'azure_app_settings'
+            APP_SETTINGS: 'azure_app_settings',
+            CLIENT_ID: 'azure_client_id'
         };
     }
 
@@ -29,28 +30,28 @@ class LocalStorageManager {
         }
     }
 
-    // 保存面试记录
-    saveInterview(interview) {
+    // 客户端ID：服务端按它隔离面试历史，首次使用时生成并保存
+    getClientId() {
+        let clientId = null;
         try {
-            const interviews = this.getInterviews();
-            interview.id = Date.now().toString();
-            interview.createdAt = new Date().toISOString();
-            interviews.unshift(interview);
-            
-            // 限制最大数量，防止占用过多空间
-            if (interviews.length > 50) {
-                interviews.splice(50);
-            }
-            
-            localStorage.setItem(this.KEYS.INTERVIEWS, JSON.stringify(interviews));
-            return true;
+            clientId = localStorage.getItem(this.KEYS.CLIENT_ID);
         } catch (e) {
-            console.error('保存面试记录失败:', e);
-            return false;
+            console.warn('读取客户端ID失败:', e);
         }
+        if (!clientId) {
+            clientId = window.crypto && crypto.randomUUID
+                ? crypto.randomUUID().replace(/-/g, '')
+                : Array.from({ length: 32 }, () => Math.floor(Math.random() * 16).toString(16)).join('');
+            try {
+                localStorage.setItem(this.KEYS.CLIENT_ID, clientId);
+            } catch (e) {
+                console.warn('保存客户端ID失败:', e);
+            }
+        }
+        return clientId;
     }
 
-    // 获取所有面试记录
+    // 获取旧版本保存在localStorage中的面试记录（仅用于迁移到服务端）
     getInterviews() {
         try {
             const data = localStorage.getItem(this.KEYS.INTERVIEWS);
@@ -61,20 +62,7 @@ class LocalStorageManager {
         }
     }
 
-    // 删除面试记录
-    deleteInterview(id) {
-        try {
-            const interviews = this.getInterviews();
-            const filtered = interviews.filter(interview => interview.id !== id);
-            localStorage.setItem(this.KEYS.INTERVIEWS, JSON.stringify(filtered));
-            return true;
-        } catch (e) {
-            console.error('删除面试记录失败:', e);
-            return false;
-        }
-    }
-
-    // 清空所有面试记录
+    // 清空旧版本的面试记录
     clearInterviews() {
         try {
             localStorage.removeItem(this.KEYS.INTERVIEWS);
@@ -133,6 +121,227 @@ class LocalStorageManager {
     }
 }
 
+/**
+ * 面试历史存储：服务端分页接口为准，IndexedDB缓存已加载的摘要和详情
+ */
+class InterviewHistoryStore {
+    constructor(storageManager) {
+        this.storageManager = storageManager;
+        this.clientId = storageManager.getClientId();
+        this.DB_NAME = 'azure_interview_history';
+        this.DB_VERSION = 1;
+        this.dbPromise = null;
+    }
+
+    headers(extra = {}) {
+        return { 'X-Client-Id': this.clientId, ...extra };
+    }
+
+    // 打开IndexedDB，不可用时返回null（仅失去缓存，不影响功能）
+    openDB() {
+        if (!this.dbPromise) {
+            this.dbPromise = new Promise((resolve) => {
+                if (!window.indexedDB) {
+                    resolve(null);
+                    return;
+                }
+                const request = indexedDB.open(this.DB_NAME, this.DB_VERSION);
+                request.onupgradeneeded = () => {
+                    const db = request.result;
+                    if (!db.objectStoreNames.contains('summaries')) {
+                        db.createObjectStore('summaries', { keyPath: 'id' });
+                    }
+                    if (!db.objectStoreNames.contains('details')) {
+                        db.createObjectStore('details', { keyPath: 'id' });
+                    }
+                };
+                request.onsuccess = () => resolve(request.result);
+                request.onerror = () => {
+                    console.warn('IndexedDB不可用，面试历史不做本地缓存:', request.error);
+                    resolve(null);
+                };
+            });
+        }
+        return this.dbPromise;
+    }
+
+    async withStores(storeNames, mode, action) {
+        const db = await this.openDB();
+        if (!db) {
+            return null;
+        }
+        return new Promise((resolve) => {
+            const tx = db.transaction(storeNames, mode);
+            const request = action(tx);
+            tx.oncomplete = () => resolve(request ? request.result : null);
+            tx.onerror = () => resolve(null);
+            tx.onabort = () => resolve(null);
+        });
+    }
+
+    async getCachedSummaries() {
+        return (await this.withStores('summaries', 'readonly', tx => tx.objectStore('summaries').getAll())) || [];
+    }
+
+    async cacheSummaries(interviews, replace = false) {
+        await this.withStores('summaries', 'readwrite', tx => {
+            const store = tx.objectStore('summaries');
+            if (replace) {
+                store.clear();
+            }
+            interviews.forEach(interview => store.put(interview));
+            return null;
+        });
+    }
+
+    async updateCachedSummary(id, changes) {
+        await this.withStores(['summaries', 'details'], 'readwrite', tx => {
+            ['summaries', 'details'].forEach(name => {
+                const store = tx.objectStore(name);
+                const request = store.get(id);
+                request.onsuccess = () => {
+                    if (request.result) {
+                        store.put({ ...request.result, ...changes });
+                    }
+                };
+            });
+            return null;
+        });
+    }
+
+    async removeCached(id) {
+        await this.withStores(['summaries', 'details'], 'readwrite', tx => {
+            tx.objectStore('summaries').delete(id);
+            tx.objectStore('details').delete(id);
+            return null;
+        });
+    }
+
+    async clearCache() {
+        await this.withStores(['summaries', 'details'], 'readwrite', tx => {
+            tx.objectStore('summaries').clear();
+            tx.objectStore('details').clear();
+            return null;
+        });
+    }
+
+    // 获取一页摘要；第一页替换缓存，之后的页追加到缓存
+    async fetchPage(sort, cursor = '') {
+        const params = new URLSearchParams({ sort });
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        const response = await fetch(`/api/interviews?${params.toString()}`, { headers: this.headers() });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        const data = await response.json();
+        await this.cacheSummaries(data.interviews, !cursor);
+        return data;
+    }
+
+    // 获取完整记录（含对话和评估），网络不可用时使用缓存
+    async getInterview(id) {
+        try {
+            const response = await fetch(`/api/interviews/${encodeURIComponent(id)}`, { headers: this.headers() });
+            if (response.ok) {
+                const data = await response.json();
+                await this.withStores('details', 'readwrite', tx => tx.objectStore('details').put(data.interview));
+                return data.interview;
+            }
+            if (response.status === 404) {
+                await this.removeCached(id);
+                return null;
+            }
+        } catch (e) {
+            console.warn('获取面试记录失败，使用本地缓存:', e);
+        }
+        return await this.withStores('details', 'readonly', tx => tx.objectStore('details').get(id));
+    }
+
+    async saveInterview(interview) {
+        const response = await fetch('/api/interviews', {
+            method: 'POST',
+            headers: this.headers({ 'Content-Type': 'application/json' }),
+            body: JSON.stringify({
+                interview_id: interview.id,
+                messages: interview.messages || [],
+                duration: interview.duration || 0,
+                session_id: interview.sessionId || '',
+                created_at: interview.createdAt || '',
+                evaluation: interview.evaluation || null
+            })
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        const data = await response.json();
+        const summary = {
+            id: interview.id,
+            sessionId: interview.sessionId || '',
+            createdAt: interview.createdAt,
+            duration: interview.duration || 0,
+            messageCount: data.message_count,
+            score: interview.evaluation?.total_score ?? null,
+            summary: interview.evaluation?.summary || '',
+            hasEvaluation: Boolean(interview.evaluation)
+        };
+        await this.cacheSummaries([summary]);
+        return summary;
+    }
+
+    // 评估结果由服务端在评分时保存，这里只同步缓存
+    async updateEvaluation(id, evaluation) {
+        await this.updateCachedSummary(id, {
+            score: evaluation.total_score ?? null,
+            summary: evaluation.summary || '',
+            hasEvaluation: true,
+            evaluation: evaluation
+        });
+    }
+
+    async deleteInterview(id) {
+        const response = await fetch(`/api/interviews/${encodeURIComponent(id)}`, {
+            method: 'DELETE',
+            headers: this.headers()
+        });
+        if (!response.ok && response.status !== 404) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        await this.removeCached(id);
+    }
+
+    async clearInterviews() {
+        const response = await fetch('/api/interviews', { method: 'DELETE', headers: this.headers() });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        await this.clearCache();
+    }
+
+    // 把旧版本localStorage中的记录迁移到服务端，全部成功后删除本地副本
+    async migrateLocalStorage() {
+        const legacy = this.storageManager.getInterviews();
+        if (!legacy.length) {
+            return false;
+        }
+        let failed = 0;
+        for (const interview of legacy) {
+            try {
+                await this.saveInterview(interview);
+            } catch (e) {
+                failed += 1;
+                console.warn('迁移面试记录失败:', interview.id, e);
+            }
+        }
+        if (!failed) {
+            this.storageManager.clearInterviews();
+        }
+        console.log(`已迁移 ${legacy.length - failed} 条本地面试记录到服务端`);
+        return true;
+    }
+}
+
 /**
  * 页面路由管理器
  */
@@ -224,8 +433,10 @@ class PageRouter {
  * Azure语音聊天管理器
  */
 class AzureVoiceChat {
-    constructor() {
+    constructor(clientId = '') {
         this.ws = null;
+        // 客户端ID：服务端按它隔离对话记录
+        this.clientId = clientId;
         this.audioContext = null;
         this.audioQueue = [];
         this.isStreamingAudio = false;
@@ -235,6 +446,12 @@ class AzureVoiceChat {
         this.lastPlayTime = 0;
         this.currentSessionId = '';
         
+        // 会话恢复：服务端下发的恢复令牌、已收到的最大下行帧序号
+        this.resumeToken = '';
+        this.lastSeq = 0;
+        this.ackTimer = null;
+        this.reconnectAttempts = 0;
+        
         // 面试记录相关
         this.currentInterviewMessages = [];
         this.interviewStartTime = null;
@@ -342,13 +559,27 @@ class AzureVoiceChat {
     
     connect() {
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-        const wsUrl = `${protocol}//${window.location.host}/ws/voice`;
+        // 携带session_id，供会话亲和代理把语音连接路由到持有该简历缓存的worker；
+        // 断线重连时携带恢复令牌和已收到的最大序号，服务端重放未收到的帧
+        const params = new URLSearchParams({ resume: '1' });
+        if (this.currentSessionId) {
+            params.set('session_id', this.currentSessionId);
+        }
+        if (this.clientId) {
+            params.set('client_id', this.clientId);
+        }
+        if (this.resumeToken) {
+            params.set('resume_token', this.resumeToken);
+            params.set('last_seq', String(this.lastSeq));
+        }
+        const wsUrl = `${protocol}//${window.location.host}/ws/voice?${params.toString()}`;
         
         console.log('正在连接Azure语音服务:', wsUrl);
         this.ws = new WebSocket(wsUrl);
         
         this.ws.onopen = () => {
             console.log('Azure语音WebSocket连接已建立');
+            this.reconnectAttempts = 0;
             this.setStatus('已连接 - Azure语音服务', 'connected');
             this.enableInput();
             this.hideLoadingOverlay();
@@ -356,16 +587,32 @@ class AzureVoiceChat {
         
         this.ws.onmessage = (event) => {
             const data = JSON.parse(event.data);
+            if (data.seq) {
+                this.lastSeq = Math.max(this.lastSeq, data.seq);
+                this.scheduleAck();
+            }
             this.handleMessage(data);
         };
         
         this.ws.onclose = () => {
+            this.clearAckTimer();
+            if (this.reconnectForSession) {
+                // 会话切换导致的主动重连，立即重连且不提示断开；新会话不恢复旧连接的下行帧
+                this.reconnectForSession = false;
+                this.resumeToken = '';
+                this.lastSeq = 0;
+                this.connect();
+                return;
+            }
+            
             console.log('Azure语音WebSocket连接已断开');
             this.setStatus('连接断开', 'error');
             this.disableInput();
             this.showLoadingOverlay('连接断开，正在重连...');
-            // 5秒后重连
-            setTimeout(() => this.connect(), 5000);
+            // 持有恢复令牌时首次立即重连（服务端保留窗口内可接上进行中的回复），之后5秒重试
+            const delay = this.resumeToken && this.reconnectAttempts === 0 ? 300 : 5000;
+            this.reconnectAttempts += 1;
+            setTimeout(() => this.connect(), delay);
         };
         
         this.ws.onerror = (error) => {
@@ -375,6 +622,26 @@ class AzureVoiceChat {
         };
     }
     
+    scheduleAck() {
+        // 合并确认：最多每500ms发送一次已收到的最大序号
+        if (this.ackTimer) {
+            return;
+        }
+        this.ackTimer = setTimeout(() => {
+            this.ackTimer = null;
+            if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+                this.ws.send(JSON.stringify({ type: 'ack', seq: this.lastSeq }));
+            }
+        }, 500);
+    }
+    
+    clearAckTimer() {
+        if (this.ackTimer) {
+            clearTimeout(this.ackTimer);
+            this.ackTimer = null;
+        }
+    }
+    
     setStatus(text, className = '') {
         console.log('更新状态:', text, className);
         
@@ -507,6 +774,19 @@ class AzureVoiceChat {
 
     handleMessage(data) {
         switch (data.type) {
+            case 'session_ready':
+                if (this.resumeToken) {
+                    console.warn('会话已过期，无法恢复断线前的回复');
+                }
+                this.resumeToken = data.resume_token;
+                this.lastSeq = 0;
+                break;
+            case 'session_resumed':
+                console.log(`会话已恢复，重放 ${data.replayed} 帧`);
+                if (!data.complete) {
+                    console.warn('部分下行帧已超出服务端保留上限，断线期间的回复可能不完整');
+                }
+                break;
             case 'text_delta':
                 this.handleTextDelta(data.content);
                 break;
@@ -843,8 +1123,16 @@ class AzureVoiceChat {
     }
     
     setSessionId(sessionId) {
+        const previousSessionId = this.currentSessionId;
         this.currentSessionId = sessionId || '';
         console.log('设置会话ID:', this.currentSessionId);
+        
+        // 会话变化且当前没有进行中的面试时，重连到新会话对应的worker
+        if (previousSessionId !== this.currentSessionId && !this.isInterviewActive &&
+            this.ws && this.ws.readyState === WebSocket.OPEN) {
+            this.reconnectForSession = true;
+            this.ws.close();
+        }
     }
     
     showError(message) {
@@ -885,7 +1173,7 @@ class AzureVoiceChat {
         
         console.log('结束面试记录，时长:', duration, '秒');
         
-        // 保存面试记录到本地存储
+        // 面试记录摘要
         const interview = {
             id: this.currentInterviewId,
             messages: this.currentInterviewMessages,
@@ -895,9 +1183,13 @@ class AzureVoiceChat {
             completed: true
         };
         
-        // 保存到本地存储
-        if (this.app && this.app.storageManager) {
-            this.app.storageManager.saveInterview(interview);
+        // 保存到服务端（失败时评分仍可进行，记录会在评分时由服务端创建）
+        if (this.app && this.app.historyStore) {
+            try {
+                await this.app.historyStore.saveInterview(interview);
+            } catch (e) {
+                console.error('保存面试记录失败:', e);
+            }
         }
         
         // 触发面试评分
@@ -953,7 +1245,9 @@ class AzureVoiceChat {
             const response = await fetch('/api/interview/evaluate', {
                 method: 'POST',
                 headers: {
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'application/json',
+                    'X-Session-Id': interview.sessionId || '',
+                    'X-Client-Id': this.app?.historyStore?.clientId || ''
                 },
                 body: JSON.stringify(evaluationRequest)
             });
@@ -965,7 +1259,7 @@ class AzureVoiceChat {
                 // 显示评分结果
                 this.showEvaluationResult(result.evaluation);
                 
-                // 更新本地存储的面试记录
+                // 更新本地缓存的面试记录
                 this.updateInterviewWithEvaluation(interview.id, result.evaluation);
                 
             } else {
@@ -1168,19 +1462,9 @@ class AzureVoiceChat {
      * 更新面试记录的评分信息
      */
     updateInterviewWithEvaluation(interviewId, evaluation) {
-        if (this.app && this.app.storageManager) {
-            const interviews = this.app.storageManager.getInterviews();
-            const interview = interviews.find(item => item.id === interviewId);
-            
-            if (interview) {
-                interview.evaluation = evaluation;
-                interview.score = evaluation.total_score;
-                interview.summary = evaluation.summary;
-                
-                // 重新保存
-                this.app.storageManager.saveInterview(interview);
-                console.log('面试记录已更新评分信息');
-            }
+        if (this.app && this.app.historyStore) {
+            this.app.historyStore.updateEvaluation(interviewId, evaluation)
+                .then(() => console.log('面试记录已更新评分信息'));
         }
     }
 }
@@ -1189,12 +1473,21 @@ class AzureVoiceChat {
  * 历史记录管理器
  */
 class HistoryManager {
-    constructor(storageManager, router) {
-        this.storageManager = storageManager;
+    constructor(historyStore, router) {
+        this.historyStore = historyStore;
         this.router = router;
         this.historyList = null;
         this.emptyHistory = null;
         this.sortBy = null;
+        this.loadMoreSentinel = null;
+        this.observer = null;
+        
+        // 分页状态：下一页游标、已渲染的记录、当前加载批次（排序切换后丢弃过期的响应）
+        this.PAGE_SIZE = 20;
+        this.nextCursor = null;
+        this.loading = false;
+        this.loadToken = 0;
+        this.items = new Map();
         
         this.init();
     }
@@ -1204,10 +1497,36 @@ class HistoryManager {
         this.emptyHistory = document.getElementById('emptyHistory');
         this.sortBy = document.getElementById('sortBy');
         
+        this.createLoadMoreSentinel();
         this.bindHistoryEvents();
         this.refreshHistoryList();
     }
 
+    createLoadMoreSentinel() {
+        if (!this.historyList) {
+            return;
+        }
+        this.loadMoreSentinel = document.createElement('div');
+        this.loadMoreSentinel.className = 'history-load-more';
+        this.loadMoreSentinel.style.display = 'none';
+        this.loadMoreSentinel.style.textAlign = 'center';
+        this.loadMoreSentinel.style.padding = '12px';
+        this.loadMoreSentinel.style.cursor = 'pointer';
+        this.loadMoreSentinel.textContent = '加载更多';
+        this.loadMoreSentinel.addEventListener('click', () => this.loadMore());
+        this.historyList.appendChild(this.loadMoreSentinel);
+        
+        // 滚动到列表底部时自动加载下一页
+        if ('IntersectionObserver' in window) {
+            this.observer = new IntersectionObserver(entries => {
+                if (entries.some(entry => entry.isIntersecting)) {
+                    this.loadMore();
+                }
+            }, { rootMargin: '200px' });
+            this.observer.observe(this.loadMoreSentinel);
+        }
+    }
+
     bindHistoryEvents() {
         // 排序方式改变
         if (this.sortBy) {
@@ -1231,43 +1550,101 @@ class HistoryManager {
                 this.router.navigateTo('interview');
             });
         }
+        
+        // 切换到历史页时重新加载第一页
+        window.addEventListener('pageChanged', (e) => {
+            if (e.detail.page === 'history') {
+                this.refreshHistoryList();
+            }
+        });
     }
 
-    refreshHistoryList() {
-        const interviews = this.storageManager.getInterviews();
+    sortParam() {
+        return (this.sortBy?.value || 'date-desc').replace('-', '_');
+    }
+
+    async refreshHistoryList() {
+        const token = ++this.loadToken;
+        this.nextCursor = null;
         
-        if (interviews.length === 0) {
-            this.showEmptyState();
-        } else {
-            this.showHistoryList(interviews);
+        // 先用IndexedDB缓存渲染第一页，不等待网络
+        const cached = this.sortInterviews(await this.historyStore.getCachedSummaries()).slice(0, this.PAGE_SIZE);
+        if (token !== this.loadToken) {
+            return;
         }
+        this.renderInterviews(cached, false);
+        
+        await this.loadPage(token, '');
     }
 
-    showEmptyState() {
-        if (this.emptyHistory) {
-            this.emptyHistory.style.display = 'block';
+    async loadMore() {
+        if (this.loading || !this.nextCursor) {
+            return;
         }
-        if (this.historyList) {
-            this.historyList.innerHTML = '';
+        await this.loadPage(this.loadToken, this.nextCursor);
+    }
+
+    async loadPage(token, cursor) {
+        this.loading = true;
+        try {
+            const data = await this.historyStore.fetchPage(this.sortParam(), cursor);
+            if (token !== this.loadToken) {
+                return;
+            }
+            this.nextCursor = data.next_cursor;
+            this.renderInterviews(data.interviews, Boolean(cursor));
+        } catch (e) {
+            console.error('加载面试历史失败:', e);
+        } finally {
+            this.loading = false;
+            this.updateLoadMore();
+        }
+    }
+
+    updateLoadMore() {
+        if (this.loadMoreSentinel) {
+            this.loadMoreSentinel.style.display = this.nextCursor ? 'block' : 'none';
         }
     }
 
-    showHistoryList(interviews) {
+    renderInterviews(interviews, append) {
+        if (!this.historyList) {
+            return;
+        }
+        if (!append) {
+            this.historyList.querySelectorAll('.history-item').forEach(element => element.remove());
+            this.items.clear();
+        }
+        
+        const fresh = interviews.filter(interview => !this.items.has(interview.id));
+        fresh.forEach(interview => this.items.set(interview.id, interview));
+        
+        if (this.items.size === 0) {
+            this.showEmptyState();
+            return;
+        }
         if (this.emptyHistory) {
             this.emptyHistory.style.display = 'none';
         }
-
-        const sortedInterviews = this.sortInterviews(interviews);
         
+        const html = fresh.map(interview => this.createHistoryItemHTML(interview)).join('');
+        if (this.loadMoreSentinel) {
+            this.loadMoreSentinel.insertAdjacentHTML('beforebegin', html);
+        } else {
+            this.historyList.insertAdjacentHTML('beforeend', html);
+        }
+    }
+
+    showEmptyState() {
+        if (this.emptyHistory) {
+            this.emptyHistory.style.display = 'block';
+        }
         if (this.historyList) {
-            this.historyList.innerHTML = sortedInterviews
-                .map(interview => this.createHistoryItemHTML(interview))
-                .join('');
-            
-            this.bindHistoryItemEvents();
+            this.historyList.querySelectorAll('.history-item').forEach(element => element.remove());
         }
     }
 
+    // 缓存中的记录按当前排序方式排列（服务端返回的页已排好序）
     sortInterviews(interviews) {
         const sortValue = this.sortBy?.value || 'date-desc';
         
@@ -1285,15 +1662,22 @@ class HistoryManager {
         });
     }
 
+    escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
     createHistoryItemHTML(interview) {
         const date = new Date(interview.createdAt).toLocaleString('zh-CN');
         const duration = interview.duration ? `${Math.floor(interview.duration / 60)}分${interview.duration % 60}秒` : '未知';
-        const messageCount = interview.messages?.length || 0;
-        const score = interview.score || interview.evaluation?.total_score;
-        const hasEvaluation = interview.evaluation || interview.score;
+        const messageCount = interview.messageCount ?? interview.messages?.length ?? 0;
+        const score = interview.score ?? interview.evaluation?.total_score;
+        const hasEvaluation = interview.hasEvaluation || interview.evaluation || interview.score;
+        const id = this.escapeHtml(interview.id);
         
         return `
-            <div class="history-item" data-id="${interview.id}">
+            <div class="history-item" data-id="${id}">
                 <div class="history-icon">
                     <i class="fas fa-microphone"></i>
                 </div>
@@ -1312,19 +1696,19 @@ class HistoryManager {
                         ${hasEvaluation ? `<span><i class="fas fa-chart-bar"></i> 已评分</span>` : ''}
                     </div>
                     <div class="history-summary">
-                        ${interview.summary || '本次面试涵盖了技术能力、项目经验等多个方面的深入交流...'}
+                        ${this.escapeHtml(interview.summary || '本次面试涵盖了技术能力、项目经验等多个方面的深入交流...')}
                     </div>
                 </div>
                 <div class="history-actions">
                     ${hasEvaluation ? `
-                        <button class="history-action-btn" onclick="historyManager.viewEvaluation('${interview.id}')" title="查看评分">
+                        <button class="history-action-btn" onclick="historyManager.viewEvaluation('${id}')" title="查看评分">
                             <i class="fas fa-chart-bar"></i>
                         </button>
                     ` : ''}
-                    <button class="history-action-btn" onclick="historyManager.continueInterview('${interview.id}')" title="继续面试">
+                    <button class="history-action-btn" onclick="historyManager.continueInterview('${id}')" title="继续面试">
                         <i class="fas fa-play"></i>
                     </button>
-                    <button class="history-action-btn" onclick="historyManager.deleteInterview('${interview.id}')" title="删除记录">
+                    <button class="history-action-btn" onclick="historyManager.deleteInterview('${id}')" title="删除记录">
                         <i class="fas fa-trash"></i>
                     </button>
                 </div>
@@ -1332,13 +1716,8 @@ class HistoryManager {
         `;
     }
 
-    bindHistoryItemEvents() {
-        // 事件已在HTML中绑定
-    }
-
-    continueInterview(id) {
-        const interviews = this.storageManager.getInterviews();
-        const interview = interviews.find(item => item.id === id);
+    async continueInterview(id) {
+        const interview = await this.historyStore.getInterview(id);
         
         if (interview) {
             // 触发继续面试事件
@@ -1349,23 +1728,40 @@ class HistoryManager {
         }
     }
 
-    deleteInterview(id) {
+    async deleteInterview(id) {
         if (confirm('确定要删除这条面试记录吗？')) {
-            this.storageManager.deleteInterview(id);
-            this.refreshHistoryList();
+            try {
+                await this.historyStore.deleteInterview(id);
+            } catch (e) {
+                console.error('删除面试记录失败:', e);
+                return;
+            }
+            this.items.delete(id);
+            this.historyList?.querySelectorAll('.history-item').forEach(element => {
+                if (element.dataset.id === id) {
+                    element.remove();
+                }
+            });
+            if (this.items.size === 0) {
+                this.refreshHistoryList();
+            }
         }
     }
 
-    clearHistory() {
+    async clearHistory() {
         if (confirm('确定要清空所有面试记录吗？此操作不可恢复。')) {
-            this.storageManager.clearInterviews();
+            try {
+                await this.historyStore.clearInterviews();
+            } catch (e) {
+                console.error('清空面试记录失败:', e);
+                return;
+            }
             this.refreshHistoryList();
         }
     }
     
-    viewEvaluation(id) {
-        const interviews = this.storageManager.getInterviews();
-        const interview = interviews.find(item => item.id === id);
+    async viewEvaluation(id) {
+        const interview = await this.historyStore.getInterview(id);
         
         if (interview && interview.evaluation) {
             // 使用AzureVoiceChat的showEvaluationResult方法显示评分
@@ -1653,9 +2049,10 @@ class ResumeManager {
 class AzureVoiceInterviewApp {
     constructor() {
         this.storageManager = new LocalStorageManager();
+        this.historyStore = new InterviewHistoryStore(this.storageManager);
         this.router = new PageRouter();
-        this.voiceChat = new AzureVoiceChat();
-        this.historyManager = new HistoryManager(this.storageManager, this.router);
+        this.voiceChat = new AzureVoiceChat(this.historyStore.clientId);
+        this.historyManager = new HistoryManager(this.historyStore, this.router);
         this.resumeManager = new ResumeManager(this.storageManager, this.router);
         this.voiceCallManager = null; // 将在连接成功后初始化
         
@@ -1684,6 +2081,13 @@ class AzureVoiceInterviewApp {
         // 加载保存的简历
         this.loadSavedResume();
         
+        // 旧版本保存在localStorage中的面试历史迁移到服务端
+        this.historyStore.migrateLocalStorage().then(migrated => {
+            if (migrated) {
+                this.historyManager.refreshHistoryList();
+            }
+        });
+        
         // 监听连接成功事件，初始化语音通话管理器
         this.waitForConnection();
         
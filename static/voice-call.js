@@ -16,9 +16,8 @@ class VoiceCallManager {
     constructor(azureVoiceChat) {
         this.azureVoiceChat = azureVoiceChat;
         
-        // Azure配置
-        this.SESSIONS_URL = "https://gpt-realtime-4o-mini.openai.azure.com/openai/realtimeapi/sessions?api-version=2025-04-01-preview";
-        this.API_KEY = "1CPbxJPoYjJzTmG2296QXpJ8LT8jHJ0NmgKDv56sQ5tjonM6RXgOJQQJ99BEACHYHv6XJ3w3AAABACOG45bg";
+        // Azure配置（临时密钥由后端令牌池发放，前端不再持有API密钥）
+        this.TOKEN_URL = "/api/realtime/token";
         this.DEPLOYMENT = "gpt-4o-mini-realtime-preview";
         this.VOICE = "verse";
         
@@ -418,22 +417,17 @@ class VoiceCallManager {
     }
     
     /**
-     * 获取临时密钥
+     * 获取临时密钥（从后端预申请的令牌池中获取，一次本地请求）
      */
     async getEphemeralKey() {
         this.logMessage('正在获取临时密钥...');
         
         try {
-            const response = await fetch(this.SESSIONS_URL, {
+            const response = await fetch(this.TOKEN_URL, {
                 method: "POST",
                 headers: {
-                    "api-key": this.API_KEY,
                     "Content-Type": "application/json"
-                },
-                body: JSON.stringify({
-                    model: this.DEPLOYMENT,
-                    voice: this.VOICE
-                })
+                }
             });
 
             if (!response.ok) {
@@ -443,10 +437,21 @@ class VoiceCallManager {
             }
 
             const data = await response.json();
-            this.sessionId = data.id;
-            this.ephemeralKey = data.client_secret?.value;
+            this.sessionId = data.session_id;
+            this.ephemeralKey = data.client_secret;
+            
+            // 部署、音色和端点以后端配置为准
+            if (data.deployment) {
+                this.DEPLOYMENT = data.deployment;
+            }
+            if (data.voice) {
+                this.VOICE = data.voice;
+            }
+            if (Array.isArray(data.webrtc_configs) && data.webrtc_configs.length > 0) {
+                this.WEBRTC_CONFIGS = data.webrtc_configs;
+            }
             
-            this.logMessage(`临时密钥获取成功: ***`);
+            this.logMessage(`临时密钥获取成功: *** (${data.pool_hit ? '令牌池命中' : '即时申请'})`);
             this.logMessage(`WebRTC会话ID: ${this.sessionId}`);
             
             return this.ephemeralKey;
@@ -772,6 +777,23 @@ class VoiceCallManager {
         }
     }
     
+    /**
+     * 上报区域连接结果（不等待响应，失败忽略）
+     */
+    reportRegionResult(url, success, latencyMs = null, error = '') {
+        fetch('/api/realtime/regions/report', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                session_id: this.sessionId,
+                url,
+                success,
+                latency_ms: latencyMs,
+                error: error || ''
+            })
+        }).catch(() => {});
+    }
+    
     /**
      * 建立WebRTC连接
      */
@@ -788,7 +810,9 @@ class VoiceCallManager {
             let sdpResponse = null;
             let successfulUrl = null;
             
+            // WEBRTC_CONFIGS已由后端按区域健康得分排序
             for (const config of this.WEBRTC_CONFIGS) {
+                const attemptStart = performance.now();
                 try {
                     const webrtcUrl = config.useQuery ? `${config.url}?model=${this.DEPLOYMENT}` : config.url;
                     this.logMessage(`尝试连接: ${webrtcUrl}`);
@@ -807,13 +831,19 @@ class VoiceCallManager {
                     if (sdpResponse.ok) {
                         successfulUrl = webrtcUrl;
                         this.logMessage(`✅ 成功连接到: ${webrtcUrl}`);
+                        this.reportRegionResult(config.url, true, performance.now() - attemptStart);
                         break;
                     } else {
                         const errorText = await sdpResponse.text();
                         this.logMessage(`❌ 连接失败 ${config.url}: ${sdpResponse.status} - ${errorText}`);
+                        // 4xx通常是令牌或请求问题，不计为区域故障
+                        if (sdpResponse.status >= 500) {
+                            this.reportRegionResult(config.url, false, null, `HTTP ${sdpResponse.status}`);
+                        }
                     }
                 } catch (error) {
                     this.logMessage(`❌ 连接错误 ${config.url}: ${error.message}`);
+                    this.reportRegionResult(config.url, false, null, error.message);
                 }
             }
             